@@ -0,0 +1,18 @@
+from typing import Callable
+
+from core.players import Player, RandomPlayer, first_play
+from ai.evaluator import BearoffEvaluator, HeuristicEvaluator
+from ai.expectiminimax import ExpectiminimaxPlayer
+from ai.neuralNet import NeuralNetEvaluator
+
+# agent name -> factory taking the seed for that agent, used by the command line tools
+AGENTS: dict[str, Callable[[int], Player]] = {
+    "random": lambda seed: RandomPlayer(seed),
+    "first": lambda seed: first_play,
+    # one ply on the static heuristic alone: the pip count rewards every hit whatever the race,
+    # so two one-ply pip counters keep trading hits and never finish
+    "greedy": lambda seed: ExpectiminimaxPlayer(depth=1, evaluator=HeuristicEvaluator()),
+    "heuristic": lambda seed: ExpectiminimaxPlayer(depth=1, evaluator=BearoffEvaluator(HeuristicEvaluator())),
+    "neural": lambda seed: ExpectiminimaxPlayer(depth=1, evaluator=BearoffEvaluator(NeuralNetEvaluator())),
+    "expectiminimax": lambda seed: ExpectiminimaxPlayer(depth=2),
+}
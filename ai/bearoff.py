@@ -0,0 +1,203 @@
+"""
+One-sided bear-off database.
+
+Every distribution of up to 15 checkers over the six home points gets the expected
+number of rolls to bear off and the distribution of the roll count, assuming the
+side plays to minimise the expected rolls under this engine's rules (dice from
+GameState.explode_dice, MoveMediator's stack limit and overshoot rules).
+
+    python -m ai.bearoff [path]      # build the file, defaults to BearoffDatabase.DEFAULT_PATH
+
+The file is a small header followed by one fixed-size record per position, in
+ranking order, and is opened through mmap so a lookup is one index computation
+and one unpack.
+"""
+
+import mmap
+import os
+import struct
+import sys
+from math import comb
+from typing import Callable, Optional, Sequence
+
+from datastructures.Board import Board
+from core.gameState import GameState
+from core.moveMediator import MoveMediator
+
+
+def _tail_counts(points: int, checkers: int) -> list[list[int]]:
+    # table[k][s] = number of k-point distributions with at most s checkers
+    return [[comb(s + k, k) for s in range(checkers + 1)] for k in range(points + 1)]
+
+
+class BearoffDatabase:
+
+    MAGIC = b"BGBO"
+    VERSION = 1
+    HEADER = struct.Struct("<4sIIII")          # magic, version, checkers, points, max rolls
+
+    CHECKERS = 15
+    POINTS = 6
+    MAX_ROLLS = 32                             # longer bear-offs are folded into the last bucket
+    RECORD = struct.Struct(f"<f{MAX_ROLLS}H")  # expected rolls, roll count distribution * 65535
+
+    DEFAULT_PATH = os.path.join(os.path.dirname(os.path.dirname(__file__)), "data", "bearoff_onesided.bin")
+
+    _TAIL = _tail_counts(POINTS, CHECKERS)
+    SIZE = _TAIL[POINTS][CHECKERS]
+
+    ROLLS = GameState.DISTINCT_ROLLS
+
+    def __init__(self, path: str = DEFAULT_PATH):
+        self._file = open(path, "rb")
+        self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+
+        magic, version, checkers, points, max_rolls = self.HEADER.unpack_from(self._map, 0)
+        if (magic, version, checkers, points, max_rolls) != (self.MAGIC, self.VERSION, self.CHECKERS,
+                                                            self.POINTS, self.MAX_ROLLS):
+            self.close()
+            raise ValueError(f"{path} is not a bear-off database this version can read")
+
+    @classmethod
+    def open_default(cls) -> Optional["BearoffDatabase"]:
+        """Opens the database at DEFAULT_PATH, None when it has not been built."""
+        if not os.path.exists(cls.DEFAULT_PATH):
+            return None
+        return cls(cls.DEFAULT_PATH)
+
+    def close(self) -> None:
+        self._map.close()
+        self._file.close()
+
+    # Lookups
+    @staticmethod
+    def home_counts(position: Sequence[int], player: str) -> tuple[int, ...]:
+        """Checkers of player on their home points, ordered by distance from bearing off (1..6)."""
+        if player == "white":
+            return tuple(max(position[pt], 0) for pt in range(1, 7))
+        return tuple(max(-position[25 - pt], 0) for pt in range(1, 7))
+
+    @classmethod
+    def index(cls, counts: Sequence[int]) -> int:
+        """Rank of a home distribution among all distributions, in lexicographic order."""
+        tail = cls._TAIL
+        left = cls.CHECKERS
+        rank = 0
+        for i, count in enumerate(counts):
+            rest = cls.POINTS - i - 1
+            for v in range(count):
+                rank += tail[rest][left - v]
+            left -= count
+        return rank
+
+    def _record(self, position: Sequence[int], player: str) -> tuple:
+        offset = self.HEADER.size + self.index(self.home_counts(position, player)) * self.RECORD.size
+        return self.RECORD.unpack_from(self._map, offset)
+
+    def expected_rolls(self, position: Sequence[int], player: str) -> float:
+        return self._record(position, player)[0]
+
+    def roll_distribution(self, position: Sequence[int], player: str) -> list[float]:
+        """P(player needs exactly k more rolls) for k = 0 .. MAX_ROLLS - 1."""
+        return [value / 65535 for value in self._record(position, player)[1:]]
+
+    def win_probability(self, position: Sequence[int], player: str) -> float:
+        """Chance that player, who is on roll, bears off first."""
+        own = self.roll_distribution(position, player)
+        other = self.roll_distribution(position, "black" if player == "white" else "white")
+
+        # player wins when finishing in k rolls while the opponent needs at least k
+        win = 0.0
+        other_at_least = 1.0
+        for k in range(self.MAX_ROLLS):
+            win += own[k] * other_at_least
+            other_at_least -= other[k]
+        return min(max(win, 0.0), 1.0)
+
+    # Generation
+    @classmethod
+    def distributions(cls):
+        """All home distributions in index order."""
+        def fill(prefix: tuple[int, ...], left: int):
+            if len(prefix) == cls.POINTS:
+                yield prefix
+                return
+            for count in range(left + 1):
+                yield from fill(prefix + (count,), left - count)
+        return fill((), cls.CHECKERS)
+
+    @classmethod
+    def build(cls, path: str = DEFAULT_PATH, progress: Optional[Callable[[int, int], None]] = None) -> None:
+        """Solves every distribution and writes the database to path."""
+        positions = list(cls.distributions())
+        # every play lowers the pip count, so solving in pip order has all successors ready
+        positions.sort(key=lambda counts: sum(c * (i + 1) for i, c in enumerate(counts)))
+
+        expected = [0.0] * cls.SIZE
+        distribution: list[Optional[list[float]]] = [None] * cls.SIZE
+
+        for done, counts in enumerate(positions):
+            index = cls.index(counts)
+            if not any(counts):
+                expected[index] = 0.0
+                distribution[index] = [1.0] + [0.0] * (cls.MAX_ROLLS - 1)
+                continue
+
+            board = [0] * Board.SLOT_NUM
+            board[1:7] = counts
+            board[Board.WHITE_HOME] = cls.CHECKERS - sum(counts)
+            board[Board.BLACK_HOME] = cls.CHECKERS
+
+            mean = 1.0
+            stay = 0.0
+            dist = [0.0] * cls.MAX_ROLLS
+            for dice, probability in cls.ROLLS:
+                plays = MoveMediator.generate_moves(board, "white", GameState.explode_dice(dice))
+                if not plays:
+                    stay += probability
+                    continue
+
+                best = min((cls.index(position[1:7]) for _, position in plays), key=expected.__getitem__)
+                mean += probability * expected[best]
+                after = distribution[best]
+                for k in range(cls.MAX_ROLLS - 1):
+                    dist[k + 1] += probability * after[k]
+                dist[-1] += probability * after[-1]
+
+            # a roll that cannot be played leaves the position unchanged:
+            # E = 1 + sum(p * E_after) + p_stay * E  ->  E = (1 + sum) / (1 - p_stay)
+            if stay:
+                mean /= (1.0 - stay)
+                resolved = [0.0] * cls.MAX_ROLLS
+                for k in range(1, cls.MAX_ROLLS):
+                    resolved[k] = dist[k] + stay * resolved[k - 1]
+                dist = resolved
+
+            expected[index] = mean
+            distribution[index] = dist
+            if progress is not None and done % 1000 == 0:
+                progress(done, len(positions))
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with open(path, "wb") as out:
+            out.write(cls.HEADER.pack(cls.MAGIC, cls.VERSION, cls.CHECKERS, cls.POINTS, cls.MAX_ROLLS))
+            for index in range(cls.SIZE):
+                quantized = [min(65535, round(p * 65535)) for p in distribution[index]]
+                out.write(cls.RECORD.pack(expected[index], *quantized))
+
+
+def main(argv: Optional[list[str]] = None) -> None:
+    argv = sys.argv[1:] if argv is None else argv
+    path = argv[0] if argv else BearoffDatabase.DEFAULT_PATH
+
+    def report(done: int, total: int) -> None:
+        print(f"  {done}/{total} positions", file=sys.stderr)
+
+    BearoffDatabase.build(path, report)
+    print(f"wrote {BearoffDatabase.SIZE} positions to {path}")
+
+
+if __name__ == "__main__":
+    main()
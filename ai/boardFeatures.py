@@ -0,0 +1,90 @@
+import numpy as np
+from typing import Iterable, Union
+
+from datastructures.Board import Board
+
+# batched versions of the per-position questions MoveMediator answers with Python loops
+# every kernel takes an (N, 28) array in the Board.get_counts layout:
+#   column 0 white borne off, 1..24 signed point counts (white > 0, black < 0),
+#   column 25 black borne off, 26/27 white/black bar
+# and returns one row per position, per-side results are (N, 2) with columns (white, black)
+
+POINTS = slice(1, 25)
+
+# distance of every point from bearing off, white moves 24 -> 1, black 1 -> 24
+_WHITE_PIPS = np.arange(1, 25, dtype=np.int32)
+_BLACK_PIPS = _WHITE_PIPS[::-1].copy()
+_WHITE_OUTSIDE = np.arange(24) >= 6     # points 7..24
+_BLACK_OUTSIDE = np.arange(24) < 18     # points 1..18
+
+Positions = Union[np.ndarray, Iterable[Board], Iterable[Iterable[int]]]
+
+
+def as_positions(positions: Positions) -> np.ndarray:
+    """Stacks Boards or board arrays into one (N, 28) int8 array."""
+    if isinstance(positions, np.ndarray):
+        array = positions
+    else:
+        rows = [p.get_counts if isinstance(p, Board) else p for p in positions]
+        array = np.array(rows, dtype=np.int8).reshape(len(rows), Board.SLOT_NUM)
+    if array.ndim == 1:
+        array = array[np.newaxis, :]
+    if array.shape[1] != Board.SLOT_NUM:
+        raise ValueError(f"Expected positions with {Board.SLOT_NUM} columns, got {array.shape[1]}")
+    return array
+
+
+def _split(positions: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    points = positions[:, POINTS].astype(np.int32)
+    return np.maximum(points, 0), np.maximum(-points, 0)
+
+
+def pip_counts(positions: Positions) -> np.ndarray:
+    positions = as_positions(positions)
+    white, black = _split(positions)
+    bar = positions[:, [Board.WHITE_BAR, Board.BLACK_BAR]].astype(np.int32) * 25
+    return np.stack([white @ _WHITE_PIPS, black @ _BLACK_PIPS], axis=1) + bar
+
+
+def blot_counts(positions: Positions) -> np.ndarray:
+    white, black = _split(as_positions(positions))
+    return np.stack([(white == 1).sum(axis=1), (black == 1).sum(axis=1)], axis=1)
+
+
+def made_points(positions: Positions) -> np.ndarray:
+    white, black = _split(as_positions(positions))
+    return np.stack([(white >= 2).sum(axis=1), (black >= 2).sum(axis=1)], axis=1)
+
+
+def can_bear_off(positions: Positions) -> np.ndarray:
+    positions = as_positions(positions)
+    white, black = _split(positions)
+    white_ok = (positions[:, Board.WHITE_BAR] == 0) & ~(white[:, _WHITE_OUTSIDE] > 0).any(axis=1)
+    black_ok = (positions[:, Board.BLACK_BAR] == 0) & ~(black[:, _BLACK_OUTSIDE] > 0).any(axis=1)
+    return np.stack([white_ok, black_ok], axis=1)
+
+
+def contact_broken(positions: Positions) -> np.ndarray:
+    """True where every white stone is past every black stone, so the game is a pure race."""
+    positions = as_positions(positions)
+    white, black = _split(positions)
+
+    # rearmost stone of each side, a stone on the bar is as far back as it gets
+    white_back = np.where(white > 0, _WHITE_PIPS, 0).max(axis=1)
+    white_back = np.where(positions[:, Board.WHITE_BAR] > 0, 25, white_back)
+    black_back = np.where(black > 0, _WHITE_PIPS, 25).min(axis=1)
+    black_back = np.where(positions[:, Board.BLACK_BAR] > 0, 0, black_back)
+
+    return white_back < black_back
+
+
+def features(positions: Positions) -> dict[str, np.ndarray]:
+    """All kernels in one call on the same (N, 28) array."""
+    positions = as_positions(positions)
+    return {
+        "pip_counts": pip_counts(positions),
+        "blot_counts": blot_counts(positions),
+        "made_points": made_points(positions),
+        "can_bear_off": can_bear_off(positions),
+        "contact_broken": contact_broken(positions),
+    }
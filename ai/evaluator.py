@@ -0,0 +1,136 @@
+import math
+from abc import ABC, abstractmethod
+from typing import Optional, Sequence
+
+import numpy as np
+
+from datastructures.Board import Board
+from core.moveMediator import MoveMediator
+from ai import boardFeatures
+from ai.bearoff import BearoffDatabase
+
+
+class Evaluator(ABC):
+    # scores board arrays (Board.get_counts layout) for the AI players
+    # the result is the cubeless equity for player, who is the side to move, in [-1, 1]
+    # for a plain win/loss and up to +-3 when gammons and backgammons are counted
+
+    # largest absolute equity evaluate can return, searches use it as their bound
+    MAX_EQUITY = 3.0
+
+    @abstractmethod
+    def evaluate(self, position: Sequence[int], player: str) -> float:
+        pass
+
+    def evaluate_many(self, positions: Sequence[Sequence[int]], player: str) -> list[float]:
+        """Scores many positions for the same player, evaluators with a faster batch path override this."""
+        return [self.evaluate(position, player) for position in positions]
+
+
+def pip_count(position: Sequence[int], color: str) -> int:
+    if color == "white":
+        pips = sum(position[pt] * pt for pt in range(1, 25) if position[pt] > 0)
+    else:
+        pips = sum(-position[pt] * (25 - pt) for pt in range(1, 25) if position[pt] < 0)
+    return pips + 25 * position[Board.BAR_SLOT[color]]
+
+
+def opponent_of(color: str) -> str:
+    return "black" if color == "white" else "white"
+
+
+class PipCountEvaluator(Evaluator):
+    """Race estimate from the pip counts, the fallback when nothing better applies."""
+
+    MAX_EQUITY = 1.0
+
+    # being on roll is worth roughly this many pips
+    ON_ROLL_PIPS = 4.0
+
+    def evaluate(self, position: Sequence[int], player: str) -> float:
+        own = pip_count(position, player)
+        other = pip_count(position, opponent_of(player))
+        if own == 0:
+            return 1.0
+        if other == 0:
+            return -1.0
+
+        lead = (other - own + self.ON_ROLL_PIPS) / math.sqrt(own + other)
+        return math.tanh(lead)
+
+
+class HeuristicEvaluator(Evaluator):
+    """
+    Pip count plus a few contact terms from ai.boardFeatures, scored a whole batch at a time.
+    Blots of the side that just moved are the ones the roll can hit, so they weigh more than
+    the own blots of the side to move. Pure races are scored like PipCountEvaluator.
+    """
+
+    MAX_EQUITY = 1.0
+
+    ON_ROLL_PIPS = PipCountEvaluator.ON_ROLL_PIPS
+    OPPONENT_BLOT = 0.25
+    OWN_BLOT = 0.08
+    MADE_POINT = 0.06
+
+    def evaluate(self, position: Sequence[int], player: str) -> float:
+        return self.evaluate_many([position], player)[0]
+
+    def evaluate_many(self, positions: Sequence[Sequence[int]], player: str) -> list[float]:
+        batch = boardFeatures.as_positions(positions)
+        own, other = (0, 1) if player == "white" else (1, 0)
+
+        pips = boardFeatures.pip_counts(batch)
+        blots = boardFeatures.blot_counts(batch)
+        made = boardFeatures.made_points(batch)
+
+        total = np.maximum(pips[:, own] + pips[:, other], 1)
+        race = (pips[:, other] - pips[:, own] + self.ON_ROLL_PIPS) / np.sqrt(total)
+        contact = (self.OPPONENT_BLOT * blots[:, other] - self.OWN_BLOT * blots[:, own]
+                   + self.MADE_POINT * (made[:, own] - made[:, other]))
+
+        score = np.where(boardFeatures.contact_broken(batch), race, race + contact)
+        equity = np.tanh(score)
+        equity = np.where(pips[:, own] == 0, 1.0, np.where(pips[:, other] == 0, -1.0, equity))
+        return equity.tolist()
+
+
+class BearoffEvaluator(Evaluator):
+    """
+    Exact bear-off lookups once both sides can bear off, delegates everything else.
+    Opens the default bear-off database automatically when it has been built.
+    """
+
+    MAX_EQUITY = 1.0
+
+    def __init__(self, fallback: Optional[Evaluator] = None, database=None):
+        self._fallback = fallback if fallback is not None else PipCountEvaluator()
+        self._database = database if database is not None else BearoffDatabase.open_default()
+        self.MAX_EQUITY = max(1.0, self._fallback.MAX_EQUITY)
+
+    def evaluate(self, position: Sequence[int], player: str) -> float:
+        if self._database is not None and self.is_bearoff(position):
+            return 2.0 * self._database.win_probability(position, player) - 1.0
+        return self._fallback.evaluate(position, player)
+
+    def evaluate_many(self, positions: Sequence[Sequence[int]], player: str) -> list[float]:
+        if self._database is None:
+            return self._fallback.evaluate_many(positions, player)
+
+        # bear-offs are looked up one by one, the rest goes to the fallback in one batch
+        values: list[float] = [0.0] * len(positions)
+        rest = []
+        for i, position in enumerate(positions):
+            if self.is_bearoff(position):
+                values[i] = 2.0 * self._database.win_probability(position, player) - 1.0
+            else:
+                rest.append(i)
+        if rest:
+            for i, value in zip(rest, self._fallback.evaluate_many([positions[i] for i in rest], player)):
+                values[i] = value
+        return values
+
+    @staticmethod
+    def is_bearoff(position: Sequence[int]) -> bool:
+        return (MoveMediator.points_can_bear_off(position, "white")
+                and MoveMediator.points_can_bear_off(position, "black"))
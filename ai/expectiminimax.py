@@ -0,0 +1,145 @@
+from math import inf
+from typing import Optional, Sequence
+
+from datastructures.Board import Board
+from datastructures.TranspositionTable import TranspositionTable
+from datastructures.Zobrist import Zobrist
+from core.gameState import GameState
+from core.moveMediator import MoveMediator
+from core.players import LegalPlays, Play
+from ai.evaluator import BearoffEvaluator, Evaluator, opponent_of
+
+
+class ExpectiminimaxPlayer:
+    """
+    Searches `depth` plies of move nodes alternating with the 21 chance nodes of the next roll.
+
+    Chance nodes are pruned Star2 style: one cheap probe per roll gives a bound on the whole
+    node before the full search, and Star1 windows cut the remaining rolls as soon as the
+    weighted sum can no longer land inside the window. Plays are ordered by their static
+    evaluation and finished chance nodes go into a transposition table.
+
+    Callable as a core.players.Player, so it can drive either color in GameEngine or HeadlessEngine.
+    """
+
+    ROLLS = GameState.DISTINCT_ROLLS
+
+    def __init__(self, depth: int = 2, evaluator: Optional[Evaluator] = None,
+                 table: Optional[TranspositionTable] = None) -> None:
+        if depth < 1:
+            raise ValueError("Search depth must be at least 1")
+        self._depth = depth
+        self._evaluator = evaluator if evaluator is not None else BearoffEvaluator()
+        self._table = table if table is not None else TranspositionTable(18)
+        self._bound = self._evaluator.MAX_EQUITY
+
+        self.nodes = 0
+
+    def __call__(self, board: Board, player: str, dice: tuple[int, ...], plays: LegalPlays) -> Play:
+        if len(plays) == 1:
+            return plays[0][0]
+        return self.choose(plays, player)[0]
+
+    def choose(self, plays: LegalPlays, player: str) -> tuple[Play, float]:
+        """Best play for player among plays, with its searched equity."""
+        self._table.new_search()
+        opponent = opponent_of(player)
+
+        if self._depth == 1:
+            # one ply: the batched static evaluation is the whole search
+            values = self._evaluator.evaluate_many([position for _, position in plays], opponent)
+            best = min(range(len(plays)), key=values.__getitem__)
+            return plays[best][0], -values[best]
+
+        ordered = self._order(plays, player)
+        best_play, best_value = ordered[0][0], -inf
+        alpha = -self._bound
+
+        for steps, position in ordered:
+            value = -self._chance(position, opponent, self._depth - 1, -self._bound, -alpha)
+            if value > best_value:
+                best_play, best_value = steps, value
+            alpha = max(alpha, value)
+
+        return best_play, best_value
+
+    # Search
+    def _order(self, plays: LegalPlays, player: str) -> LegalPlays:
+        """Plays sorted best first for player by the static evaluation of where they end."""
+        values = self._evaluator.evaluate_many([position for _, position in plays], opponent_of(player))
+        order = sorted(range(len(plays)), key=values.__getitem__)
+        return [plays[i] for i in order]
+
+    def _chance(self, position: Sequence[int], to_move: str, depth: int, alpha: float, beta: float) -> float:
+        """Expected value for to_move, who is about to roll."""
+        self.nodes += 1
+        winner = opponent_of(to_move)
+        if position[Board.HOME_SLOT[winner]] == 15:
+            # a loss on the evaluator's scale, gammons count when its equities go that far
+            return -min(GameState.game_value(position, winner), self._bound)
+        if depth == 0:
+            return self._evaluator.evaluate(position, to_move)
+
+        key = Zobrist.with_side(Zobrist.hash_points(position), to_move)
+        cached = self._table.probe(key, depth)
+        if cached is not None:
+            return cached
+
+        low, high = -self._bound, self._bound
+        children = [(probability, MoveMediator.generate_moves(position, to_move, GameState.explode_dice(dice)))
+                    for dice, probability in self.ROLLS]
+
+        # Star2: every decision node is worth at least its probed play
+        probes = [self._probe(position, to_move, plays, depth) for _, plays in children]
+        rest_low = sum(probability * probe for (probability, _), probe in zip(children, probes))
+        if rest_low >= beta:
+            return rest_low
+
+        # Star1: keep the weighted sum's bounds and cut as soon as it leaves the window
+        total = 0.0
+        done = 0.0
+        for (probability, plays), probe in zip(children, probes):
+            rest_low -= probability * probe
+            rest = 1.0 - done - probability
+
+            child_alpha = max((alpha - total - rest * high) / probability, low)
+            child_beta = min((beta - total - rest_low) / probability, high)
+            value = self._decision(position, to_move, plays, depth, child_alpha, child_beta)
+
+            total += probability * value
+            done += probability
+            if total + (1.0 - done) * high <= alpha:
+                return total + (1.0 - done) * high
+            if total + rest_low >= beta:
+                return total + rest_low
+
+        self._table.store(key, total, depth)
+        return total
+
+    def _decision(self, position: Sequence[int], to_move: str, plays: LegalPlays, depth: int,
+                  alpha: float, beta: float) -> float:
+        """Value for to_move of the best play for the rolled dice."""
+        opponent = opponent_of(to_move)
+        if not plays:
+            return -self._chance(position, opponent, depth - 1, -beta, -alpha)
+
+        if depth == 1:
+            # leaves: one batched evaluation of every play
+            values = self._evaluator.evaluate_many([after for _, after in plays], opponent)
+            return -min(values)
+
+        best = -inf
+        for _, after in self._order(plays, to_move):
+            value = -self._chance(after, opponent, depth - 1, -beta, -max(alpha, best))
+            best = max(best, value)
+            if best >= beta:
+                break
+        return best
+
+    def _probe(self, position: Sequence[int], to_move: str, plays: LegalPlays, depth: int) -> float:
+        """Cheap lower bound on a decision node: the exact value of one play at the last ply."""
+        if depth > 1:
+            return -self._bound
+        if not plays:
+            return -self._evaluator.evaluate(position, opponent_of(to_move))
+        return -self._evaluator.evaluate(plays[0][1], opponent_of(to_move))
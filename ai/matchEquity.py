@@ -0,0 +1,362 @@
+"""
+Match equity table (MET) and cube decisions for match play.
+
+    python -m ai.matchEquity             # print the table for matches up to 11 points
+    python -m ai.matchEquity --length 25
+
+The table is computed once, when the module is imported, for matches up to MAX_LENGTH
+points: a game is won by either side with equal chances and ends in a gammon or a
+backgammon at the GAMMON_RATE and BACKGAMMON_RATE shares of wins. Post-Crawford the
+trailer doubles at once and the leader takes, the Crawford game is played without
+the cube and the rest of the table is filled from the bottom up.
+
+Games before the Crawford game are played with a live cube in the continuous model
+(the winning chance moves without jumps, as in Keeler and Spencer's analysis): a side
+doubles when the game reaches its opponent's take point, and the opponent's take
+point is where taking, with the cube and its redoubles, is worth as much as passing.
+At every score and cube value the match winning chance is then a straight line in the
+winning chance between the two cash points, the table keeps those lines for every
+score, cube value and owner. Without the cube in the recursion the leader is overrated
+by several points (2-away 4-away comes out at 73% instead of the usual 67%).
+
+Cube decisions weigh two estimates of each action. The dead cube one indexes OUTCOMES,
+the match winning chances after each of the six ways a game can end, with the
+position's probabilities. The live cube one reads the line at the position's winning
+chance, which counts what owning the cube is worth. They are mixed with
+CUBE_EFFICIENCY, the share of the live cube value that is realized in practice
+(Janowski's cube life index). Nothing is recomputed per decision.
+
+Money play (no match) uses the same two estimates in points: the dead cube one from
+OUTCOME_POINTS, the live cube one from lines between the money take and cash points,
+which come from the average win and loss of the position (Janowski's formulas).
+"""
+
+import argparse
+from typing import Callable, NamedTuple, Optional, Sequence
+
+import numpy as np
+
+from datastructures.DoublingCube import DoublingCube
+from core.matchState import MatchState
+from ai.evaluator import BearoffEvaluator, Evaluator, HeuristicEvaluator, opponent_of
+
+MAX_LENGTH = 25
+CUBE_LEVELS = DoublingCube.MAX_VALUE.bit_length()      # cube values 1, 2, 4, ... 64
+
+# shares of won games that end in a gammon (backgammons included) and in a backgammon
+GAMMON_RATE = 0.26
+BACKGAMMON_RATE = 0.01
+
+# (outcome, points per cube): win single, gammon, backgammon, lose single, gammon, backgammon
+OUTCOME_POINTS = (1, 2, 3, -1, -2, -3)
+
+# weight of the live cube estimate in cube decisions, the rest goes to the dead cube one
+CUBE_EFFICIENCY = 0.68
+
+# cube owner, from the side of the player the line belongs to
+CENTERED, OWNED, OPPONENT_OWNS = 0, 1, 2
+
+
+def _post_crawford(length: int, single: float, gammon: float, backgammon: float) -> np.ndarray:
+    """post[n]: chances of the player n away against an opponent 1 away, after the Crawford game."""
+    post = np.ones(length + 1)
+    for n in range(1, length + 1):
+        # the trailer doubles at once, the game is played for 2, 4 or 6 points
+        wins = (single * post[max(n - 2, 0)] + gammon * post[max(n - 4, 0)]
+                + backgammon * post[max(n - 6, 0)])
+        post[n] = 0.5 * wins
+    return post
+
+
+def line_value(line: Sequence[float], p: float) -> float:
+    """Value of a cube line (lo, hi, value at lo, value at hi) at winning chance p, flat outside [lo, hi]."""
+    lo, hi, value_lo, value_hi = line
+    if p <= lo:
+        return float(value_lo)
+    if p >= hi:
+        return float(value_hi)
+    return float(value_lo + (value_hi - value_lo) * (p - lo) / (hi - lo))
+
+
+def _crossing(line: Sequence[float], value: float) -> float:
+    """Lowest winning chance at which the line reaches value."""
+    lo, hi, value_lo, value_hi = line
+    if value <= value_lo:
+        return lo
+    if value >= value_hi:
+        return hi
+    return lo + (hi - lo) * (value - value_lo) / (value_hi - value_lo)
+
+
+def _cube_lines(met: np.ndarray, a: int, b: int, cube: bool,
+                single: float, gammon: float, backgammon: float) -> np.ndarray:
+    """
+    lines[level, owner]: chances of the player a away against b away during a game played
+    for 2 ** level as a line in the player's winning chance; met holds the chances at
+    the start of the next game. From the highest cube value down, since a side's cash
+    point comes from the line it would hand the opponent by doubling.
+    """
+    lines = np.zeros((CUBE_LEVELS, 3, 4))
+    for level in reversed(range(CUBE_LEVELS)):
+        value = 2 ** level
+        win = (single * met[max(a - value, 0), b] + gammon * met[max(a - 2 * value, 0), b]
+               + backgammon * met[max(a - 3 * value, 0), b])
+        lose = (single * met[a, max(b - value, 0)] + gammon * met[a, max(b - 2 * value, 0)]
+                + backgammon * met[a, max(b - 3 * value, 0)])
+        cashed = met[max(a - value, 0), b]      # the opponent passes a double of the player
+        passed = met[a, max(b - value, 0)]      # the player passes a double of the opponent
+
+        # doubling is pointless once a win at this value already takes the side home
+        redouble = cube and level + 1 < CUBE_LEVELS
+        if redouble and a > value:
+            # the opponent's take point: taking is worth as much as passing
+            hi, value_hi = _crossing(lines[level + 1, OPPONENT_OWNS], cashed), cashed
+        else:
+            hi, value_hi = 1.0, win
+        if redouble and b > value:
+            lo, value_lo = _crossing(lines[level + 1, OWNED], passed), passed
+        else:
+            lo, value_lo = 0.0, lose
+
+        lines[level, CENTERED] = (lo, hi, value_lo, value_hi)
+        lines[level, OWNED] = (0.0, hi, lose, value_hi)
+        lines[level, OPPONENT_OWNS] = (lo, 1.0, value_lo, win)
+    return lines
+
+
+def _pre_crawford(length: int, post: np.ndarray, single: float, gammon: float,
+                  backgammon: float) -> tuple[np.ndarray, np.ndarray]:
+    """
+    met[a, b]: chances of the player a away against b away at the start of a game, before
+    Crawford, and the cube lines of the games played with the cube at those scores.
+    """
+    met = np.zeros((length + 1, length + 1))
+    lines = np.zeros((length + 1, length + 1, CUBE_LEVELS, 3, 4))
+    met[0, 1:] = 1.0
+    for a in range(1, length + 1):
+        for b in range(1, length + 1):
+            if a == 1 and b == 1:
+                met[a, b] = 0.5
+            elif a == 1 or b == 1:
+                # the Crawford game: no cube, the scores after it are post-Crawford
+                trailer = max(a, b)
+                wins = (single * post[max(trailer - 1, 0)] + gammon * post[max(trailer - 2, 0)]
+                        + backgammon * post[max(trailer - 3, 0)])
+                met[a, b] = 1.0 - 0.5 * wins if a == 1 else 0.5 * wins
+            else:
+                lines[a, b] = _cube_lines(met, a, b, True, single, gammon, backgammon)
+                met[a, b] = line_value(lines[a, b, 0, CENTERED], 0.5)
+    return met, lines
+
+
+class MatchEquityTable:
+    """
+    Lookup arrays of one set of gammon rates:
+      met[post, a, b]                 chances of the player a away against b away
+      outcomes[post, a, b, level, k]  their chances after outcome k of a game played for 2 ** level
+      lines[post, a, b, level, owner] their cube line during that game (see line_value)
+    post is 1 once the Crawford game has been played; for outcomes and lines it is the
+    state of the game that follows, so it is 1 during the Crawford game as well.
+    """
+
+    def __init__(self, length: int = MAX_LENGTH, gammon_rate: float = GAMMON_RATE,
+                 backgammon_rate: float = BACKGAMMON_RATE) -> None:
+        self.length = length
+        single, gammon, backgammon = 1.0 - gammon_rate, gammon_rate - backgammon_rate, backgammon_rate
+
+        post = _post_crawford(length, single, gammon, backgammon)
+        pre, pre_lines = _pre_crawford(length, post, single, gammon, backgammon)
+        after_crawford = pre.copy()
+        after_crawford[1, 1:] = 1.0 - post[1:]
+        after_crawford[1:, 1] = post[1:]
+        after_crawford[1, 1] = 0.5
+        self.met = np.stack([pre, after_crawford])
+
+        self.lines = np.zeros((2, length + 1, length + 1, CUBE_LEVELS, 3, 4))
+        self.lines[0] = pre_lines
+        for a in range(1, length + 1):
+            for b in range(1, length + 1):
+                if a == 1 or b == 1:
+                    self.lines[1, a, b] = _cube_lines(after_crawford, a, b, True, single, gammon, backgammon)
+
+        self.outcomes = np.zeros((2, length + 1, length + 1, CUBE_LEVELS, len(OUTCOME_POINTS)))
+        away = np.arange(length + 1)
+        for level in range(CUBE_LEVELS):
+            for k, points in enumerate(OUTCOME_POINTS):
+                scored = points * 2 ** level
+                if scored > 0:
+                    after_a = np.maximum(away - scored, 0)[:, None]
+                    after_b = away[None, :]
+                else:
+                    after_a = away[:, None]
+                    after_b = np.maximum(away + scored, 0)[None, :]
+                self.outcomes[:, :, :, level, k] = self.met[:, after_a, after_b]
+
+    def equity(self, away: int, opponent_away: int, post_crawford: bool = False) -> float:
+        return float(self.met[int(post_crawford), away, opponent_away])
+
+
+# computed once per process, every decision is a lookup into it
+MET = MatchEquityTable()
+
+
+class CubeDecision(NamedTuple):
+    # in money play the three values are equities in points instead of match winning chances
+    no_double: float        # match winning chances of the side on roll if it does not double
+    double_take: float      # ... if it doubles and the opponent takes
+    double_drop: float      # ... if it doubles and the opponent passes
+    double: bool            # doubling beats not doubling whatever the answer
+    take: bool              # the opponent is better off taking
+
+
+def probabilities(outputs: Sequence[float]) -> np.ndarray:
+    """Chances of the six outcomes from the five NeuralNet outputs of the side on roll."""
+    win, win_gammon, win_backgammon, lose_gammon, lose_backgammon = outputs
+    lose = 1.0 - win
+    return np.array([win - win_gammon, win_gammon - win_backgammon, win_backgammon,
+                     lose - lose_gammon, lose_gammon - lose_backgammon, lose_backgammon])
+
+
+def cube_decision(outputs: Sequence[float], player: str, cube: DoublingCube, match: Optional[MatchState],
+                  table: MatchEquityTable = MET) -> CubeDecision:
+    """
+    Double and take decision for player, who is on roll, from the five outputs of the
+    position: dead and live cube chances mixed with CUBE_EFFICIENCY. match is None in money play.
+    """
+    if match is None:
+        return money_cube_decision(outputs, player, cube)
+    away, opponent_away = match.away(player), match.away(opponent_of(player))
+    if max(away, opponent_away) > table.length:
+        raise ValueError(f"The table only covers matches up to {table.length} points")
+
+    post = int(match.get_crawford or match.get_post_crawford)
+    level = cube.get_value.bit_length() - 1
+    rows = table.outcomes[post, away, opponent_away]
+    lines = table.lines[post, away, opponent_away]
+    p = probabilities(outputs)
+    win = float(outputs[0])
+    owner = _owner(cube, player)
+
+    no_double = (CUBE_EFFICIENCY * line_value(lines[level, owner], win)
+                 + (1.0 - CUBE_EFFICIENCY) * float(rows[level] @ p))
+    if level + 1 < CUBE_LEVELS:
+        double_take = (CUBE_EFFICIENCY * line_value(lines[level + 1, OPPONENT_OWNS], win)
+                       + (1.0 - CUBE_EFFICIENCY) * float(rows[level + 1] @ p))
+    else:
+        double_take = no_double
+    double_drop = float(rows[level, 0])
+    can_double = cube.can_double(player, match.get_crawford)
+    return CubeDecision(no_double, double_take, double_drop,
+                        bool(can_double and min(double_take, double_drop) > no_double),
+                        bool(double_take <= double_drop))
+
+
+def money_lines(outputs: Sequence[float]) -> np.ndarray:
+    """
+    lines[owner]: money equity per point of cube of the side on roll as a line in its
+    winning chance, between the take point and the cash point of the position.
+    """
+    p = probabilities(outputs)
+    win = float(outputs[0])
+    points = np.array(OUTCOME_POINTS) * p
+    # average points of a won and of a lost game
+    won = float(points[:3].sum()) / win if win > 0.0 else 1.0
+    lost = -float(points[3:].sum()) / (1.0 - win) if win < 1.0 else 1.0
+
+    take = (lost - 0.5) / (won + lost + 0.5)
+    cash = (lost + 1.0) / (won + lost + 0.5)
+    lines = np.zeros((3, 4))
+    lines[CENTERED] = (take, cash, -1.0, 1.0)
+    lines[OWNED] = (0.0, cash, -lost, 1.0)
+    lines[OPPONENT_OWNS] = (take, 1.0, -1.0, won)
+    return lines
+
+
+def money_cube_decision(outputs: Sequence[float], player: str, cube: DoublingCube) -> CubeDecision:
+    """Double and take decision for player, who is on roll, in money play: equities in points."""
+    value = cube.get_value
+    lines = money_lines(outputs)
+    win = float(outputs[0])
+    dead = float(np.array(OUTCOME_POINTS) @ probabilities(outputs))
+
+    no_double = value * (CUBE_EFFICIENCY * line_value(lines[_owner(cube, player)], win)
+                         + (1.0 - CUBE_EFFICIENCY) * dead)
+    if 2 * value <= DoublingCube.MAX_VALUE:
+        double_take = 2 * value * (CUBE_EFFICIENCY * line_value(lines[OPPONENT_OWNS], win)
+                                   + (1.0 - CUBE_EFFICIENCY) * dead)
+    else:
+        double_take = no_double
+    double_drop = float(value)
+    can_double = cube.can_double(player, False)
+    return CubeDecision(no_double, double_take, double_drop,
+                        bool(can_double and min(double_take, double_drop) > no_double),
+                        bool(double_take <= double_drop))
+
+
+def _owner(cube: DoublingCube, player: str) -> int:
+    return CENTERED if cube.get_owner is None else OWNED if cube.get_owner == player else OPPONENT_OWNS
+
+
+def evaluator_outputs(evaluator: Evaluator) -> Callable[[Sequence[int], str], np.ndarray]:
+    """
+    Five outputs for an evaluator that only gives an equity: the winning chance from
+    the equity clipped to [-1, 1], gammons at the table's rates.
+    """
+    def outputs(position: Sequence[int], player: str) -> np.ndarray:
+        win = (max(-1.0, min(1.0, evaluator.evaluate(position, player))) + 1.0) / 2.0
+        lose = 1.0 - win
+        return np.array([win, win * GAMMON_RATE, win * BACKGAMMON_RATE, lose * GAMMON_RATE, lose * BACKGAMMON_RATE])
+    return outputs
+
+
+def network_outputs(net=None) -> Callable[[Sequence[int], str], np.ndarray]:
+    """Outputs of the TD network, the default one if net is None; heuristic outputs when it has not been trained."""
+    from ai.neuralNet import NeuralNet
+    if net is None:
+        net = NeuralNet.open_default()
+    if net is None:
+        return evaluator_outputs(BearoffEvaluator(HeuristicEvaluator()))
+    return lambda position, player: net.outputs([position], player)[0]
+
+
+class MatchEquityCube:
+    """
+    Cube player for HeadlessEngine: doubles and takes from the outputs of the position
+    with the doubler on roll, through the match equity table. Without outputs it uses
+    the trained TD network, or the heuristic evaluator while none has been trained.
+    In money play (match None) the decisions come from money_cube_decision.
+    """
+
+    def __init__(self, outputs: Optional[Callable[[Sequence[int], str], np.ndarray]] = None,
+                 table: MatchEquityTable = MET) -> None:
+        if outputs is None:
+            outputs = network_outputs()
+        self._outputs = outputs
+        self._table = table
+
+    def decide(self, position: Sequence[int], player: str, cube: DoublingCube,
+               match: Optional[MatchState]) -> CubeDecision:
+        return cube_decision(self._outputs(position, player), player, cube, match, self._table)
+
+    def should_double(self, position: Sequence[int], player: str, cube: DoublingCube,
+                      match: Optional[MatchState]) -> bool:
+        return self.decide(position, player, cube, match).double
+
+    def should_take(self, position: Sequence[int], doubler: str, cube: DoublingCube,
+                    match: Optional[MatchState]) -> bool:
+        return self.decide(position, doubler, cube, match).take
+
+
+def main(argv: Optional[list[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Print the match equity table.")
+    parser.add_argument("--length", type=int, default=11)
+    args = parser.parse_args(argv)
+
+    length = min(args.length, MET.length)
+    print("away " + "".join(f"{b:>6}" for b in range(1, length + 1)))
+    for a in range(1, length + 1):
+        print(f"{a:>4} " + "".join(f"{100 * MET.equity(a, b):>6.1f}" for b in range(1, length + 1)))
+
+
+if __name__ == "__main__":
+    main()
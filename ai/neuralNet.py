@@ -0,0 +1,260 @@
+"""
+TD-Gammon style position evaluator: a small NumPy MLP over the classic 198 unit encoding.
+
+    python -m ai.neuralNet train [--games 2000] [--hidden 40] [path]   # self-play TD training
+    python -m ai.neuralNet init [--hidden 40] [path]                   # random weights only
+
+The network outputs five probabilities for the side to move: win, win a gammon, win a
+backgammon, lose a gammon, lose a backgammon. All candidate plays of a roll go through
+one encode and one matrix multiply per layer.
+
+The weights file is a small header followed by the float32 layers, so it is opened
+through np.memmap and several processes (rollout workers) share one copy.
+"""
+
+import argparse
+import os
+import struct
+import sys
+from random import Random
+from typing import Optional, Sequence
+
+import numpy as np
+
+from datastructures.Board import Board
+from datastructures.Dice import RandomDice
+from core.gameState import GameState
+from core.moveMediator import MoveMediator
+from ai import boardFeatures
+from ai.evaluator import Evaluator, opponent_of
+
+# per side: 4 units for each of the 24 points, bar, borne off; then 2 side to move units
+INPUTS = 2 * (24 * 4 + 2) + 2
+OUTPUTS = 5     # win, win gammon, win backgammon, lose gammon, lose backgammon
+
+
+def encode(positions, player: str) -> np.ndarray:
+    """(N, INPUTS) float32 inputs for board arrays with player to move."""
+    batch = boardFeatures.as_positions(positions)
+    n = len(batch)
+    points = batch[:, boardFeatures.POINTS].astype(np.float32)
+
+    sides = []
+    for counts, bar, home in ((np.maximum(points, 0), Board.WHITE_BAR, Board.WHITE_HOME),
+                              (np.maximum(-points, 0), Board.BLACK_BAR, Board.BLACK_HOME)):
+        # the TD-Gammon truncated unary code: >= 1, >= 2, >= 3, then (count - 3) / 2
+        units = np.stack([counts >= 1, counts >= 2, counts >= 3, np.maximum(counts - 3, 0) / 2], axis=2)
+        sides.append(units.reshape(n, 96).astype(np.float32))
+        sides.append(batch[:, [bar]].astype(np.float32) / 2)
+        sides.append(batch[:, [home]].astype(np.float32) / 15)
+
+    turn = np.zeros((n, 2), dtype=np.float32)
+    turn[:, 0 if player == "white" else 1] = 1.0
+    sides.append(turn)
+    return np.concatenate(sides, axis=1)
+
+
+def _sigmoid(x: np.ndarray) -> np.ndarray:
+    return 1.0 / (1.0 + np.exp(-x))
+
+
+def flip(outputs: np.ndarray) -> np.ndarray:
+    """Outputs for the other side: win <-> loss, gammons and backgammons swap sides."""
+    return np.stack([1.0 - outputs[:, 0], outputs[:, 3], outputs[:, 4], outputs[:, 1], outputs[:, 2]], axis=1)
+
+
+def equities(outputs: np.ndarray) -> np.ndarray:
+    """Cubeless equity of each output row, between -3 and 3."""
+    win, win_gammon, win_backgammon, lose_gammon, lose_backgammon = outputs.T
+    return 2.0 * win - 1.0 + win_gammon - lose_gammon + win_backgammon - lose_backgammon
+
+
+class NeuralNet:
+    """One hidden layer, sigmoid everywhere, weights as float32 arrays (memory-mapped when loaded)."""
+
+    MAGIC = b"BGNN"
+    VERSION = 1
+    HEADER = struct.Struct("<4sIIII")          # magic, version, inputs, hidden, outputs
+
+    DEFAULT_PATH = os.path.join(os.path.dirname(os.path.dirname(__file__)), "data", "td_weights.bin")
+
+    def __init__(self, hidden_weights: np.ndarray, hidden_bias: np.ndarray,
+                 output_weights: np.ndarray, output_bias: np.ndarray) -> None:
+        self.hidden_weights = hidden_weights    # (INPUTS, hidden)
+        self.hidden_bias = hidden_bias          # (hidden,)
+        self.output_weights = output_weights    # (hidden, OUTPUTS)
+        self.output_bias = output_bias          # (OUTPUTS,)
+
+    @classmethod
+    def create(cls, hidden: int = 40, seed: Optional[int] = None) -> "NeuralNet":
+        rng = np.random.default_rng(seed)
+        return cls(
+            rng.normal(0.0, 1.0 / np.sqrt(INPUTS), (INPUTS, hidden)).astype(np.float32),
+            np.zeros(hidden, dtype=np.float32),
+            rng.normal(0.0, 1.0 / np.sqrt(hidden), (hidden, OUTPUTS)).astype(np.float32),
+            np.zeros(OUTPUTS, dtype=np.float32),
+        )
+
+    @classmethod
+    def load(cls, path: str = DEFAULT_PATH, writable: bool = False) -> "NeuralNet":
+        """Maps the weights file read-only, writable gives an in-memory copy to train."""
+        if not os.path.exists(path):
+            raise FileNotFoundError(f"No network weights at {path}, train them first with "
+                                    f"'python -m ai.neuralNet train' (or 'init' for random weights)")
+        with open(path, "rb") as f:
+            magic, version, inputs, hidden, outputs = cls.HEADER.unpack(f.read(cls.HEADER.size))
+        if (magic, version, inputs, outputs) != (cls.MAGIC, cls.VERSION, INPUTS, OUTPUTS):
+            raise ValueError(f"{path} is not a network file this version can read")
+
+        flat = np.memmap(path, dtype=np.float32, mode="r", offset=cls.HEADER.size)
+        if writable:
+            flat = np.array(flat)
+        shapes = [(inputs, hidden), (hidden,), (hidden, outputs), (outputs,)]
+        arrays, start = [], 0
+        for shape in shapes:
+            size = int(np.prod(shape))
+            arrays.append(flat[start:start + size].reshape(shape))
+            start += size
+        return cls(*arrays)
+
+    @classmethod
+    def open_default(cls) -> Optional["NeuralNet"]:
+        """Loads DEFAULT_PATH, None when no network has been trained yet."""
+        if not os.path.exists(cls.DEFAULT_PATH):
+            return None
+        return cls.load(cls.DEFAULT_PATH)
+
+    def save(self, path: str = DEFAULT_PATH) -> None:
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with open(path, "wb") as out:
+            out.write(self.HEADER.pack(self.MAGIC, self.VERSION, INPUTS, self.hidden, OUTPUTS))
+            for array in (self.hidden_weights, self.hidden_bias, self.output_weights, self.output_bias):
+                out.write(np.ascontiguousarray(array, dtype=np.float32).tobytes())
+
+    @property
+    def hidden(self) -> int:
+        return self.hidden_bias.shape[0]
+
+    # Inference
+    def forward(self, inputs: np.ndarray) -> np.ndarray:
+        """(N, OUTPUTS) probabilities for a batch of encoded positions."""
+        hidden = _sigmoid(inputs @ self.hidden_weights + self.hidden_bias)
+        return _sigmoid(hidden @ self.output_weights + self.output_bias)
+
+    def outputs(self, positions, player: str) -> np.ndarray:
+        return self.forward(encode(positions, player))
+
+    # Training
+    def train_step(self, inputs: np.ndarray, targets: np.ndarray, rate: float) -> float:
+        """One gradient step on the squared error towards targets, returns the mean error."""
+        hidden = _sigmoid(inputs @ self.hidden_weights + self.hidden_bias)
+        outputs = _sigmoid(hidden @ self.output_weights + self.output_bias)
+
+        error = outputs - targets
+        output_delta = error * outputs * (1.0 - outputs)
+        hidden_delta = (output_delta @ self.output_weights.T) * hidden * (1.0 - hidden)
+
+        self.output_weights -= rate * (hidden.T @ output_delta)
+        self.output_bias -= rate * output_delta.sum(axis=0)
+        self.hidden_weights -= rate * (inputs.T @ hidden_delta)
+        self.hidden_bias -= rate * hidden_delta.sum(axis=0)
+        return float((error ** 2).mean())
+
+
+class NeuralNetEvaluator(Evaluator):
+    """Scores positions with a NeuralNet, all positions of one evaluate_many call in one batch."""
+
+    MAX_EQUITY = 3.0
+
+    def __init__(self, net: Optional[NeuralNet] = None) -> None:
+        self._net = net if net is not None else NeuralNet.load()
+
+    def evaluate(self, position: Sequence[int], player: str) -> float:
+        return self.evaluate_many([position], player)[0]
+
+    def evaluate_many(self, positions: Sequence[Sequence[int]], player: str) -> list[float]:
+        return equities(self._net.outputs(positions, player)).tolist()
+
+
+def _outcome(position: Sequence[int], player: str) -> np.ndarray:
+    """Target outputs for player once the game in position is over."""
+    for winner in ("white", "black"):
+        if position[Board.HOME_SLOT[winner]] == 15:
+            points = GameState.game_value(position, winner)
+            won = np.array([[1.0, points >= 2, points == 3, 0.0, 0.0]], dtype=np.float32)
+            return won if winner == player else flip(won)
+    raise ValueError("Game is not over")
+
+
+def train(net: NeuralNet, games: int, rate: float = 0.01, seed: int = 0, progress=None) -> None:
+    """
+    TD(0) self-play: the net plays both sides greedily, and after each game every position
+    is moved towards the net's value of the next position (the result for the last one).
+    """
+    rng = Random(seed)
+    for game in range(games):
+        game_state = GameState(RandomDice(rng.getrandbits(32)))
+        position = tuple(Board().get_counts)
+        player = "white"
+        inputs, targets = [], []
+
+        while True:
+            moves = GameState.explode_dice(game_state.roll_dice())
+            plays = MoveMediator.generate_moves(position, player, moves)
+            opponent = opponent_of(player)
+
+            before = encode([position], player)
+            if plays:
+                values = net.outputs([after for _, after in plays], opponent)
+                best = int(np.argmin(equities(values)))
+                position = plays[best][1]
+                target = flip(values[best:best + 1])
+            else:
+                target = flip(net.outputs([position], opponent))
+
+            if position[Board.HOME_SLOT[player]] == 15:
+                target = _outcome(position, player)
+            inputs.append(before)
+            targets.append(target)
+            if position[Board.HOME_SLOT[player]] == 15:
+                break
+
+            game_state.next_turn()
+            player = opponent
+
+        error = net.train_step(np.concatenate(inputs), np.concatenate(targets), rate)
+        if progress is not None:
+            progress(game + 1, error)
+
+
+def main(argv: Optional[list[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Create or train the TD network weights file.")
+    parser.add_argument("command", choices=["init", "train"])
+    parser.add_argument("path", nargs="?", default=NeuralNet.DEFAULT_PATH)
+    parser.add_argument("--hidden", type=int, default=40)
+    parser.add_argument("--games", type=int, default=2000)
+    parser.add_argument("--rate", type=float, default=0.01)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_intermixed_args(argv)
+
+    if args.command == "train" and os.path.exists(args.path):
+        net = NeuralNet.load(args.path, writable=True)
+    else:
+        net = NeuralNet.create(args.hidden, args.seed)
+
+    if args.command == "train":
+        def report(done: int, error: float) -> None:
+            if done % 100 == 0:
+                print(f"  {done}/{args.games} games, error {error:.4f}", file=sys.stderr)
+                net.save(args.path)
+
+        train(net, args.games, args.rate, args.seed, report)
+
+    net.save(args.path)
+    print(f"wrote {args.path} ({net.hidden} hidden units)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,232 @@
+"""
+Monte Carlo rollouts: finishes a position thousands of times with a fast policy
+and reports the mean result with a confidence interval.
+
+    python -m ai.rollout position.json --trials 1296 --workers 4
+
+position.json holds {"points": [...28 slots...], "player": "white", "dice": [a, b]};
+every legal play for the dice is rolled out with the same dice sequences, best first.
+
+Games are played on raw board arrays straight through MoveMediator.generate_moves,
+no Board, Stack or Stone objects are built. Two variance reductions are used:
+  - stratified first roll: trial pairs cycle through the 36 ordered rolls, so every
+    first roll is played equally often instead of as often as chance allows
+  - mirrored dice: each dice sequence is also played with every die d replaced by
+    7 - d, and the two games count as one sample
+Every trial pair is seeded from (seed, pair index), so results do not depend on
+how the pairs are split over the worker processes. A pair with a game still going after
+max_turns turns is dropped, so its mirror does not count alone, and the summaries
+report the unfinished games apart.
+"""
+
+import argparse
+import json
+import math
+import os
+from multiprocessing import Pool
+from typing import Iterator, Optional, Sequence, Union
+
+from datastructures.Board import Board
+from datastructures.Dice import DiceSource, RandomDice
+from core.gameState import GameState
+from core.moveMediator import MoveMediator
+from core.players import Play, Player
+from ai.agents import AGENTS
+from ai.evaluator import opponent_of
+
+# first roll of trial pair k, mirroring it gives ORDERED_ROLLS[35 - k]
+ORDERED_ROLLS = [(a, b) for a in range(1, 7) for b in range(1, 7)]
+STRATA = len(ORDERED_ROLLS)
+
+# two sided normal quantile for the reported interval
+Z_95 = 1.959964
+
+
+def apply_play(position: Sequence[int], player: str, play: Play) -> tuple[int, ...]:
+    """Board array after player makes play, the steps are MoveMediator.generate_moves steps."""
+    points = list(position)
+    sign = Board.SIGN[player]
+    opponent_bar = Board.BAR_SLOT[opponent_of(player)]
+    for from_stack, to_stack in play:
+        if from_stack == Board.BAR_SLOT[player]:
+            points[from_stack] -= 1
+        else:
+            points[from_stack] -= sign
+        if to_stack == Board.HOME_SLOT[player]:
+            points[to_stack] += 1
+            continue
+        if points[to_stack] * sign == -1:
+            points[to_stack] = 0
+            points[opponent_bar] += 1
+        points[to_stack] += sign
+    return tuple(points)
+
+
+def dice_sequence(dice: DiceSource, first: tuple[int, int], mirrored: bool) -> Iterator[tuple[int, int]]:
+    """first, then the rolls of dice, with every die flipped to 7 - d when mirrored."""
+    yield (7 - first[0], 7 - first[1]) if mirrored else first
+    while True:
+        a, b = dice.roll()
+        yield (7 - a, 7 - b) if mirrored else (a, b)
+
+
+def play_out(position: Sequence[int], to_move: str, players: dict[str, Player],
+             dice: Iterator[tuple[int, int]], max_turns: int = 1000) -> tuple[Optional[str], int]:
+    """Plays position to the end, returns (winner, points); winner is None if max_turns ran out."""
+    position = tuple(position)
+    for _ in range(max_turns):
+        for color in ("white", "black"):
+            if position[Board.HOME_SLOT[color]] == 15:
+                return color, GameState.game_value(position, color)
+
+        moves = GameState.explode_dice(next(dice))
+        plays = MoveMediator.generate_moves(position, to_move, moves)
+        if plays:
+            if len(plays) == 1:
+                position = plays[0][1]
+            else:
+                # policies only look at the plays, no Board is kept during a rollout
+                steps = players[to_move](None, to_move, tuple(moves), plays)
+                position = apply_play(position, to_move, steps)
+        to_move = opponent_of(to_move)
+    return None, 0
+
+
+def rollout_pairs(task: tuple[tuple[int, ...], str, list[Optional[Play]], str, int, int, int, int]) -> list[tuple]:
+    """
+    Plays trial pairs [start, stop) for every candidate, runs inside the pool workers.
+    Returns (pair, [(mean result, wins, gammons, backgammons, unfinished) per candidate])
+    rows, results are for player, who makes the candidate play. unfinished counts the
+    games of the pair that ran out of turns, the other fields only hold when it is 0.
+    """
+    position, player, candidates, policy, seed, start, stop, max_turns = task
+    # seeded by the chunk, which does not depend on the number of workers
+    players = {"white": AGENTS[policy](seed + 2 * start), "black": AGENTS[policy](seed + 2 * start + 1)}
+    opponent = opponent_of(player)
+
+    rows = []
+    for pair in range(start, stop):
+        first = ORDERED_ROLLS[pair % STRATA]
+        outcomes = []
+        for play in candidates:
+            after = apply_play(position, player, play) if play is not None else position
+            to_move = opponent if play is not None else player
+
+            total, wins, gammons, backgammons, unfinished = 0, 0, 0, 0, 0
+            for mirrored in (False, True):
+                # the same dice for every candidate keeps their comparison sharp
+                dice = dice_sequence(RandomDice(f"{seed}:{pair}"), first, mirrored)
+                winner, points = play_out(after, to_move, players, dice, max_turns)
+                if winner is None:
+                    unfinished += 1
+                    continue
+                wins += winner == player
+                gammons += points >= 2
+                backgammons += points == 3
+                total += points if winner == player else -points
+            outcomes.append((total / 2, wins, gammons, backgammons, unfinished))
+        rows.append((pair, outcomes))
+    return rows
+
+
+def summarize(rows: list[tuple], candidate: int) -> dict:
+    """
+    Mean, standard error and 95% interval of one candidate over the pairs that finished
+    both games; all NaN when none did.
+    """
+    unfinished = sum(outcomes[candidate][4] for _, outcomes in rows)
+    samples = [(pair % STRATA, outcomes[candidate]) for pair, outcomes in rows if not outcomes[candidate][4]]
+    values = [outcome[0] for _, outcome in samples]
+    n = len(values)
+    if not n:
+        return {"equity": math.nan, "std_error": math.nan, "ci_low": math.nan, "ci_high": math.nan,
+                "trials": 0, "unfinished": unfinished, "win_rate": math.nan, "gammon_rate": math.nan,
+                "backgammon_rate": math.nan}
+    mean = sum(values) / n
+
+    by_stratum: dict[int, list[float]] = {}
+    for stratum, outcome in samples:
+        by_stratum.setdefault(stratum, []).append(outcome[0])
+
+    if len(by_stratum) == STRATA and all(len(v) > 1 for v in by_stratum.values()):
+        # stratified estimate, every first roll weighted 1/36
+        mean = sum(sum(v) / len(v) for v in by_stratum.values()) / STRATA
+        variance = sum(_sample_variance(v) / len(v) for v in by_stratum.values()) / STRATA ** 2
+    else:
+        variance = _sample_variance(values) / n if n > 1 else 0.0
+
+    error = math.sqrt(variance)
+    games = 2 * n
+    return {
+        "equity": mean,
+        "std_error": error,
+        "ci_low": mean - Z_95 * error,
+        "ci_high": mean + Z_95 * error,
+        "trials": games,
+        "unfinished": unfinished,
+        "win_rate": sum(o[1] for _, o in samples) / games,
+        "gammon_rate": sum(o[2] for _, o in samples) / games,
+        "backgammon_rate": sum(o[3] for _, o in samples) / games,
+    }
+
+
+def _sample_variance(values: list[float]) -> float:
+    mean = sum(values) / len(values)
+    return sum((v - mean) ** 2 for v in values) / (len(values) - 1)
+
+
+def rollout(board: Union[Board, Sequence[int]], player: str, candidates: Sequence[Optional[Play]] = (None,),
+            trials: int = 1296, workers: int = 1, policy: str = "heuristic", seed: int = 0,
+            max_turns: int = 1000, chunk: int = 36) -> list[dict]:
+    """
+    Rolls out each candidate play for player from board, one summary per candidate.
+    A None candidate rolls out the position itself with player on roll. trials counts
+    games and is rounded up to whole mirrored pairs; multiples of 72 cover every
+    first roll equally. A summary's trials only count the finished pairs' games, the
+    games given up after max_turns turns are its unfinished count.
+    """
+    position = tuple(board.get_counts if isinstance(board, Board) else board)
+    candidates = list(candidates)
+    pairs = (trials + 1) // 2
+    tasks = [(position, player, candidates, policy, seed, start, min(start + chunk, pairs), max_turns)
+             for start in range(0, pairs, chunk)]
+
+    rows: list[tuple] = []
+    if workers <= 1:
+        for task in tasks:
+            rows.extend(rollout_pairs(task))
+    else:
+        with Pool(workers) as pool:
+            for part in pool.imap_unordered(rollout_pairs, tasks):
+                rows.extend(part)
+
+    rows.sort()
+    return [summarize(rows, i) for i in range(len(candidates))]
+
+
+def main(argv: Optional[list[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Roll out every legal play of a position.")
+    parser.add_argument("position", help="JSON file with points, player and dice")
+    parser.add_argument("-n", "--trials", type=int, default=1296)
+    parser.add_argument("-w", "--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--policy", choices=sorted(AGENTS), default="heuristic")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    with open(args.position) as f:
+        spec = json.load(f)
+    plays = MoveMediator.generate_moves(spec["points"], spec["player"], spec["dice"])
+    candidates = [steps for steps, _ in plays] or [()]
+
+    results = rollout(spec["points"], spec["player"], candidates, args.trials, args.workers,
+                      args.policy, args.seed)
+    ranked = sorted(zip(candidates, results), key=lambda item: -item[1]["equity"])
+    for steps, result in ranked:
+        play = " ".join(f"{a}/{b}" for a, b in steps) or "(no move)"
+        print(f"{play:<24} {result['equity']:+.3f} +-{Z_95 * result['std_error']:.3f}  "
+              f"win {result['win_rate']:.3f}  gammon {result['gammon_rate']:.3f}"
+              + (f"  unfinished {result['unfinished']}" if result["unfinished"] else ""))
+
+
+if __name__ == "__main__":
+    main()
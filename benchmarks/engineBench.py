@@ -0,0 +1,380 @@
+"""
+Benchmarks for the engine hot paths.
+
+    python -m benchmarks.engineBench run --output before.json
+    python -m benchmarks.engineBench run --output after.json
+    python -m benchmarks.engineBench compare before.json after.json
+    python -m benchmarks.engineBench positions      # regenerate the stored reference positions
+
+Every benchmark runs over the stored reference positions (reference_positions.json)
+with fixed seeds, so two runs on the same machine measure the same work. The
+GameEngine and Renderer benchmarks need pygame and run on SDL's dummy video
+driver; they are reported as skipped when pygame is missing.
+"""
+
+import argparse
+import json
+import os
+import platform
+import sys
+import time
+from random import Random
+from typing import Callable, Optional
+
+from datastructures.Board import Board
+from datastructures.Dice import RandomDice
+from core.gameState import GameState
+from core.headlessEngine import HeadlessEngine
+from core.moveMediator import MoveMediator
+from core.players import RandomPlayer
+
+POSITIONS_PATH = os.path.join(os.path.dirname(__file__), "reference_positions.json")
+SEED = 20251018
+
+
+# Reference positions
+def generate_reference_positions(count: int = 32, seed: int = SEED) -> list[dict]:
+    """Samples positions from seeded random games, spread over opening, middle game and bear-off."""
+    rng = Random(seed)
+    positions = []
+    game = 0
+    while len(positions) < count:
+        samples: list[dict] = []
+
+        def record(board, player, dice, plays):
+            samples.append({"points": list(board.get_counts), "player": player, "dice": list(dice)})
+            return plays[rng.randrange(len(plays))][0]
+
+        HeadlessEngine(record, record, game_state=GameState(RandomDice(f"{seed}:{game}"))).run()
+        positions.extend(samples[i] for i in sorted(rng.sample(range(len(samples)), min(4, len(samples)))))
+        game += 1
+    return positions[:count]
+
+
+def load_reference_positions(path: str = POSITIONS_PATH) -> list[dict]:
+    with open(path) as f:
+        return json.load(f)
+
+
+# Timing
+def measure(body: Callable[[], int], repeat: int) -> dict:
+    """Runs body repeat times; body returns how many operations it performed."""
+    best = float("inf")
+    total_time = 0.0
+    total_ops = 0
+    for _ in range(repeat):
+        start = time.perf_counter()
+        ops = body()
+        elapsed = time.perf_counter() - start
+        best = min(best, elapsed / ops)
+        total_time += elapsed
+        total_ops += ops
+    return {"mean_us": total_time / total_ops * 1e6, "best_us": best * 1e6, "ops": total_ops}
+
+
+def _mediator_for(position: dict) -> tuple[Board, GameState, MoveMediator]:
+    board = Board.from_counts(position["points"])
+    game_state = GameState()
+    game_state.set_current_player(position["player"])
+    game_state.set_dice(tuple(position["dice"]))
+    return board, game_state, MoveMediator(board, game_state)
+
+
+def _first_steps(position: dict) -> list[tuple[int, int]]:
+    plays = MoveMediator.generate_moves(position["points"], position["player"], position["dice"])
+    return sorted({steps[0] for steps, _ in plays})
+
+
+# Benchmarks
+def bench_validate_move(positions: list[dict], repeat: int) -> dict:
+    cases = []
+    for position in positions:
+        board, _, mediator = _mediator_for(position)
+        player = position["player"]
+        sources = [board.get_bar] if board.bar_count(player) else list(range(1, 25))
+        cases.append((mediator, [(s, t) for s in sources for t in range(26)]))
+
+    def body():
+        ops = 0
+        for mediator, pairs in cases:
+            for from_stack, to_stack in pairs:
+                mediator.validate_move(from_stack, to_stack)
+            ops += len(pairs)
+        return ops
+    return measure(body, repeat)
+
+
+def bench_execute_move(positions: list[dict], repeat: int) -> dict:
+    cases = []
+    for position in positions:
+        board, game_state, _ = _mediator_for(position)
+        steps = _first_steps(position)
+        if steps:
+            cases.append((board, game_state, position["player"], steps))
+
+    def body():
+        ops = 0
+        for board, game_state, player, steps in cases:
+            for from_stack, to_stack in steps:
+                copy = board.copy()
+                origin = copy.get_bar if from_stack == Board.BAR_SLOT[player] else from_stack
+                MoveMediator(copy, game_state).execute_move(origin, to_stack)
+            ops += len(steps)
+        return ops
+    return measure(body, repeat)
+
+
+def bench_board_copy(positions: list[dict], repeat: int) -> dict:
+    boards = [_mediator_for(position)[0] for position in positions]
+
+    def body():
+        for board in boards:
+            board.copy()
+        return len(boards)
+    return measure(body, repeat)
+
+
+def bench_move_stone(positions: list[dict], repeat: int) -> dict:
+    cases = []
+    for position in positions:
+        board = _mediator_for(position)[0]
+        player = position["player"]
+        for from_stack, to_stack in _first_steps(position):
+            if to_stack in (Board.WHITE_HOME, Board.BLACK_HOME) or board.count(to_stack):
+                continue
+            origin = board.get_bar if from_stack == Board.BAR_SLOT[player] else from_stack
+            cases.append((board, player, origin, to_stack))
+
+    def body():
+        # each case moves a stone out and straight back, two move_stone calls
+        for board, player, origin, to_stack in cases:
+            board.move_stone(player, origin, to_stack)
+            board.move_stone(player, to_stack, origin)
+        return 2 * len(cases)
+    return measure(body, repeat)
+
+
+def bench_make_unmake(positions: list[dict], repeat: int) -> dict:
+    cases = []
+    for position in positions:
+        board = _mediator_for(position)[0]
+        for steps, _ in MoveMediator.generate_moves(position["points"], position["player"], position["dice"]):
+            cases.append((board, steps))
+
+    def body():
+        # each case makes every step of a full play and takes them back in reverse
+        ops = 0
+        for board, steps in cases:
+            deltas = [board.make_move(from_stack, to_stack) for from_stack, to_stack in steps]
+            for delta in reversed(deltas):
+                board.unmake_move(delta)
+            ops += len(steps)
+        return ops
+    return measure(body, repeat)
+
+
+def bench_generate_moves(positions: list[dict], repeat: int) -> dict:
+    def body():
+        for position in positions:
+            MoveMediator.generate_moves(position["points"], position["player"], position["dice"])
+        return len(positions)
+    return measure(body, repeat)
+
+
+def bench_headless_game(positions: list[dict], repeat: int) -> dict:
+    games = 5
+
+    def body():
+        for game in range(games):
+            HeadlessEngine(RandomPlayer(game), RandomPlayer(game + 1000),
+                           game_state=GameState(RandomDice(f"{SEED}:{game}"))).run()
+        return games
+    return measure(body, repeat)
+
+
+_engine = None
+
+
+def _pygame_engine():
+    """One GameEngine on SDL's dummy driver shared by the pygame benchmarks, None without pygame."""
+    global _engine
+    if _engine is None:
+        os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+        os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+        # keep pygame's import banner out of the JSON on stdout
+        os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+        try:
+            from core.gameEngine import GameEngine
+        except ImportError:
+            return None
+        _engine = GameEngine()
+    return _engine
+
+
+def _load_engine_position(engine, position: dict) -> None:
+    engine._board.set_counts(position["points"])
+    engine._game_state.set_current_player(position["player"])
+    engine._moves_remaining = list(position["dice"])
+    engine._finals = None
+    engine._set_game_dice(tuple(position["dice"]))
+    engine._refresh_legal_plays()
+
+
+def bench_engine_legal_moves(positions: list[dict], repeat: int) -> Optional[dict]:
+    """GameEngine turn probing: regenerating the legal plays plus _any_legal_moves."""
+    engine = _pygame_engine()
+    if engine is None:
+        return None
+
+    def body():
+        for position in positions:
+            _load_engine_position(engine, position)
+            engine._any_legal_moves()
+        return len(positions)
+    return measure(body, repeat)
+
+
+def bench_engine_valid_destinations(positions: list[dict], repeat: int) -> Optional[dict]:
+    engine = _pygame_engine()
+    if engine is None:
+        return None
+    cases = []
+    for position in positions:
+        player = position["player"]
+        sources = [s for s in range(1, 25) if position["points"][s] * Board.SIGN[player] > 0]
+        cases.append((position, sources))
+
+    def body():
+        ops = 0
+        for position, sources in cases:
+            _load_engine_position(engine, position)
+            for source in sources:
+                engine._get_valid_destinations(source)
+            ops += len(sources)
+        return ops
+    return measure(body, repeat)
+
+
+def bench_draw_frame(positions: list[dict], repeat: int) -> Optional[dict]:
+    engine = _pygame_engine()
+    if engine is None:
+        return None
+    renderer = engine._renderer
+    renderer.init()
+
+    # draw every position with the destinations of its first legal step highlighted
+    cases = []
+    for position in positions:
+        steps = _first_steps(position)
+        highlights = [to_stack for from_stack, to_stack in steps if from_stack == steps[0][0]] if steps else []
+        cases.append((position, highlights))
+
+    def body():
+        for position, highlights in cases:
+            engine._board.set_counts(position["points"])
+            renderer.highlight_stacks(highlights)
+            renderer.draw_frame(position["player"], tuple(position["dice"]))
+        return len(cases)
+    return measure(body, repeat)
+
+
+BENCHMARKS: dict[str, Callable[[list[dict], int], Optional[dict]]] = {
+    "MoveMediator.validate_move": bench_validate_move,
+    "MoveMediator.execute_move": bench_execute_move,
+    "MoveMediator.generate_moves": bench_generate_moves,
+    "Board.copy": bench_board_copy,
+    "Board.move_stone": bench_move_stone,
+    "Board.make_unmake": bench_make_unmake,
+    "GameEngine._any_legal_moves": bench_engine_legal_moves,
+    "GameEngine._get_valid_destinations": bench_engine_valid_destinations,
+    "Renderer.draw_frame": bench_draw_frame,
+    "HeadlessEngine.game": bench_headless_game,
+}
+
+
+def run(repeat: int = 5, only: Optional[list[str]] = None) -> dict:
+    positions = load_reference_positions()
+    results = {}
+    for name, bench in BENCHMARKS.items():
+        if only and not any(part in name for part in only):
+            continue
+        result = bench(positions, repeat)
+        results[name] = result if result is not None else {"skipped": True}
+    return {
+        "meta": {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "seed": SEED,
+            "positions": len(positions),
+            "repeat": repeat,
+            "time": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        },
+        "results": results,
+    }
+
+
+def compare(before: dict, after: dict, threshold: float = 0.05) -> list[str]:
+    """One line per benchmark; changes within threshold count as unchanged."""
+    lines = [f"{'benchmark':<38} {'before us':>11} {'after us':>11} {'change':>8}"]
+    for name, old in before["results"].items():
+        new = after["results"].get(name)
+        if new is None or old.get("skipped") or new.get("skipped"):
+            lines.append(f"{name:<38} {'-':>11} {'-':>11}   skipped")
+            continue
+        ratio = new["best_us"] / old["best_us"]
+        if ratio < 1 - threshold:
+            verdict = f"{1 / ratio:.2f}x faster"
+        elif ratio > 1 + threshold:
+            verdict = f"{ratio:.2f}x slower"
+        else:
+            verdict = "unchanged"
+        lines.append(f"{name:<38} {old['best_us']:>11.2f} {new['best_us']:>11.2f}   {verdict}")
+    return lines
+
+
+def main(argv: Optional[list[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Engine hot path benchmarks.")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    run_parser = commands.add_parser("run", help="run the benchmarks and write JSON results")
+    run_parser.add_argument("--output", help="write results to this file instead of stdout")
+    run_parser.add_argument("--repeat", type=int, default=5)
+    run_parser.add_argument("--only", nargs="*", help="run benchmarks whose name contains any of these")
+
+    compare_parser = commands.add_parser("compare", help="compare two result files")
+    compare_parser.add_argument("before")
+    compare_parser.add_argument("after")
+    compare_parser.add_argument("--threshold", type=float, default=0.05)
+
+    commands.add_parser("positions", help="regenerate the stored reference positions")
+    args = parser.parse_args(argv)
+
+    if args.command == "run":
+        results = run(args.repeat, args.only)
+        text = json.dumps(results, indent=2)
+        if args.output:
+            with open(args.output, "w") as f:
+                f.write(text + "\n")
+            for name, result in results["results"].items():
+                timing = "skipped" if result.get("skipped") else f"{result['best_us']:.2f} us"
+                print(f"  {name:<38} {timing}", file=sys.stderr)
+            print(f"wrote {len(results['results'])} benchmarks to {args.output}", file=sys.stderr)
+        else:
+            print(text)
+
+    elif args.command == "compare":
+        with open(args.before) as f:
+            before = json.load(f)
+        with open(args.after) as f:
+            after = json.load(f)
+        print("\n".join(compare(before, after, args.threshold)))
+
+    elif args.command == "positions":
+        with open(POSITIONS_PATH, "w") as f:
+            # one position per line keeps the file diffable
+            f.write("[\n" + ",\n".join(json.dumps(p) for p in generate_reference_positions()) + "\n]\n")
+        print(f"wrote {POSITIONS_PATH}", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -20,6 +20,7 @@ class CommandManager:
         self._undone.append(command)
 
     def redo(self) -> None:
+        # commands replay what their first execute did, e.g. MoveCommand its board delta and turn
         if not self._undone:
             raise RuntimeError("No commands to redo")
 
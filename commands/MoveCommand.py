@@ -1,31 +1,45 @@
 from typing import Optional, Union
 from commands.command import Command
 from datastructures.Bar import Bar
-from datastructures.Stone import Stone
+from datastructures.Board import Board
 from core.moveMediator import MoveMediator
 
 
 class MoveCommand(Command):
+    # the first execute goes through the mediator's validation, afterwards the command
+    # only keeps the (from_slot, to_slot, hit) delta of Board.make_move: undo takes it
+    # back and redo plays it again, both in constant time and without re-validating
+    # the turn (side on roll, dice left) is restored with the board: undo puts back the
+    # turn from before the move, redo the one undo found, whoever used up the die since
 
     def __init__(self, mediator: MoveMediator, from_stack: Union[int, Bar], to_stack: int):
         self._mediator = mediator
         self.from_stack = from_stack
         self.to_stack = to_stack
 
-        self._moved_stone: Optional[Stone] = None
-        self._hit_stone: Optional[Stone] = None
-        self._used_die: Optional[int] = None
+        self.delta: Optional[tuple[int, int, bool]] = None
+        self._turn_before: Optional[tuple[str, tuple[int, ...], bool]] = None
+        self._turn_after: Optional[tuple[str, tuple[int, ...], bool]] = None
 
     def execute(self):
-        self._moved_stone, self._hit_stone = self._mediator.execute_move(self.from_stack, self.to_stack)
+        board = self._mediator.get_board
+        game_state = self._mediator.get_game_state
+        if self.delta is not None:
+            # redo of a move that was validated the first time
+            board.make_move(self.delta[0], self.delta[1])
+            game_state.restore_turn(self._turn_after)
+            return
+
+        turn = game_state.get_turn
+        moved_color, hit_color = self._mediator.execute_move(self.from_stack, self.to_stack)
+        from_slot = Board.BAR_SLOT[moved_color] if isinstance(self.from_stack, Bar) else self.from_stack
+        self.delta = (from_slot, self.to_stack, hit_color is not None)
+        self._turn_before = turn
 
     def undo(self):
-         # still thinking of way to handle the undoing command and wher should i put the logic
-        self._mediator.move_stone(self._moved_stone, self.to_stack, self.from_stack)
-
-        # Restore hit stone if any
-        if self.hit_stone:
-            self._mediator.move_stone(self._hit_stone, self._mediator._board.get_bar, self.to_stack)
-
-
-    
\ No newline at end of file
+        if self.delta is None:
+            raise RuntimeError("Cannot undo a move that was never executed")
+        game_state = self._mediator.get_game_state
+        self._turn_after = game_state.get_turn
+        self._mediator.get_board.unmake_move(self.delta)
+        game_state.restore_turn(self._turn_before)
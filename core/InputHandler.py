@@ -1,29 +1,49 @@
 import pygame as pg
 from typing import Optional
-from core.eventHandler import eventHandler
+from core.eventBus import EventBus
+from core.events import ClickStack, QuitEvent, ResetSelection, RollDiceRequest, ToggleStats
 from presentation.Renderer import Renderer
 
 
 class InputHandler:
-    def __init__(self, renderer: Renderer, events: eventHandler) -> None:
+    def __init__(self, renderer: Renderer, events: EventBus) -> None:
         self.renderer = renderer
         self.events = events
+        self._pending: Optional[pg.event.Event] = None     # the event wait returned with
+
+    def wait(self, timeout_ms: int) -> None:
+        """
+        Sleeps until an event arrives or timeout_ms passes, instead of polling while
+        nothing happens. The event is handled by the next process_events.
+        """
+        event = pg.event.wait(timeout_ms)
+        if event.type != pg.NOEVENT:
+            self._pending = event
 
     def process_events(self) -> bool:
         """
         Process all Pygame events for this frame.
         Returns False if the game should quit.
         """
-        for event in pg.event.get():
+        events = pg.event.get()
+        if self._pending is not None:
+            events.insert(0, self._pending)
+            self._pending = None
+        for event in events:
             if event.type == pg.QUIT:
-                self.events.append({"type": "QuitEvent"})
+                self.events.publish(QuitEvent())
                 return False
 
             if event.type == pg.KEYDOWN:
                 if event.key == pg.K_ESCAPE:
-                    self.events.append({"type": "ResetSelection"})
+                    self.events.publish(ResetSelection())
                 elif event.key == pg.K_r:
-                    self.events.append({"type": "RollDiceRequest"})
+                    self.events.publish(RollDiceRequest())
+                elif event.key == pg.K_F3:
+                    self.events.publish(ToggleStats())
+
+            if event.type in (pg.WINDOWEXPOSED, pg.WINDOWRESTORED, pg.WINDOWSIZECHANGED):
+                self.renderer.request_redraw()
 
             if event.type == pg.MOUSEBUTTONDOWN and event.button == 1:  
                 self._handle_left_click(event.pos)
@@ -34,7 +54,4 @@ class InputHandler:
         """Convert a click position into a ClickStack event (if valid)."""
         stack_id = self.renderer.get_stack_from_pos(pos)
         if stack_id is not None:
-            self.events.append({
-                "type": "ClickStack",
-                "stack_id": stack_id
-            })
+            self.events.publish(ClickStack(stack_id))
@@ -0,0 +1,72 @@
+from collections import deque
+from time import perf_counter
+from typing import Callable, Optional
+
+from core.events import Event
+
+Handler = Callable[[Event], None]
+
+
+class EventBus:
+    """
+    FIFO of typed events with a dispatch table from event type to handlers.
+
+    Producers publish events, the engine drains the queue once per frame. A drain only
+    handles the events that were queued when it started and stops early once its time
+    budget is spent, so a burst of input is spread over several frames instead of
+    stalling one. Events without a handler are dropped.
+    """
+
+    def __init__(self) -> None:
+        self._queue: deque[Event] = deque()
+        self._handlers: dict[type, list[Handler]] = {}
+
+    # handler lists are replaced, never changed in place, so a handler that subscribes or
+    # unsubscribes during a dispatch only changes what the next events see
+    def subscribe(self, event_type: type, handler: Handler) -> None:
+        """Adds handler for event_type, handlers run in the order they subscribed."""
+        self._handlers[event_type] = self._handlers.get(event_type, []) + [handler]
+
+    def unsubscribe(self, event_type: type, handler: Handler) -> None:
+        handlers = self._handlers.get(event_type, [])
+        if handler not in handlers:
+            raise ValueError(f"{handler!r} is not subscribed to {event_type.__name__}")
+        # only the first subscription goes, a handler subscribed twice keeps running once
+        rest = list(handlers)
+        rest.remove(handler)
+        if rest:
+            self._handlers[event_type] = rest
+        else:
+            del self._handlers[event_type]
+
+    def publish(self, event: Event) -> None:
+        self._queue.append(event)
+
+    def pop_event(self) -> Optional[Event]:
+        return self._queue.popleft() if self._queue else None
+
+    def empty_events(self) -> bool:
+        return not self._queue
+
+    def __len__(self) -> int:
+        return len(self._queue)
+
+    def dispatch(self, event: Event) -> None:
+        for handler in self._handlers.get(type(event), ()):
+            handler(event)
+
+    def drain(self, budget: Optional[float] = None) -> int:
+        """Handles this frame's events, within budget seconds if given; returns how many were handled."""
+        queue = self._queue
+        handlers = self._handlers
+        deadline = perf_counter() + budget if budget is not None else None
+
+        handled = 0
+        for _ in range(len(queue)):
+            event = queue.popleft()
+            for handler in handlers.get(type(event), ()):
+                handler(event)
+            handled += 1
+            if deadline is not None and perf_counter() >= deadline:
+                break
+        return handled
@@ -0,0 +1,50 @@
+from typing import Union
+
+from datastructures.Bar import Bar
+
+
+class Event:
+    # events are small slotted objects, the bus dispatches on their type
+    __slots__ = ()
+
+    def __repr__(self) -> str:
+        fields = ", ".join(f"{name}={getattr(self, name)!r}" for name in self.__slots__)
+        return f"{type(self).__name__}({fields})"
+
+
+class QuitEvent(Event):
+    __slots__ = ()
+
+
+class ResetSelection(Event):
+    __slots__ = ()
+
+
+class RollDiceRequest(Event):
+    __slots__ = ()
+
+
+class ToggleStats(Event):
+    __slots__ = ()
+
+
+class ClickStack(Event):
+    __slots__ = ("stack_id",)
+
+    def __init__(self, stack_id: int) -> None:
+        self.stack_id = stack_id
+
+
+class BarSelected(Event):
+    __slots__ = ("destinations",)
+
+    def __init__(self, destinations: list[int]) -> None:
+        self.destinations = destinations
+
+
+class MoveEvent(Event):
+    __slots__ = ("from_stack", "to_stack")
+
+    def __init__(self, from_stack: Union[int, Bar], to_stack: int) -> None:
+        self.from_stack = from_stack
+        self.to_stack = to_stack
@@ -0,0 +1,133 @@
+"""
+Per-frame timings and counters of GameEngine.run.
+
+    python -m core.gameEngine --stats                    # F3 shows and hides the overlay
+    python -m core.gameEngine --stats-file frames.txt    # histograms written when the game ends
+
+Every frame the engine times its phases: input (InputHandler.process_events), events
+(the EventBus drain), computer (a computer side playing its roll), draw
+(Renderer.draw_frame) and idle (the sleep in clock.tick), plus the whole frame.
+legal_moves is the move generation done inside the events and computer phases. It
+also counts the validate_move calls, the renderer surface cache hits and the events
+handled. Each value goes into a RollingHistogram of the last WINDOW frames, so a
+hitch shows up in the max and high percentiles of the phase that caused it. Adding
+a sample is an array store, the percentiles are only sorted out for the overlay and
+the dump.
+"""
+
+from array import array
+from bisect import bisect_left
+from typing import Sequence, TextIO
+
+# bucket upper edges, in milliseconds for timings and in units for counters
+TIME_EDGES = (0.25, 0.5, 1.0, 2.0, 4.0, 8.0, 16.7, 33.3, 66.7, 100.0)
+COUNT_EDGES = (0, 1, 2, 4, 8, 16, 32, 64, 128)
+
+PHASES = ("input", "events", "computer", "legal_moves", "draw", "idle", "frame")
+COUNTERS = ("validate_move", "cache_hits", "events")
+
+
+class RollingHistogram:
+    """The last window samples in a ring buffer, with bucket counts and percentiles over them."""
+
+    def __init__(self, edges: Sequence[float], window: int = 600) -> None:
+        self._edges = tuple(edges)
+        self._samples = array("d", bytes(8 * window))
+        self._window = window
+        self._count = 0         # samples added so far, the ring is full once it reaches window
+
+    def add(self, value: float) -> None:
+        self._samples[self._count % self._window] = value
+        self._count += 1
+
+    def values(self) -> list[float]:
+        return list(self._samples[:min(self._count, self._window)])
+
+    def buckets(self) -> list[int]:
+        """Samples per bucket: bucket i counts the values up to edges[i], the last one everything above."""
+        counts = [0] * (len(self._edges) + 1)
+        for value in self.values():
+            counts[bisect_left(self._edges, value)] += 1
+        return counts
+
+    def summary(self) -> dict[str, float]:
+        values = sorted(self.values())
+        if not values:
+            return {"n": 0, "mean": 0.0, "p50": 0.0, "p95": 0.0, "p99": 0.0, "max": 0.0}
+        last = len(values) - 1
+        return {"n": len(values), "mean": sum(values) / len(values),
+                "p50": values[last // 2], "p95": values[last * 95 // 100],
+                "p99": values[last * 99 // 100], "max": values[-1]}
+
+    @property
+    def get_edges(self) -> tuple[float, ...]:
+        return self._edges
+
+    @property
+    def get_total(self) -> int:
+        """Samples added since the start, including the ones that left the window."""
+        return self._count
+
+
+class FrameStats:
+    """
+    Collects one frame at a time: the engine adds phase times and counter increments
+    while the frame runs and closes it with end_frame, which moves the totals into the
+    histograms. Phases and counters that were not touched in a frame record a zero.
+    """
+
+    def __init__(self, window: int = 600) -> None:
+        self.phases = {name: RollingHistogram(TIME_EDGES, window) for name in PHASES}
+        self.counters = {name: RollingHistogram(COUNT_EDGES, window) for name in COUNTERS}
+        self._times = dict.fromkeys(PHASES, 0.0)
+        self._counts = dict.fromkeys(COUNTERS, 0)
+        self.frames = 0
+
+    def add_time(self, phase: str, seconds: float) -> None:
+        self._times[phase] += seconds
+
+    def count(self, counter: str, amount: int = 1) -> None:
+        self._counts[counter] += amount
+
+    def end_frame(self, seconds: float) -> None:
+        """Closes the frame that took seconds in all."""
+        self._times["frame"] = seconds
+        for name, histogram in self.phases.items():
+            histogram.add(self._times[name] * 1000.0)
+            self._times[name] = 0.0
+        for name, histogram in self.counters.items():
+            histogram.add(self._counts[name])
+            self._counts[name] = 0
+        self.frames += 1
+
+    def overlay_lines(self) -> list[str]:
+        """Short lines for the on-screen overlay, p50 / p95 / max of each phase and counter."""
+        lines = [f"{'ms':<13}{'p50':>7}{'p95':>7}{'max':>7}"]
+        for name, histogram in self.phases.items():
+            s = histogram.summary()
+            lines.append(f"{name:<13}{s['p50']:>7.2f}{s['p95']:>7.2f}{s['max']:>7.2f}")
+        for name, histogram in self.counters.items():
+            s = histogram.summary()
+            lines.append(f"{name:<13}{s['p50']:>7.0f}{s['p95']:>7.0f}{s['max']:>7.0f}")
+        return lines
+
+    def dump(self, stream: TextIO) -> None:
+        """Writes the summaries and the bucket counts of every histogram."""
+        stream.write(f"frames {self.frames}, last {self.phases['frame'].summary()['n']} in the window\n")
+        for title, group in (("phase (ms)", self.phases), ("counter", self.counters)):
+            stream.write(f"\n{title:<14}{'mean':>9}{'p50':>9}{'p95':>9}{'p99':>9}{'max':>9}\n")
+            for name, histogram in group.items():
+                s = histogram.summary()
+                stream.write(f"{name:<14}" + "".join(f"{s[key]:>9.3f}" for key in ("mean", "p50", "p95", "p99", "max"))
+                             + "\n")
+
+        for title, group in (("phase (ms)", self.phases), ("counter", self.counters)):
+            edges = next(iter(group.values())).get_edges
+            labels = [f"<={edge:g}" for edge in edges] + [f">{edges[-1]:g}"]
+            stream.write(f"\n{title:<14}" + "".join(f"{label:>8}" for label in labels) + "\n")
+            for name, histogram in group.items():
+                stream.write(f"{name:<14}" + "".join(f"{count:>8}" for count in histogram.buckets()) + "\n")
+
+    def dump_file(self, path: str) -> None:
+        with open(path, "w") as stream:
+            self.dump(stream)
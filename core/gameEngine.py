@@ -1,11 +1,19 @@
 from datastructures.Bar import Bar
 import pygame as pg
-from typing import List, Optional
+from random import Random
+from time import perf_counter
+from typing import Dict, List, Optional
 
 from datastructures.Board import Board
+from datastructures.Dice import DiceSource, RandomDice
 from core.gameState import GameState
 from core.moveMediator import MoveMediator
-from core.eventHandler import eventHandler
+from core.players import Player
+from core.gameRecord import GameRecordWriter, Step
+from core.trace import tracer
+from core.frameStats import FrameStats
+from core.eventBus import EventBus
+from core.events import BarSelected, ClickStack, MoveEvent, QuitEvent, ToggleStats
 from presentation.Renderer import Renderer
 from core.InputHandler import InputHandler
 
@@ -21,65 +29,159 @@ class GameEngine:
       - Only the engine mutates turn/dice flow.
       - MoveMediator validates and performs moves.
       - Renderer only draws based on the current _board state + UI hints.
+
+    Colors listed in players are played by those callables (see core.players),
+    the others take their moves from the mouse. With a recorder every turn is
+    appended to a game record, the dice then come from a seeded generator.
+
+    Every frame is timed phase by phase into FrameStats (see core.frameStats); F3
+    or show_stats puts the overlay on screen and with stats_file the histograms are
+    written there when the game ends.
+
+    The loop only runs at full frame rate while something changes. A frame that drew
+    nothing, with no queued events and no animation, makes the next one sleep in
+    pg.event.wait until input arrives (or IDLE_TIMEOUT_MS passes) instead of polling.
     """
 
-    def __init__(self) -> None:
+    # share of a 60 fps frame spent on queued events before drawing
+    EVENT_BUDGET = 0.004
+    # frames between two redraws of the stats overlay
+    OVERLAY_REFRESH = 30
+    # longest sleep on input while idle, so the loop still comes round to flush the tracer
+    IDLE_TIMEOUT_MS = 500
+
+    def __init__(self, players: Optional[Dict[str, Player]] = None,
+                 recorder: Optional[GameRecordWriter] = None, seed: Optional[int] = None,
+                 show_stats: bool = False, stats_file: Optional[str] = None,
+                 dice: Optional[DiceSource] = None) -> None:
         pg.init()
         self._clock = pg.time.Clock()
 
         # core domain state
+        if recorder is not None and seed is None:
+            seed = Random().getrandbits(64)
+        self._seed = seed
         self._board = Board()
-        self._game_state = GameState()
+        # an explicit dice source (e.g. ReplayDice for a set up position) replaces the seeded one
+        self._game_state = GameState(dice if dice is not None else RandomDice(seed) if seed is not None else None)
         self._mediator = MoveMediator(self._board, self._game_state)
 
         # _events & presentation
-        self._events = eventHandler()
+        self._events = EventBus()
+        self._events.subscribe(ClickStack, lambda event: self._handle_click_stack(event.stack_id))
+        self._events.subscribe(MoveEvent, self._on_move_event)
+        self._events.subscribe(QuitEvent, self._on_quit)
+        self._events.subscribe(ToggleStats, self._on_toggle_stats)
         self._renderer = Renderer(self._board)
         self._input_handler = InputHandler(self._renderer, self._events)
 
         # turn state
         self._turn_active: bool = False
         self._moves_remaining: List[int] = []  
+        self._legal_plays: list = []    # full legal plays for the dice left, from MoveMediator.generate_moves
+        self._finals: Optional[set] = None      # final positions the turn can still end in, None before the first step
+        self._playable_steps: dict = {}         # from MoveMediator.playable_steps, what the UI offers
+        self._players: Dict[str, Player] = dict(players or {})
+
+        # game record of the turn in progress
+        self._recorder = recorder
+        self._turn_dice: tuple[int, int] = (1, 1)
+        self._turn_steps: list[Step] = []
 
         self.running = True
 
         self._state = "IDLE"            # IDLE | STACK_SELECTED
         self._selected_stack = None       
 
+        # frame instrumentation
+        self._stats = FrameStats()
+        self._show_stats = show_stats
+        self._stats_file = stats_file
+
 
     # Main loop
     def run(self):
         self._renderer.init()
+        if self._recorder is not None:
+            names = {color: type(self._players[color]).__name__ if color in self._players else "human"
+                     for color in ("white", "black")}
+            self._recorder.start_game(self._seed, names["white"], names["black"],
+                                      self._board.get_counts, self._game_state.get_current_player)
 
         while self.running and not self._game_state.check_winner(self._board):
             # Start the turn properly
             self._start_turn()
 
             # Main turn loop
+            idle = False
             while self._turn_active:
                 # try:
+                    stats = self._stats
+                    frame_start = input_start = perf_counter()
+                    if idle:
+                        # nothing changed in the last frame, sleep until there is input
+                        self._input_handler.wait(self.IDLE_TIMEOUT_MS)
+                        input_start = perf_counter()
+                        stats.add_time("idle", input_start - frame_start)
                     self._input_handler.process_events()
+                    events_start = perf_counter()
+                    stats.add_time("input", events_start - input_start)
 
                     # Process queued game events (includes StackSelected + MoveEvent)
-                    self.process_game_events()
-                    self._renderer.draw_frame(self._game_state.get_current_player, self._game_state.get_current_dice)
+                    stats.count("events", self.process_game_events())
+                    computer_start = perf_counter()
+                    stats.add_time("events", computer_start - events_start)
+
+                    # computer controlled side plays its whole roll at once
+                    if self._game_state.get_current_player in self._players and self._legal_plays:
+                        self._play_computer_turn()
+                    draw_start = perf_counter()
+                    stats.add_time("computer", draw_start - computer_start)
+
+                    drawn = self._renderer.draw_frame(self._game_state.get_current_player,
+                                                      self._game_state.get_current_dice)
+                    stats.add_time("draw", perf_counter() - draw_start)
+                    idle = not drawn and self._events.empty_events() and not self._renderer.animating()
 
                     # end turn if no moves left or no legal moves
                     if not self._moves_remaining or not self._any_legal_moves():
                         self._end_turn()
 
                     # Render the board
+                    tracer.flush()
+                    idle_start = perf_counter()
                     self._clock.tick(60)
+                    frame_end = perf_counter()
+                    stats.add_time("idle", frame_end - idle_start)
+                    self._end_frame(frame_end - frame_start)
 
                 # except Exception as e:
                 #     print(f"[ERROR] {e}") 
                     
 
         # Game finished
-        winner = self._game_state.check_winner(self.board)
-        print(f"Winner: {winner}")
+        winner = self._game_state.check_winner(self._board)
+        tracer.info("engine", "winner %s", winner)
+        tracer.flush()
+        if self._recorder is not None:
+            self._recorder.end_game(winner, GameState.game_value(self._board.get_counts, winner) if winner else 0)
+        if self._stats_file is not None:
+            self._stats.dump_file(self._stats_file)
+            tracer.info("engine", "frame stats of %d frames written to %s", self._stats.frames, self._stats_file)
+            tracer.flush()
         pg.quit()
 
+    def _end_frame(self, seconds: float) -> None:
+        """Moves this frame's counters into the stats and refreshes the overlay every OVERLAY_REFRESH frames."""
+        stats = self._stats
+        stats.count("validate_move", self._mediator.validate_calls)
+        stats.count("cache_hits", self._renderer.cache_hits)
+        self._mediator.validate_calls = 0
+        self._renderer.cache_hits = 0
+        stats.end_frame(seconds)
+        if self._show_stats and stats.frames % self.OVERLAY_REFRESH == 0:
+            self._renderer.set_overlay(stats.overlay_lines())
+
 
 
     # turn management
@@ -87,37 +189,33 @@ class GameEngine:
         current_player = self._game_state.get_current_player
         dice = self._game_state.roll_dice() 
         self._moves_remaining = self._explode_dice(dice)
+        self._turn_dice = dice
+        self._turn_steps = []
+        self._finals = None
         
         # keep GameState._dice in sync (so MoveMediator.validate_move can read it)
         self._set_game_dice(tuple(self._moves_remaining))
+        self._refresh_legal_plays()
         self._turn_active = True
-        print(f"\n--- {current_player}'s turn --- rolled {dice} → moves {self._moves_remaining}")
+        tracer.info("engine", "%s's turn, rolled %s", current_player, dice, moves=self._moves_remaining)
 
-        bar_stones = self._board.get_bar_stones(current_player)
+        bar_stones = self._board.bar_count(current_player)
         if bar_stones:
-            print(f"DEBUG: {current_player} has {len(bar_stones)} stone(s) on bar → forcing re-entry")
+            tracer.debug("engine", "%s has %d stone(s) on the bar, forcing re-entry", current_player, bar_stones)
 
             # compute destinations as if "BarSelected"
-            destinations = []
-            for to_stack in range(1, 25):
-                if self._mediator.validate_move(self._board.get_bar, to_stack):
-                    if(to_stack in self._game_state.get_current_dice):
-                        destinations.append(to_stack)
+            destinations = self._get_valid_destinations(Board.BAR_SLOT[current_player])
 
             if destinations:
-                self._events.append({
-                    "type": "BarSelected",
-                    "stack_id": "BAR",  
-                    "destinations": destinations,
-                })
+                self._events.publish(BarSelected(destinations))
                 self._renderer.highlight_stacks(destinations)
             else:
                 # no legal moves from bar → skip turn immediately
-                print(f"DEBUG: {current_player} cannot re-enter → turn skipped")
+                tracer.debug("engine", "%s cannot re-enter, turn skipped", current_player)
                 self._end_turn()
 
         if not self._any_legal_moves():
-            print(f"{current_player} has no legal moves. Passing turn.")
+            tracer.info("engine", "%s has no legal moves, passing turn", current_player)
             self._end_turn()
 
     def _end_turn(self) -> None:
@@ -125,7 +223,12 @@ class GameEngine:
         if not self._turn_active:
             return
         self._turn_active = False
+        if self._recorder is not None:
+            self._recorder.record_turn(self._turn_dice, self._turn_steps)
         self._moves_remaining = []
+        self._legal_plays = []
+        self._finals = None
+        self._playable_steps = {}
         self._set_game_dice(tuple()) 
         self._game_state.next_turn()
 
@@ -133,25 +236,22 @@ class GameEngine:
 
 
     # Event processing
-    def process_game_events(self) -> None:
-        """Process all queued events and apply game logic."""
-        while not self._events.empty_events():
-            event = self._events.pop_event()
-            print("DEBUG popped event:", event)
+    def process_game_events(self) -> int:
+        """Apply this frame's queued events through the bus dispatch table, within EVENT_BUDGET; returns how many."""
+        return self._events.drain(self.EVENT_BUDGET)
 
-            if event["type"] == "ClickStack":
-                self._handle_click_stack(event["stack_id"])
+    def _on_move_event(self, event: MoveEvent) -> None:
+        self._handle_move_event(event)
+        self._renderer.clear_highlights()
 
-            elif event["type"] == "QuitEvent":
-                return False
+    def _on_quit(self, event: QuitEvent) -> None:
+        self.running = False
+        self._turn_active = False
 
-            elif event["type"] == "MoveEvent":
-                
-                self._handle_move_event(event)
-                self._renderer.clear_highlights()
-            
+    def _on_toggle_stats(self, event: ToggleStats) -> None:
+        self._show_stats = not self._show_stats
+        self._renderer.set_overlay(self._stats.overlay_lines() if self._show_stats else None)
 
-                
     def _handle_click_stack(self, stack_id: int) -> None:
         current_player = self._game_state.get_current_player
 
@@ -165,78 +265,76 @@ class GameEngine:
                 self._selected_stack = stack_id
                 self._state = "STACK_SELECTED"
                 destinations = self._get_valid_destinations(stack_id)
-                print(f"DEBUG: stack {stack_id} selected, possible moves {destinations}")
+                tracer.debug("engine", "stack %s selected", stack_id, destinations=destinations)
                 self._renderer.highlight_stacks(destinations)
             else:
-                print(f"DEBUG: stack {stack_id} has no moves → staying IDLE")
+                tracer.debug("engine", "stack %s has no moves, staying idle", stack_id)
 
 
         elif self._state == "STACK_SELECTED":
             if stack_id != self._selected_stack:
                 if stack_id in self._get_valid_destinations(self._selected_stack):
-                    self._handle_move_event({
-                        "type": "MoveEvent",
-                        "from_stack": self._selected_stack,
-                        "to_stack": stack_id
-                    })
+                    self._handle_move_event(MoveEvent(self._selected_stack, stack_id))
                 else:
-                    print(f"DEBUG: invalid move {self._selected_stack} → {stack_id}")
+                    tracer.debug("engine", "invalid move %s -> %s", self._selected_stack, stack_id)
             # Reset in both cases
             self._selected_stack = None
             self._state = "IDLE"
             self._renderer.clear_highlights()
 
+    def _play_computer_turn(self) -> None:
+        current_player = self._game_state.get_current_player
+        play = self._players[current_player](
+            self._board, current_player, tuple(self._moves_remaining), self._legal_plays
+        )
+
+        for from_stack, to_stack in play:
+            origin = self._board.get_bar if from_stack == Board.BAR_SLOT[current_player] else from_stack
+            self._handle_move_event(MoveEvent(origin, to_stack))
+        self._renderer.clear_highlights()
+
     # Helpers
     def _attempt_bar_reentry(self, to_stack: int) -> None:
         """Handle forced re-entry from bar."""
         current_player = self._game_state.get_current_player
         bar = self._board.get_bar
 
-        if self._mediator.validate_move(bar, to_stack):
-            print(f"DEBUG: re-entering {current_player} stone to {to_stack}")
-            self._handle_move_event({
-                "type": "MoveEvent",
-                "from_stack": bar,
-                "to_stack": to_stack
-            })
+        if to_stack in self._get_valid_destinations(Board.BAR_SLOT[current_player]):
+            tracer.debug("engine", "re-entering %s stone to %s", current_player, to_stack)
+            self._handle_move_event(MoveEvent(bar, to_stack))
             self._renderer.clear_highlights()
         else:
-            print(f"DEBUG: invalid bar re-entry to {to_stack}")
+            tracer.debug("engine", "invalid bar re-entry to %s", to_stack)
 
 
-    def _handle_move_event(self, ev: dict) -> None:
-        print(f"DEBUG: Handling MoveEvent {ev}")
+    def _handle_move_event(self, ev: MoveEvent) -> None:
+        tracer.debug("events", "handling %s", ev)
         if not self._turn_active or not self._moves_remaining:
-            print("DEBUG: No active turn or no moves remaining")
+            tracer.debug("engine", "no active turn or no moves remaining")
             return
 
-        from_stack = ev.get("from_stack")
-        to_stack = ev.get("to_stack")
+        from_stack = ev.from_stack
+        to_stack = ev.to_stack
         # if not isinstance(from_stack, int) or not isinstance(to_stack, int):
         #     print("DEBUG: Invalid from/to stack")
         #     return
 
         current = self._game_state.get_current_player  # FIXED HERE
-        print(f"DEBUG: Checking move for player {current}")
-
-        allowed = self._mediator.validate_move(from_stack, to_stack)
-        print(f"DEBUG validate_move returned: {allowed}")
+        from_slot = Board.BAR_SLOT[current] if isinstance(from_stack, Bar) else from_stack
+        # validate_move only knows single dice, the step also has to leave a legal play open
+        step = self._playable_steps.get((from_slot, to_stack))
+        allowed = step is not None and self._mediator.validate_move(from_stack, to_stack)
+        tracer.debug("moves", "validate_move %s -> %s for %s", from_stack, to_stack, current, allowed=allowed)
 
         if not allowed:
-            print(f"Rejected move {from_stack} → {to_stack}")
+            tracer.info("moves", "rejected move %s -> %s", from_stack, to_stack)
             return
 
-        print("DEBUG: move is allowed")
-        moved_stone, _ = self._mediator.execute_move(from_stack, to_stack)
-        if isinstance(from_stack, int):
-            used = self._distance_for_player(from_stack, to_stack, current)
-        elif isinstance(from_stack, Bar):
-            used = self._distance_from_bar(to_stack, current)
-        else:
-            raise ValueError(f"Unsupported from_stack type: {type(from_stack)}")
-
+        moved_stone, hit_color = self._mediator.execute_move(from_stack, to_stack)
+        self._turn_steps.append((from_slot, to_stack, hit_color is not None))
+        used, self._finals = step
 
-        print(f"DEBUG: Consuming pip {used}")
+        tracer.debug("engine", "consuming pip %d", used)
         self._consume_pip(used)
 
     # Dice consumption
@@ -245,137 +343,94 @@ class GameEngine:
         """
         Remove the used pip from moves_remaining.
         If 'distance' doesn't match a remaining die (overshoot during bear-off),
-        remove the max remaining die.
+        remove the smallest remaining die that covers it.
         """
         if distance in self._moves_remaining:
             self._moves_remaining.remove(distance)
         elif self._moves_remaining:
-            self._moves_remaining.remove(max(self._moves_remaining))
+            covering = [d for d in self._moves_remaining if d > distance]
+            self._moves_remaining.remove(min(covering) if covering else max(self._moves_remaining))
         self._set_game_dice(tuple(self._moves_remaining))
+        self._refresh_legal_plays()
 
     def _set_game_dice(self, dice_tuple: tuple[int, ...]) -> None:
-        """
-        Keep mediator-visible dice in sync. (Ideally expose a setter in GameState;
-        for now we assign the private field.)
-        """
-        self._game_state._dice = dice_tuple
+        """Keep mediator-visible dice in sync."""
+        self._game_state.set_dice(dice_tuple)
 
 
     # Legal-move probing 
-    def _any_legal_moves(self) -> bool:
-        """
-        Quick probe: for each die pip left and each top stone of current player,
-        see if at least one valid destination exists (including bearing off).
-        """
-
-        p = self._game_state.get_current_player
-        # print(self.mediator.can_bear_off(p))
-        pips = sorted(set(self._moves_remaining), reverse=True)  # try larger first
-
-        # If player has stones on the bar, only bar entries are legal sources
-        if self._board.get_bar.must_reenter(p):
-            return self._any_bar_entry_legal(p, pips)
-
-        # iterate all stacks with a top stone of the current color
-        for s in range(1, 25):
-            stack = self._board.get_stack(s)
-            if stack.is_empty():
-                continue
-            if stack.peek_stone().get_color != p:
-                continue
-
-            for pip in pips:
-                # candidate destination
-                to = s - pip if p == "white" else s + pip
-
-                # print("it came here ")
-
-                # 2. Bearing off
-                if self._mediator.can_bear_off(p):
-                    home_target = 0 if p == "white" else 25
-                    # print("can bear off")
-                    if self._mediator.validate_move(s, home_target):
-                        # print("allowed")
-                        return True
-
-                # 1. Board move
-                if 1 <= to <= 24 and self._mediator.validate_move(s, to):
-                    return True
-
-
-        return False
+    def _refresh_legal_plays(self) -> None:
+        """Regenerate the full legal plays and the playable single steps for the dice that are left this turn."""
+        if not self._moves_remaining:
+            self._legal_plays = []
+            self._playable_steps = {}
+            return
+        start = perf_counter()
+        player = self._game_state.get_current_player
+        self._legal_plays = MoveMediator.generate_moves(self._board, player, self._moves_remaining)
+        if self._finals is None:
+            # first step of the turn: the plays of the whole roll decide where it may end
+            self._finals = {position for _, position in self._legal_plays}
+        self._playable_steps = MoveMediator.playable_steps(
+            self._board.get_counts, player, self._moves_remaining, self._finals
+        )
+        self._stats.add_time("legal_moves", perf_counter() - start)
 
+    def _any_legal_moves(self) -> bool:
+        """True while at least one step towards a legal play is left for the remaining dice."""
+        return bool(self._playable_steps)
 
-    def _any_bar_entry_legal(self, player: str, pips: list[int]) -> bool:
-        """When on bar, can we enter with any die?"""
-        # White enters on 24→19 (top-right quadrant), black on 1→6 (bottom-left)
-        for pip in pips:
-            to = (25 - pip) if player == "white" else pip
-            if 1 <= to <= 24 and self._mediator.validate_move(self._board.get_bar, to):
-                return True
-        return False
-    
     def _get_valid_destinations(self, from_stack: int) -> list[int]:
-        valid_destinations = []
-        current_player = self._game_state.get_current_player
-        direction = -1 if current_player == "white" else 1 
-
-        for pip in self._moves_remaining:
-            candidate = from_stack + (direction * pip)
-
-            if 1 <= candidate <= 24:
-                if self._mediator.validate_move(from_stack, candidate):
-                    valid_destinations.append(candidate)
-
-            else:
-                target_off = 25 if current_player == "black" else 0
-                if self._mediator.validate_move(from_stack, target_off):
-                    valid_destinations.append(target_off)
-
-        print(f"DEBUG: from_stack {from_stack}, pips {self._moves_remaining}, candidates {valid_destinations}")
+        """
+        Destinations of the playable steps from from_stack (the bar is passed as its
+        board slot), in either die order. A step is only offered when the rest of the
+        dice can still finish one of the legal plays of the roll, which enforces the
+        use-both-dice and larger-die rules in the UI.
+        """
+        valid_destinations = sorted(to_stack for origin, to_stack in self._playable_steps if origin == from_stack)
+        tracer.debug("moves", "destinations from %s", from_stack, pips=self._moves_remaining,
+                     candidates=valid_destinations)
         return valid_destinations
     
     @staticmethod
     def _explode_dice(dice: tuple[int, int]) -> List[int]:
         """Turn (a, b) into [a, b] or [a, a, a, a] for doubles."""
-        a, b = dice
-        # in case i want the doubles to be doubled
-        # return [a, a, a, a] if a == b els e [a, b]
+        return GameState.explode_dice(dice)
 
-        return [a, b]
-    
-    @staticmethod
-    def _distance_for_player(from_stack: int, to_stack: int, player: str) -> int:
-        """
-        Mirror MoveMediator._calculate_distance (for int→int case):
-        white moves down (to smaller numbers): distance = from - to
-        black moves up (to larger numbers):  distance = to - from
-        """
-        if to_stack in (0, 25):
-            if player == "white":
-                return from_stack  # pip = point index
-            return 25 - from_stack
-        
-        if player == "white":
-            return from_stack - to_stack
-        return to_stack - from_stack
+    # GETTERS
+    @property
+    def get_board(self) -> Board:
+        return self._board
 
-    @staticmethod
-    def _distance_from_bar(to_stack: int, player: str) -> int:
-        """
-        Distance when re-entering from the bar.
-        - White enters on stacks 24 → 19 (dice 1 → 6).
-        - Black enters on stacks 1 → 6 (dice 1 → 6).
-        """
-        if player == "white":
-            # white enters from top into points 24..19
-            return 25 - to_stack
-        elif player == "black":
-            # black enters from bottom into points 1..6
-            return to_stack
-        else:
-            raise ValueError(f"Unknown player: {player}")
-        
-ge = GameEngine()
+    @property
+    def get_game_state(self) -> GameState:
+        return self._game_state
 
-ge.run()
\ No newline at end of file
+    @property
+    def get_events(self) -> EventBus:
+        return self._events
+        
+if __name__ == "__main__":
+    import argparse
+    from ai.agents import AGENTS
+
+    parser = argparse.ArgumentParser(description="Play backgammon.")
+    parser.add_argument("--white", choices=["human", *sorted(AGENTS)], default="human")
+    parser.add_argument("--black", choices=["human", *sorted(AGENTS)], default="human")
+    parser.add_argument("--record", help="append the game to this binary game record file")
+    parser.add_argument("--trace", default="engine=info", help="trace spec, e.g. engine=debug,moves=debug")
+    parser.add_argument("--stats", action="store_true", help="start with the frame stats overlay on (F3 toggles it)")
+    parser.add_argument("--stats-file", help="write the frame time histograms to this file when the game ends")
+    args = parser.parse_args()
+    tracer.configure(args.trace)
+
+    computer = {color: AGENTS[name](0) for color, name in (("white", args.white), ("black", args.black))
+                if name != "human"}
+    recorder = GameRecordWriter(args.record) if args.record else None
+    ge = GameEngine(computer, recorder, show_stats=args.stats, stats_file=args.stats_file)
+
+    try:
+        ge.run()
+    finally:
+        if recorder is not None:
+            recorder.close()
\ No newline at end of file
@@ -0,0 +1,309 @@
+"""
+Binary game records: one append-only record file plus two fixed-size index files.
+
+    games.bgr        header, then per game a start entry, one entry per turn and an end entry
+    games.bgr.gidx   per game: record offset, first turn number, turn count, winner
+    games.bgr.tidx   per turn: record offset
+
+Entries in the record file, all little endian:
+    start  b"S", seed u64, start position key (PositionId.encode_many layout, 11 bytes),
+           white and black player names as u8 length + utf-8
+    turn   b"T", dice (a - 1) * 6 + (b - 1) as u8, step count u8, then per step a u16
+           holding from slot | to slot << 5 | hit << 10
+    end    b"E", winner u8 (0 unfinished, 1 white, 2 black), points u8
+
+A turn entry is about 7 bytes against a few hundred for JSON. The index files are read
+through mmap, so game N turn M is two index lookups and one unpack. The record file
+alone is enough for the streaming reader; the indexes can be rebuilt from it.
+"""
+
+import mmap
+import os
+import struct
+import threading
+from queue import SimpleQueue
+from typing import Iterator, NamedTuple, Optional, Sequence
+
+import numpy as np
+
+from datastructures.PositionId import PositionId
+
+MAGIC = b"BGGR"
+VERSION = 1
+FILE_HEADER = struct.Struct("<4sI")
+
+START = struct.Struct("<cQ11s")
+TURN = struct.Struct("<cBB")
+STEP = struct.Struct("<H")
+END = struct.Struct("<cBB")
+
+GAME_INDEX = struct.Struct("<QQIB3x")      # record offset, first turn, turn count, winner
+TURN_INDEX = struct.Struct("<Q")           # record offset
+
+WINNER_CODE = {None: 0, "white": 1, "black": 2}
+WINNER_NAME = {code: name for name, code in WINNER_CODE.items()}
+
+# (from slot, to slot, whether the step hit a blot)
+Step = tuple[int, int, bool]
+
+
+class Turn(NamedTuple):
+    dice: tuple[int, int]
+    steps: tuple[Step, ...]
+
+
+class GameRecord(NamedTuple):
+    seed: int
+    white: str
+    black: str
+    start: list[int]            # board array the game started from
+    first_player: str
+    turns: list[Turn]
+    winner: Optional[str]
+    points: int
+
+
+# Entry encoding
+def pack_start(seed: int, white: str, black: str, points: Sequence[int], player: str) -> bytes:
+    key = PositionId.encode_many(np.asarray(points, dtype=np.int8), [player == "black"])[0].tobytes()
+    names = b"".join(bytes([len(name)]) + name for name in (white.encode(), black.encode()))
+    return START.pack(b"S", seed & 0xFFFF_FFFF_FFFF_FFFF, key) + names
+
+
+def pack_turn(dice: tuple[int, int], steps: Sequence[Step]) -> bytes:
+    code = (dice[0] - 1) * 6 + (dice[1] - 1)
+    packed = b"".join(STEP.pack(from_slot | to_slot << 5 | hit << 10) for from_slot, to_slot, hit in steps)
+    return TURN.pack(b"T", code, len(steps)) + packed
+
+
+def pack_end(winner: Optional[str], points: int = 0) -> bytes:
+    return END.pack(b"E", WINNER_CODE[winner], points)
+
+
+def unpack_turn(buffer, offset: int) -> tuple[Turn, int]:
+    """Turn entry at offset and the offset just past it."""
+    _, code, count = TURN.unpack_from(buffer, offset)
+    offset += TURN.size
+    steps = []
+    for _ in range(count):
+        (value,) = STEP.unpack_from(buffer, offset)
+        steps.append((value & 0x1F, (value >> 5) & 0x1F, bool(value >> 10)))
+        offset += STEP.size
+    return Turn((code // 6 + 1, code % 6 + 1), tuple(steps)), offset
+
+
+def _unpack_start(buffer, offset: int) -> tuple[tuple, int]:
+    _, seed, key = START.unpack_from(buffer, offset)
+    offset += START.size
+    names = []
+    for _ in range(2):
+        length = buffer[offset]
+        names.append(bytes(buffer[offset + 1:offset + 1 + length]).decode())
+        offset += 1 + length
+    positions, black_to_move = PositionId.decode_many(np.frombuffer(key, dtype=np.uint8))
+    player = "black" if black_to_move[0] else "white"
+    return (seed, names[0], names[1], positions[0].tolist(), player), offset
+
+
+class GameRecordWriter:
+    """
+    Appends games to a record file and its indexes. The engines call start_game,
+    record_turn and end_game; entries are packed on the caller's thread and written
+    by a background thread, so the game loop never waits on the disk.
+    """
+
+    def __init__(self, path: str) -> None:
+        self._path = path
+        new = not os.path.exists(path) or os.path.getsize(path) == 0
+        self._records = open(path, "ab")
+        self._games = open(path + ".gidx", "ab")
+        self._turn_index = open(path + ".tidx", "ab")
+        if new:
+            self._records.write(FILE_HEADER.pack(MAGIC, VERSION))
+
+        # continue numbering where an existing file left off
+        self._offset = self._records.tell()
+        self._turn_count = self._turn_index.tell() // TURN_INDEX.size
+
+        self._game_offset = 0
+        self._game_first_turn = 0
+
+        self._queue: SimpleQueue = SimpleQueue()
+        self._thread = threading.Thread(target=self._drain, name="GameRecordWriter", daemon=True)
+        self._thread.start()
+
+    # Called by the engines
+    def start_game(self, seed: int, white: str, black: str, points: Sequence[int], player: str) -> None:
+        self._queue.put(("start", pack_start(seed, white, black, points, player)))
+
+    def record_turn(self, dice: tuple[int, int], steps: Sequence[Step]) -> None:
+        self._queue.put(("turn", pack_turn(dice, steps)))
+
+    def end_game(self, winner: Optional[str], points: int = 0) -> None:
+        self._queue.put(("end", pack_end(winner, points), WINNER_CODE[winner]))
+
+    def write_game(self, record: GameRecord) -> None:
+        """Appends a finished game in one go, e.g. one played in another process."""
+        self.start_game(record.seed, record.white, record.black, record.start, record.first_player)
+        for turn in record.turns:
+            self.record_turn(turn.dice, turn.steps)
+        self.end_game(record.winner, record.points)
+
+    def flush(self) -> None:
+        """Blocks until everything queued so far is on disk."""
+        done = threading.Event()
+        self._queue.put(("flush", done))
+        done.wait()
+
+    def close(self) -> None:
+        self._queue.put(None)
+        self._thread.join()
+        for f in (self._records, self._games, self._turn_index):
+            f.close()
+
+    def __enter__(self) -> "GameRecordWriter":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    # Writer thread
+    def _drain(self) -> None:
+        while True:
+            item = self._queue.get()
+            if item is None:
+                return
+            kind = item[0]
+
+            if kind == "flush":
+                for f in (self._records, self._games, self._turn_index):
+                    f.flush()
+                item[1].set()
+                continue
+
+            data = item[1]
+            if kind == "start":
+                self._game_offset = self._offset
+                self._game_first_turn = self._turn_count
+            elif kind == "turn":
+                self._turn_index.write(TURN_INDEX.pack(self._offset))
+                self._turn_count += 1
+            else:
+                # the game only shows up in the index once it is complete
+                self._games.write(GAME_INDEX.pack(self._game_offset, self._game_first_turn,
+                                                  self._turn_count - self._game_first_turn, item[2]))
+            self._records.write(data)
+            self._offset += len(data)
+
+
+class GameRecordReader:
+    """Random access to complete games and single turns through the mmapped indexes."""
+
+    def __init__(self, path: str) -> None:
+        self._files = [open(p, "rb") for p in (path, path + ".gidx", path + ".tidx")]
+        self._maps = [mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) if os.fstat(f.fileno()).st_size else b""
+                      for f in self._files]
+        self._records, self._games, self._turns = self._maps
+
+        magic, version = FILE_HEADER.unpack_from(self._records, 0)
+        if (magic, version) != (MAGIC, VERSION):
+            self.close()
+            raise ValueError(f"{path} is not a game record file this version can read")
+
+    def close(self) -> None:
+        for m in self._maps:
+            if isinstance(m, mmap.mmap):
+                m.close()
+        for f in self._files:
+            f.close()
+
+    def __len__(self) -> int:
+        return len(self._games) // GAME_INDEX.size
+
+    def _game_entry(self, game: int) -> tuple[int, int, int, int]:
+        if not 0 <= game < len(self):
+            raise IndexError(f"Game {game} out of range")
+        return GAME_INDEX.unpack_from(self._games, game * GAME_INDEX.size)
+
+    def turn_count(self, game: int) -> int:
+        return self._game_entry(game)[2]
+
+    def turn(self, game: int, turn: int) -> Turn:
+        _, first, count, _ = self._game_entry(game)
+        if not 0 <= turn < count:
+            raise IndexError(f"Turn {turn} out of range for game {game}")
+        (offset,) = TURN_INDEX.unpack_from(self._turns, (first + turn) * TURN_INDEX.size)
+        return unpack_turn(self._records, offset)[0]
+
+    def game(self, game: int) -> GameRecord:
+        offset = self._game_entry(game)[0]
+        return next(_parse(self._records, offset))
+
+
+def _parse(buffer, offset: int) -> Iterator[GameRecord]:
+    """Complete games in buffer from offset on, an unfinished last game is skipped."""
+    size = len(buffer)
+    while offset < size:
+        header, offset = _unpack_start(buffer, offset)
+        turns = []
+        while offset < size and buffer[offset:offset + 1] == b"T":
+            turn, offset = unpack_turn(buffer, offset)
+            turns.append(turn)
+        if offset >= size:
+            return
+        _, winner, points = END.unpack_from(buffer, offset)
+        offset += END.size
+        yield GameRecord(*header, turns, WINNER_NAME[winner], points)
+
+
+def iter_games(path: str, chunk_size: int = 1 << 20) -> Iterator[GameRecord]:
+    """
+    Streams every complete game of a record file in order. Reads chunk_size bytes at a
+    time and keeps only the unparsed tail, so memory stays flat for any file size.
+    """
+    with open(path, "rb") as f:
+        magic, version = FILE_HEADER.unpack(f.read(FILE_HEADER.size))
+        if (magic, version) != (MAGIC, VERSION):
+            raise ValueError(f"{path} is not a game record file this version can read")
+
+        buffer = b""
+        while True:
+            chunk = f.read(chunk_size)
+            buffer += chunk
+            # parse up to the last end entry that is certainly complete
+            end = _last_game_end(buffer)
+            if end:
+                yield from _parse(buffer[:end], 0)
+                buffer = buffer[end:]
+            if not chunk:
+                return
+
+
+def _last_game_end(buffer: bytes) -> int:
+    """Offset just past the last complete game in buffer, 0 if there is none."""
+    offset = 0
+    last = 0
+    size = len(buffer)
+    while offset < size:
+        tag = buffer[offset:offset + 1]
+        if tag == b"S":
+            if offset + START.size > size:
+                break
+            names = offset + START.size
+            for _ in range(2):
+                if names >= size:
+                    return last
+                names += 1 + buffer[names]
+            offset = names
+        elif tag == b"T":
+            if offset + TURN.size > size:
+                break
+            offset += TURN.size + buffer[offset + 2] * STEP.size
+        elif tag == b"E":
+            offset += END.size
+            if offset > size:
+                break
+            last = offset
+        else:
+            raise ValueError(f"Corrupt game record at byte {offset}")
+    return last
@@ -1,13 +1,25 @@
-from random import randint
-from typing import Optional
+from typing import Optional, Sequence
 from datastructures.Board import Board
+from datastructures.Dice import DiceSource, RandomDice
+from datastructures.DoublingCube import DoublingCube
+
+def distinct_rolls() -> list[tuple[tuple[int, int], float]]:
+    """The 21 distinct rolls with their probabilities."""
+    return [((a, b), (1 if a == b else 2) / 36) for a in range(1, 7) for b in range(a, 7)]
+
 
 class GameState:
-    def __init__(self):
+    DISTINCT_ROLLS = distinct_rolls()
+
+    def __init__(self, dice: Optional[DiceSource] = None):
+        # seeded source for reproducible games, an unseeded RandomDice otherwise
+        self._dice_source = dice if dice is not None else RandomDice()
+
         self._current_player = "white"
         self._dice = (1, 1)
         self._has_rolled = False
-        self._doubling_cube = 1
+        self._doubling_cube = DoublingCube()
+        self._dropped: Optional[tuple[str, int]] = None    # (winner, points) of a passed double
         self._winner = None
 
     def next_turn(self) -> None:
@@ -20,10 +32,69 @@ class GameState:
         """Rolls two dice for the current player."""
         if self._has_rolled:
             raise ValueError("Already rolled this turn!")
-        self._dice = (randint(1, 6), randint(1, 6))
+        self._dice = self._dice_source.roll()
         self._has_rolled = True
         return self._dice
 
+    @staticmethod
+    def explode_dice(dice: tuple[int, int]) -> list[int]:
+        """Turns a roll into the list of moves it allows."""
+        a, b = dice
+        # in case i want the doubles to be doubled
+        # return [a, a, a, a] if a == b els e [a, b]
+
+        return [a, b]
+
+    @staticmethod
+    def game_value(points: Sequence[int], winner: str) -> int:
+        """Points winner scores on a board array: 1, 2 for a gammon, 3 for a backgammon."""
+        loser = "black" if winner == "white" else "white"
+        if points[Board.HOME_SLOT[loser]]:
+            return 1
+        # backgammon: loser still has stones on the bar or in the winner's home board
+        home = range(1, 7) if winner == "white" else range(19, 25)
+        if points[Board.BAR_SLOT[loser]] or any(points[pt] * Board.SIGN[loser] > 0 for pt in home):
+            return 3
+        return 2
+
+    # Cube
+    def offer_double(self, crawford: bool = False) -> None:
+        """The current player doubles before rolling."""
+        if self._has_rolled:
+            raise ValueError("Doubles are offered before rolling")
+        self._doubling_cube.offer(self._current_player, crawford)
+
+    def take_double(self) -> None:
+        self._doubling_cube.take()
+
+    def drop_double(self) -> None:
+        """The opponent passes, the game ends and the doubler wins the current cube value."""
+        self._dropped = self._doubling_cube.drop()
+
+    def game_points(self, board: Board) -> int:
+        """Points the finished game is worth: the cube value times 1, 2 or 3, or the dropped cube."""
+        if self._dropped is not None:
+            return self._dropped[1]
+        winner = self.check_winner(board)
+        if winner is None:
+            raise ValueError("The game is not over")
+        return self.game_value(board.get_counts, winner) * self._doubling_cube.get_value
+
+    def set_current_player(self, player: str) -> None:
+        """Puts player on roll, e.g. for the opening roll of a match game or a replayed turn."""
+        if player not in ("white", "black"):
+            raise ValueError(f"Unknown player: {player}")
+        self._current_player = player
+        self._has_rolled = False
+
+    def set_dice(self, dice: tuple[int, ...]) -> None:
+        """Dice left this turn, what MoveMediator.validate_move checks moves against."""
+        self._dice = tuple(dice)
+
+    def restore_turn(self, turn: tuple[str, tuple[int, ...], bool]) -> None:
+        """Puts back a get_turn snapshot: the side on roll, its dice left and whether it has rolled."""
+        self._current_player, self._dice, self._has_rolled = turn
+
     def is_double(self) -> bool:
         """Checks if the current roll is doubles (e.g., [4, 4])."""
         return self._dice[0] == self._dice[1]
@@ -36,15 +107,26 @@ class GameState:
     def get_current_dice(self):
         return self._dice
 
+    @property
+    def get_turn(self) -> tuple[str, tuple[int, ...], bool]:
+        return self._current_player, tuple(self._dice), self._has_rolled
+
+    @property
+    def get_dice_source(self) -> DiceSource:
+        return self._dice_source
+
+    @property
+    def get_doubling_cube(self) -> DoublingCube:
+        return self._doubling_cube
+
     
     def check_winner(self, board: Board) -> Optional[str]:
         """Returns 'white', 'black', or None if no winner yet."""
-        white_home = board.get_home["white"]
-        black_home = board.get_home["black"]
-
-        if len(white_home.get_stones) == 15:
+        if self._dropped is not None:
+            self._winner = self._dropped[0]
+        elif board.home_count("white") == 15:
             self._winner = "white"
-        elif len(black_home.get_stones) == 15:
+        elif board.home_count("black") == 15:
             self._winner = "black"
         else:
             self._winner = None
@@ -0,0 +1,132 @@
+from typing import Optional
+
+from datastructures.Board import Board
+from core.gameState import GameState
+from core.moveMediator import MoveMediator
+from core.players import CubePlayer, Play, Player
+from core.gameRecord import GameRecord, Step, Turn
+from core.matchState import MatchState
+from core.trace import tracer
+
+
+class HeadlessEngine:
+    """
+    Runs the game without pygame, a display or a frame clock:
+      - rolls dice and manages turn flow through GameState
+      - asks the player callable of the side to move for one of the legal plays
+      - applies the chosen play step by step through MoveMediator
+      - with cube players, offers the side to move the cube before every roll
+      - keeps the dice and steps of every turn in history, see record()
+
+    Used for batch jobs, simulations and tests, GameEngine stays the interactive front end.
+    """
+
+    def __init__(self, white: Player, black: Player, board: Optional[Board] = None,
+                 game_state: Optional[GameState] = None, max_turns: Optional[int] = None,
+                 cube_players: Optional[dict[str, CubePlayer]] = None, match: Optional[MatchState] = None) -> None:
+        self._board = board if board is not None else Board()
+        self._game_state = game_state if game_state is not None else GameState()
+        self._mediator = MoveMediator(self._board, self._game_state)
+
+        self._players = {"white": white, "black": black}
+        self._max_turns = max_turns
+        self._cube_players = cube_players
+        self._match = match
+
+        self._start = list(self._board.get_counts)
+        self._first_player = self._game_state.get_current_player
+        self.history: list[Turn] = []
+
+        self.turns = 0
+        self.moves = 0
+
+    def run(self) -> Optional[str]:
+        """Plays until someone wins, returns the winner (None if max_turns was hit first)."""
+        while not self._game_state.check_winner(self._board):
+            if self._max_turns is not None and self.turns >= self._max_turns:
+                return None
+            self.play_turn()
+
+        return self._game_state.check_winner(self._board)
+
+    def play_turn(self) -> Play:
+        """Rolls, lets the current player choose a play, applies it and passes the turn."""
+        current_player = self._game_state.get_current_player
+        if self._cube_players is not None and self._cube_action(current_player):
+            # the double was dropped, the game is over
+            return ()
+        dice = self._game_state.roll_dice()
+        moves = GameState.explode_dice(dice)
+
+        play: Play = ()
+        steps: tuple[Step, ...] = ()
+        plays = MoveMediator.generate_moves(self._board, current_player, moves)
+        if plays:
+            play = self._players[current_player](self._board, current_player, tuple(moves), plays)
+            steps = self.apply_play(play, moves)
+        self.history.append(Turn(dice, steps))
+
+        self.turns += 1
+        self._game_state.next_turn()
+        return play
+
+    def _cube_action(self, player: str) -> bool:
+        """Lets player double if it wants to, returns whether the opponent dropped."""
+        cube = self._game_state.get_doubling_cube
+        crawford = self._match.get_crawford if self._match is not None else False
+        position = self._board.get_counts
+        if not cube.can_double(player, crawford):
+            return False
+        if not self._cube_players[player].should_double(position, player, cube, self._match):
+            return False
+
+        self._game_state.offer_double(crawford)
+        opponent = "black" if player == "white" else "white"
+        if self._cube_players[opponent].should_take(position, player, cube, self._match):
+            self._game_state.take_double()
+            tracer.debug("engine", "%s doubles to %s, %s takes", player, cube.get_value, opponent)
+            return False
+        self._game_state.drop_double()
+        tracer.debug("engine", "%s doubles, %s passes", player, opponent)
+        return True
+
+    def apply_play(self, play: Play, moves: list[int]) -> tuple[Step, ...]:
+        """
+        Plays the steps of play for the side on roll, using up moves (the dice of the roll
+        or what is left of them); returns the steps with their hit flags. The play is
+        not checked against generate_moves, a step that does not fit the board raises.
+        """
+        current_player = self._game_state.get_current_player
+        remaining = list(moves)
+        steps = []
+
+        for from_stack, to_stack in play:
+            origin = self._board.get_bar if from_stack == Board.BAR_SLOT[current_player] else from_stack
+
+            # keep the mediator-visible dice in sync with what is left of the roll
+            self._game_state.set_dice(tuple(remaining))
+            distance = self._mediator._calculate_distance(origin, to_stack, current_player)
+            _, hit_color = self._mediator.execute_move(origin, to_stack)
+            steps.append((from_stack, to_stack, hit_color is not None))
+
+            if distance in remaining:
+                remaining.remove(distance)
+            else:
+                remaining.remove(min(d for d in remaining if d > distance))
+            self.moves += 1
+        return tuple(steps)
+
+    def record(self, seed: int = 0, white: str = "", black: str = "") -> GameRecord:
+        """The game so far as a GameRecord, for a core.gameRecord.GameRecordWriter."""
+        winner = self._game_state.check_winner(self._board)
+        points = self._game_state.game_points(self._board) if winner else 0
+        return GameRecord(seed, white, black, self._start, self._first_player, list(self.history), winner, points)
+
+    # GETTERS
+    @property
+    def get_board(self) -> Board:
+        return self._board
+
+    @property
+    def get_game_state(self) -> GameState:
+        return self._game_state
@@ -0,0 +1,58 @@
+from typing import Optional
+
+
+class MatchState:
+    """
+    Score of a match to length points and where it stands with the Crawford rule: the
+    game right after a player first gets to one point away is the Crawford game, played
+    without the cube; the games after it are post-Crawford.
+    """
+
+    def __init__(self, length: int) -> None:
+        if length < 1:
+            raise ValueError("A match is played to at least 1 point")
+        self._length = length
+        self._score = {"white": 0, "black": 0}
+        self._crawford = False
+        self._post_crawford = False
+
+    def away(self, player: str) -> int:
+        """Points player still needs, 0 once the match is won."""
+        return max(self._length - self._score[player], 0)
+
+    def record_game(self, winner: str, points: int) -> None:
+        """Adds a finished game and moves the Crawford state on."""
+        if self.get_winner is not None:
+            raise ValueError("The match is already over")
+        loser = "black" if winner == "white" else "white"
+        self._score[winner] += points
+
+        if self._crawford:
+            self._crawford = False
+            self._post_crawford = True
+        elif not self._post_crawford and self.away(winner) == 1 and self.away(loser) > 1:
+            self._crawford = True
+
+    @property
+    def get_length(self) -> int:
+        return self._length
+
+    @property
+    def get_score(self) -> dict[str, int]:
+        return dict(self._score)
+
+    @property
+    def get_crawford(self) -> bool:
+        """Whether the next game is the Crawford game."""
+        return self._crawford
+
+    @property
+    def get_post_crawford(self) -> bool:
+        return self._post_crawford
+
+    @property
+    def get_winner(self) -> Optional[str]:
+        for player in ("white", "black"):
+            if self._score[player] >= self._length:
+                return player
+        return None
@@ -1,65 +1,75 @@
-from typing import Optional, Union
+from typing import Iterable, Iterator, Optional, Sequence, Union
 from datastructures.Bar import Bar
 from datastructures.Board import Board
 from core.gameState import GameState
+from core.trace import tracer
 from datastructures.Home import Home
-from datastructures.Stone import Stone
 
 
 class MoveMediator:
 
     # validator for the moves, communicates with GameState(checkes turn conditions) and changes the Board datastructure
+    # white moves 24 -> 1 and bears off to stack 0, black moves 1 -> 24 and bears off to stack 25
+
+    MAX_STONES_PER_STACK = 5
+
     def __init__(self, board: Board, game_state: GameState):
         self._board = board
         self._game_state = game_state
+        self.validate_calls = 0         # read by the engine's frame stats
 
     def validate_move(self, from_stack: Union[int, Bar], to_stack: int) -> bool:
+        self.validate_calls += 1
 
         current_player = self._game_state.get_current_player
         current_dice = self._game_state.get_current_dice
+        board = self._board
+        points = board.get_counts
+        sign = Board.SIGN[current_player]
 
         # If bar has stones, must re-enter
-        if self._board.get_bar_stones(current_player):
+        if points[Board.BAR_SLOT[current_player]]:
             if not isinstance(from_stack, Bar):
                 return False
+        elif isinstance(from_stack, Bar):
+            return False
+        elif not (1 <= from_stack <= 24) or points[from_stack] * sign <= 0:
+            return False
 
-        # calculate distance
-        try:
-            distance = self._calculate_distance(from_stack, to_stack, current_player)
-        except ValueError:
-            print("failed here")
-            return False 
+        if not (0 <= to_stack <= 25):
+            return False
 
-        # check if dice allow this move (except overshoot for bear-off)
-        if distance not in current_dice:
-            # allow overshoot ONLY if bearing off and no stones behind
-            if (self.can_bear_off(current_player) and
-                    self._is_bear_off_move(from_stack, to_stack, distance, current_dice, current_player)):
-                return True
+        # calculate distance
+        distance = self._calculate_distance(from_stack, to_stack, current_player)
+        if distance <= 0:
+            return False
 
-        # validate destination
         # bearing off
         if self._is_bearing_off(to_stack, current_player):
-            return self.can_bear_off(current_player)
+            if isinstance(from_stack, Bar) or not self.can_bear_off(current_player):
+                return False
+            if distance in current_dice:
+                return True
+            # allow overshoot ONLY if no stones behind
+            return self._is_bear_off_move(from_stack, to_stack, distance, current_dice, current_player)
 
-        # normal move
-        destination_stack = self._board.get_stack(to_stack)
-        stones = destination_stack.get_stones
+        # check if dice allow this move
+        if distance not in current_dice:
+            return False
 
-        # empty → allowed
-        if not stones:
-            return True
+        if to_stack in (Board.WHITE_HOME, Board.BLACK_HOME):
+            return False
 
-        # same color and < 5 stones → allowed
-        if stones[0].get_color == current_player and len(stones) < 5:
-            return True
+        # normal move
+        own = points[to_stack] * sign
 
-        # hit one stone of opposite color
-        if len(stones) == 1 and stones[0].get_color != current_player:
+        # empty or same color and < 5 stones → allowed
+        if 0 <= own < self.MAX_STONES_PER_STACK:
             return True
 
+        # hit one stone of opposite color
         # otherwise blocked
-        return False
+        return own == -1
 
     def _is_bearing_off(self, to_stack: int, player_color: str) -> bool:
         return (player_color == "white" and to_stack == 0) or \
@@ -68,151 +78,104 @@ class MoveMediator:
     def _is_bear_off_move(self, from_stack: int, to_stack: int, distance: int, dice: list[int], player_color: str) -> bool:
 
         # check if it's going to the bear-off "stack"
-        if player_color == "white" and to_stack != 25:
-            return False
-        if player_color == "black" and to_stack != 0:
+        if not self._is_bearing_off(to_stack, player_color):
             return False
 
         # check no stones behind
         if not self._no_stones_behind(from_stack, player_color):
             return False
 
-        # overshoot only if distance is greater than all dice values
-        return any(d >= distance for d in dice)
+        # overshoot only if a die is greater than the distance
+        return any(d > distance for d in dice)
 
     def can_bear_off(self, color: str) -> bool:
+        # O(1), the board keeps the count of stones outside home up to date
+        return self._board.can_bear_off(color)
+
+    @staticmethod
+    def points_can_bear_off(points: Sequence[int], color: str) -> bool:
+        """can_bear_off for a raw board array, used by evaluators working without a Board."""
         # quick bar check
-        if self._board.get_bar_stones(color):
+        if points[Board.BAR_SLOT[color]]:
             return False
 
-        # home quadrants in point numbers (1..24)
-        home_points = set(range(1, 7)) if color == "black" else set(range(19, 25))
+        # every own stone has to be inside the home quadrant
+        if color == "white":
+            return all(points[pt] <= 0 for pt in range(7, 25))
+        return all(points[pt] >= 0 for pt in range(1, 19))
 
-        stacks = list(self._board.get_stacks)
-        for pt in range(1, 25):
-            if pt in home_points:
-                continue
-            stones = stacks[pt - 1].get_stones
-            for s in stones:
-                # print(f"{s.get_color} sotne color, player color: {color}")
-                if s.get_color != color:
-                    # print("failed here")
-                    return False
-        return True
-
-    def execute_move(self, from_stack: Union[int, Bar], to_stack: int) -> tuple[Stone, Optional[Stone]]:
-        """Performs a legal move including hit, move, or bearing off."""
+    def execute_move(self, from_stack: Union[int, Bar], to_stack: int) -> tuple[str, Optional[str]]:
+        """Performs a legal move including hit, move, or bearing off.
+        Returns the color of the moved stone and the color of the hit stone (or None)."""
         current_player = self._game_state.get_current_player
         hit_stone = None
 
         # validate move
         if not self.validate_move(from_stack, to_stack):
             raise ValueError(f"Invalid move from stack index: {from_stack} to stack index: {to_stack} by {current_player}")
-        
-        distance = self._calculate_distance(from_stack, to_stack, current_player)
 
         # bar move
         if isinstance(from_stack, Bar):
-            moved_stone, hit_stone = self._process_bar_move(from_stack, to_stack)
-            return moved_stone, hit_stone
-
-        stone = self._board.get_stack(from_stack).peek_stone()
+            return self._process_bar_move(from_stack, to_stack)
 
-        # bearing off home is incexed 0 for black and 25 for white
-        if self.can_bear_off(current_player):
-            if (current_player == "white" and to_stack == 25) or (current_player == "black" and to_stack == 0):
-                self._board.move_stone(stone, self._board.get_home[stone.color])
-                return stone, None
+        # bearing off home is indexed 0 for white and 25 for black
+        if self._is_bearing_off(to_stack, current_player):
+            self._board.move_stone(current_player, from_stack, to_stack)
+            return current_player, None
 
         # hitting
-        if self._is_hit(to_stack, current_player):
-            hit_stone = self.hit_stone(to_stack)
-
-        # print(f"DEBUG: About to move stone from stack {from_stack} to {to_stack}")
-        # print(f"DEBUG: stone ref: {stone}, color: {stone.get_color}")
-        print(f"DEBUG: board location of stone: {self._board._stone_location.get(stone)}")
+        hit_stone = self.hit_stone(to_stack)
 
         # Basic condition
-        self._board.move_stone(stone, to_stack)
+        self._board.move_stone(current_player, from_stack, to_stack)
 
-        print("DEBUG BOARD STATE:")
-        for i in range(1, 25):
-            stones = [s.get_color for s in self._board.get_stack(i).get_stones]
-            if stones:
-                print(f"Stack {i}: {stones}")
-            print(self._board._bar)
-        return stone, hit_stone 
+        tracer.debug("moves", "%s moved %s -> %s", current_player, from_stack, to_stack, hit=hit_stone)
+        if tracer.enabled("board"):
+            stacks = ", ".join(f"{i}:{self._board.count(i)}{self._board.get_stack_color(i)[0]}"
+                               for i in range(1, 25) if self._board.count(i))
+            tracer.debug("board", "%s | %s", stacks, self._board.get_bar)
+        return current_player, hit_stone
 
-    def move_stone(self, stone: Stone, from_stack: Union[int, Bar, Home], to_stack: Union[int, Bar, Home]):
+    def move_stone(self, color: str, from_stack: Union[int, Bar, Home], to_stack: Union[int, Bar, Home]):
         """Bypasses full validation logic. Used for undo operations."""
+        slot = self._board._resolve_slot(from_stack, color)
+        self._board.remove_checker(slot, color)
+        self._board.add_checker(self._board._resolve_slot(to_stack, color), color)
 
-       
-        if isinstance(from_stack, Home):
-            from_stack.force_remove_stone(stone)
-        else:
-            from_stack.remove_stone(stone)
-
-        if isinstance(to_stack, int):
-            target_stack = self._board.get_stack(to_stack)
-            target_stack.add_stone(stone)
-            self._board.update_stone_location(stone, target_stack)
-        else:
-            to_stack.add_stone(stone)
-            self._board.update_stone_location(stone, to_stack)
-
-    def hit_stone(self, to_stack: int) -> Optional[Stone]:
+    def hit_stone(self, to_stack: int) -> Optional[str]:
 
         current_player = self._game_state.get_current_player
 
         if self._is_hit(to_stack, current_player):
-            stack = self._board.get_stack(to_stack)
-            stone = stack.peek_stone()
-            self._board.move_stone(stone, self._board.get_bar)
+            opponent = "black" if current_player == "white" else "white"
+            self._board.move_stone(opponent, to_stack, self._board.get_bar)
 
-            return stone
+            return opponent
 
         return None
 
-    def _process_bar_move(self, from_bar: Bar, to_stack: int) -> tuple[Stone, Optional[Stone]]:
+    def _process_bar_move(self, from_bar: Bar, to_stack: int) -> tuple[str, Optional[str]]:
         current_player = self._game_state.get_current_player
-        hit_stone = None
-
-        # take last stone of current player from bar
-        stone = from_bar.get_stones(current_player)[-1]
 
         # hitting
-        if self._is_hit(to_stack, current_player):
-            hit_stone = self._board.get_stack(to_stack).peek_stone()
-            self._board.move_stone(hit_stone, self._board.get_bar)
+        hit_stone = self.hit_stone(to_stack)
 
-        self._board.move_stone(stone, to_stack)
+        self._board.move_stone(current_player, from_bar, to_stack)
 
-        return stone, hit_stone
+        return current_player, hit_stone
 
     def _no_stones_behind(self, from_stack: int, color: str) -> bool:
         #  handles overshoot when bearing off
 
-        stacks = self._board.get_stacks
-        
-        if color == "white":
-            behind_range = range(from_stack + 1, 24)  # stacks higher than current
-        else:
-            behind_range = range(from_stack - 1, -1, -1)  # stacks lower than current
+        points = self._board.get_counts
 
-        for i in behind_range:
-            for stone in stacks[i].get_stones:
-                if stone.get_color == color:
-                    return False
-        return True
+        # only called once every stone is home, so only the home points can hold stones behind
+        if color == "white":
+            return all(points[i] <= 0 for i in range(from_stack + 1, 7))  # stacks higher than current
+        return all(points[i] >= 0 for i in range(19, from_stack))  # stacks lower than current
 
     def _calculate_distance(self, from_stack: Union[int, Bar], to_stack: int, player_color: str) -> int:
 
-        # special case: bearing off
-        if to_stack == 25 and player_color == "white":
-            return from_stack  
-        if to_stack == 0 and player_color == "black":
-            return 25 - from_stack 
-
         # bar move
         if isinstance(from_stack, Bar):
 
@@ -220,7 +183,13 @@ class MoveMediator:
                 return 25 - to_stack
             else:
                 return to_stack
-            
+
+        # special case: bearing off
+        if to_stack == 0 and player_color == "white":
+            return from_stack
+        if to_stack == 25 and player_color == "black":
+            return 25 - from_stack
+
         # normal move
         if player_color == "white":
             distance = from_stack - to_stack
@@ -228,20 +197,168 @@ class MoveMediator:
             distance = to_stack - from_stack
 
         if distance <= 0:
-            return -1  
+            return -1
         return distance
 
 
-    def _is_hit(self, to_stack: int, player_color: str) -> bool:
-        stack = self._board.get_stack(to_stack)
+    # Move generation
+    @classmethod
+    def generate_moves(cls, board: Union[Board, Sequence[int]], player: str, dice: Iterable[int]) -> list[tuple[tuple[tuple[int, int], ...], tuple[int, ...]]]:
+        """
+        Returns every full legal play for the given dice as (steps, position) pairs.
+        steps is a tuple of (from_stack, to_stack) moves, where the bar is given by its
+        board slot (Board.BAR_SLOT[player]) and bearing off goes to the player's home index.
+        board may also be a raw board array in the Board.get_counts layout.
+        position is the final board array as a tuple, plays that end in the same
+        position are returned once. An empty list means the player cannot move.
+
+        Plays have to use as many dice as possible, and when only one die can be used
+        it has to be the larger one if that is playable.
+        """
+        dice = tuple(sorted(dice, reverse=True))
+        results: dict[tuple[int, ...], tuple[tuple[tuple[int, int], ...], tuple[int, ...]]] = {}
+        best = [0, False]   # most dice used, whether a one-die play used the larger die
+
+        points = board.get_counts if isinstance(board, Board) else board
+        cls._search(list(points), player, dice, (), (), set(), results, best)
+
+        if not results:
+            return []
+        plays = list(results.values())
+        if best[0] == 1 and len(set(dice)) > 1 and best[1]:
+            plays = [(steps, position) for steps, position in plays if steps[0][2] == dice[0]]
+        return [(tuple(step[:2] for step in steps), position) for steps, position in plays
+                if len(steps) == best[0]]
+
+    @classmethod
+    def _search(cls, points: list[int], player: str, dice: tuple[int, ...], steps: tuple, used: tuple,
+                visited: set, results: dict, best: list) -> None:
+        moved = False
+        for index, die in enumerate(dice):
+            if index and dice[index - 1] == die:
+                continue
+            rest = dice[:index] + dice[index + 1:]
+
+            for from_stack, to_stack, after in cls.legal_steps(points, player, die):
+                moved = True
+                key = (tuple(after), rest)
+                if key in visited:
+                    continue
+                visited.add(key)
+                cls._search(after, player, rest, steps + ((from_stack, to_stack, die),),
+                            used + (die,), visited, results, best)
+
+        if moved or not steps:
+            return
+
+        # leaf: no further die can be played
+        if len(steps) > best[0]:
+            best[0] = len(steps)
+            best[1] = False
+            results.clear()
+        elif len(steps) < best[0]:
+            return
+        if len(steps) == 1 and steps[0][2] == max(dice + used):
+            best[1] = True
+
+        position = tuple(points)
+        if position not in results:
+            results[position] = (steps, position)
+
+    @classmethod
+    def legal_steps(cls, points: list[int], player: str, die: int) -> Iterator[tuple[int, int, list[int]]]:
+        """
+        Yields (from_stack, to_stack, resulting points) for every legal single move with die
+        on a board array, the bar as its board slot. Single steps only: whether a step can
+        be part of a full legal play is for generate_moves to say.
+        """
+        sign = Board.SIGN[player]
+        bar = Board.BAR_SLOT[player]
+        opponent_bar = Board.BAR_SLOT["black" if player == "white" else "white"]
+        limit = cls.MAX_STONES_PER_STACK
+
+        if player == "white":
+            home, step, outside = Board.WHITE_HOME, -1, range(7, 25)
+        else:
+            home, step, outside = Board.BLACK_HOME, 1, range(1, 19)
+
+        # re-entry is the only legal move while a stone is on the bar
+        if points[bar]:
+            to_stack = 25 - die if player == "white" else die
+            own = points[to_stack] * sign
+            if 0 <= own < limit or own == -1:
+                after = points[:]
+                after[bar] -= 1
+                if own == -1:
+                    after[to_stack] = 0
+                    after[opponent_bar] += 1
+                after[to_stack] += sign
+                yield bar, to_stack, after
+            return
+
+        can_bear_off = all(points[pt] * sign <= 0 for pt in outside)
+
+        for from_stack in range(1, 25):
+            if points[from_stack] * sign <= 0:
+                continue
+            to_stack = from_stack + step * die
+
+            if 1 <= to_stack <= 24:
+                own = points[to_stack] * sign
+                if not (0 <= own < limit or own == -1):
+                    continue
+                after = points[:]
+                after[from_stack] -= sign
+                if own == -1:
+                    after[to_stack] = 0
+                    after[opponent_bar] += 1
+                after[to_stack] += sign
+                yield from_stack, to_stack, after
+
+            elif can_bear_off:
+                # overshoot only when no own stone is further from home
+                if to_stack != home:
+                    behind = range(from_stack + 1, 7) if player == "white" else range(19, from_stack)
+                    if any(points[pt] * sign > 0 for pt in behind):
+                        continue
+                after = points[:]
+                after[from_stack] -= sign
+                after[home] += 1
+                yield from_stack, home, after
+
+    @classmethod
+    def playable_steps(cls, points: Sequence[int], player: str, dice: Sequence[int],
+                       finals: set[tuple[int, ...]]) -> dict[tuple[int, int], tuple[int, set[tuple[int, ...]]]]:
+        """
+        Single steps that can still end in one of finals, the final positions of the legal
+        plays of the whole roll: (from_stack, to_stack) -> (die, finals left after the step).
+        A step is playable when the rest of the dice can finish one of those plays from
+        where it leads, whichever die order that play was generated in. A step that more
+        than one die can make uses the smallest one that works.
+        """
+        points = list(points)
+        steps: dict[tuple[int, int], tuple[int, set[tuple[int, ...]]]] = {}
+        for die in sorted(set(dice)):
+            rest = list(dice)
+            rest.remove(die)
+            for from_stack, to_stack, after in cls.legal_steps(points, player, die):
+                if (from_stack, to_stack) in steps:
+                    continue
+                plays = cls.generate_moves(after, player, rest) if rest else []
+                reachable = ({position for _, position in plays} or {tuple(after)}) & finals
+                if reachable:
+                    steps[(from_stack, to_stack)] = (die, reachable)
+        return steps
 
-        if stack.is_empty():
+    def _is_hit(self, to_stack: int, player_color: str) -> bool:
+        if not (1 <= to_stack <= 24):
             return False
+        return self._board.get_counts[to_stack] * Board.SIGN[player_color] == -1
 
-        top_stone = stack.peek_stone()
-
-        if top_stone and len(stack.get_stones) == 1:
-            return top_stone.get_color != player_color
+    @property
+    def get_board(self) -> Board:
+        return self._board
 
-        return False
-    
\ No newline at end of file
+    @property
+    def get_game_state(self) -> GameState:
+        return self._game_state
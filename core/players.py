@@ -0,0 +1,40 @@
+from random import Random
+from typing import Callable, Optional, Protocol, Sequence
+
+from datastructures.Board import Board
+from datastructures.DoublingCube import DoublingCube
+from core.matchState import MatchState
+
+# a play is the tuple of (from_stack, to_stack) steps returned by MoveMediator.generate_moves
+Play = tuple[tuple[int, int], ...]
+LegalPlays = list[tuple[Play, tuple[int, ...]]]
+
+# player callables get the board, their color, the dice to use and the legal plays,
+# and return the steps of the play they choose
+Player = Callable[[Board, str, tuple[int, ...], LegalPlays], Play]
+
+
+class CubePlayer(Protocol):
+    # cube decisions of one side; position is the board array with the doubler on roll,
+    # match is None in money play
+
+    def should_double(self, position: Sequence[int], player: str, cube: DoublingCube,
+                      match: Optional[MatchState]) -> bool: ...
+
+    def should_take(self, position: Sequence[int], doubler: str, cube: DoublingCube,
+                    match: Optional[MatchState]) -> bool: ...
+
+
+def first_play(board: Board, player: str, dice: tuple[int, ...], plays: LegalPlays) -> Play:
+    """Always picks the first legal play, cheapest possible opponent."""
+    return plays[0][0]
+
+
+class RandomPlayer:
+    """Picks a uniformly random legal play from its own seeded generator."""
+
+    def __init__(self, seed: Optional[int] = None):
+        self._rng = Random(seed)
+
+    def __call__(self, board: Board, player: str, dice: tuple[int, ...], plays: LegalPlays) -> Play:
+        return self._rng.choice(plays)[0]
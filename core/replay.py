@@ -0,0 +1,133 @@
+"""
+Fast-forward replay of recorded or scripted games.
+
+    python -m core.replay games.bgr 1234 57          # position before turn 57 of game 1234
+    python -m core.replay games.bgr 1234 57 --step 1  # ... after the first step of that turn
+
+Every step goes through MoveMediator.execute_move, the same validation the engines use,
+but without rendering or a frame clock. The position at every
+checkpoint_every-th turn boundary is kept once it has been reached, so seeking to turn K
+replays at most checkpoint_every turns.
+"""
+
+import argparse
+from typing import Optional, Sequence
+
+from datastructures.Board import Board
+from datastructures.Dice import RandomDice
+from core.gameRecord import GameRecord, GameRecordReader
+from core.headlessEngine import HeadlessEngine
+from core.players import Play, first_play
+
+# (dice, steps) of one turn, steps as (from_stack, to_stack) pairs
+ReplayTurn = tuple[tuple[int, int], Play]
+
+
+class ReplayEngine:
+    """
+    Rebuilds any position of one game: seek(turn, step) leaves the board at the start of
+    turn (0 is the start position) with the first step steps of that turn applied.
+    """
+
+    def __init__(self, turns: Sequence[ReplayTurn], start: Optional[Sequence[int]] = None,
+                 first_player: str = "white", checkpoint_every: int = 16) -> None:
+        if checkpoint_every < 1:
+            raise ValueError("checkpoint_every must be at least 1")
+        self._turns = list(turns)
+        self._first_player = first_player
+        self._every = checkpoint_every
+
+        board = Board.from_counts(start) if start is not None else Board()
+        # the plays are applied through HeadlessEngine, the players are never asked
+        self._engine = HeadlessEngine(first_play, first_play, board=board)
+        self._board = board
+        self._game_state = self._engine.get_game_state
+
+        self._checkpoints: list[bytes] = [bytes(board.get_counts)]
+        self._turn = 0
+        self._step = 0
+
+    @classmethod
+    def from_record(cls, record: GameRecord, checkpoint_every: int = 16) -> "ReplayEngine":
+        turns = [(turn.dice, tuple((from_stack, to_stack) for from_stack, to_stack, _ in turn.steps))
+                 for turn in record.turns]
+        return cls(turns, record.start, record.first_player, checkpoint_every)
+
+    @classmethod
+    def from_moves(cls, seed: int, plays: Sequence[Play], start: Optional[Sequence[int]] = None,
+                   first_player: str = "white", checkpoint_every: int = 16) -> "ReplayEngine":
+        """Replays plays with the dice GameState(RandomDice(seed)) rolls, one play per turn."""
+        dice = RandomDice(seed)
+        turns = [(dice.roll(), tuple(play)) for play in plays]
+        return cls(turns, start, first_player, checkpoint_every)
+
+    def __len__(self) -> int:
+        return len(self._turns)
+
+    def player_at(self, turn: int) -> str:
+        """Side to move in turn, sides alternate every turn including the passed ones."""
+        if turn % 2 == 0:
+            return self._first_player
+        return "black" if self._first_player == "white" else "white"
+
+    def seek(self, turn: int, step: int = 0) -> Board:
+        """Moves the replay to (turn, step) and returns the live board, copy it to keep it."""
+        if not 0 <= turn <= len(self._turns):
+            raise IndexError(f"Turn {turn} out of range, the game has {len(self._turns)} turns")
+        if step and (turn == len(self._turns) or step > len(self._turns[turn][1])):
+            raise IndexError(f"Turn {turn} has no step {step}")
+
+        # continue from here when it is on the way, otherwise from the closest checkpoint
+        checkpoint = min(turn // self._every, len(self._checkpoints) - 1)
+        if self._step or not (checkpoint * self._every <= self._turn <= turn):
+            self._board.set_counts(self._checkpoints[checkpoint])
+            self._turn = checkpoint * self._every
+            self._step = 0
+
+        while self._turn < turn:
+            self._play(self._turn, len(self._turns[self._turn][1]))
+            self._turn += 1
+            if self._turn % self._every == 0 and self._turn // self._every == len(self._checkpoints):
+                self._checkpoints.append(bytes(self._board.get_counts))
+        if step:
+            self._play(turn, step)
+            self._step = step
+
+        return self._board
+
+    def position_at(self, turn: int, step: int = 0) -> Board:
+        """Independent copy of the board at (turn, step)."""
+        return self.seek(turn, step).copy()
+
+    def _play(self, turn: int, steps: int) -> None:
+        dice, play = self._turns[turn]
+        self._game_state.set_current_player(self.player_at(turn))
+        self._engine.apply_play(play[:steps], self._game_state.explode_dice(dice))
+
+
+def main(argv: Optional[list[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Rebuild a position from a game record.")
+    parser.add_argument("records", help="game record file written by core.gameRecord")
+    parser.add_argument("game", type=int)
+    parser.add_argument("turn", type=int)
+    parser.add_argument("--step", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    reader = GameRecordReader(args.records)
+    try:
+        record = reader.game(args.game)
+    finally:
+        reader.close()
+
+    replay = ReplayEngine.from_record(record)
+    board = replay.seek(args.turn, args.step)
+    player = replay.player_at(args.turn)
+    print(f"game {args.game} turn {args.turn} step {args.step}: {player} to move")
+    print(f"  position id {board.position_id(player)}")
+    print(f"  pips white {board.pip_count('white')}, black {board.pip_count('black')}")
+    if args.turn < len(record.turns):
+        print(f"  dice {record.turns[args.turn].dice}")
+
+
+if __name__ == "__main__":
+    main()
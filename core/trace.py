@@ -0,0 +1,117 @@
+"""
+Structured tracing with levels and categories, off by default.
+
+    BACKGAMMON_TRACE="engine=info,moves=debug"   python -m core.gameEngine
+    BACKGAMMON_TRACE="*=debug" BACKGAMMON_TRACE_FILE=trace.log   python -m simulation.selfPlay
+
+Hot paths call tracer.debug(category, message, *args, **fields). When the category is
+off that is one dict lookup and a compare: the message is a %-style template that is
+only formatted for enabled categories, and the formatted lines are written to the
+stream in batches. Anything more expensive to build (a board walk) goes behind
+`if tracer.enabled(category):`.
+
+Categories used in the tree: engine (turn flow), moves (validation and execution),
+events (the event bus), board (whole board dumps), render and server (server.gameServer).
+"""
+
+import atexit
+import os
+import sys
+import time
+from typing import Optional, TextIO
+
+DEBUG = 10
+INFO = 20
+WARNING = 30
+ERROR = 40
+OFF = 100
+
+LEVELS = {"debug": DEBUG, "info": INFO, "warning": WARNING, "error": ERROR, "off": OFF}
+LEVEL_NAMES = {value: name for name, value in LEVELS.items()}
+
+
+class BufferedSink:
+    """Formats trace records and writes them to a stream in batches of capacity lines."""
+
+    def __init__(self, stream: TextIO = sys.stderr, capacity: int = 512) -> None:
+        self._stream = stream
+        self._capacity = capacity
+        self._lines: list[str] = []
+        self._start = time.perf_counter()
+
+    def write(self, record: tuple) -> None:
+        # formatted right away: the arguments may be live objects that change later
+        stamp, level, category, message, args, fields = record
+        text = message % args if args else message
+        extra = "".join(f" {key}={value}" for key, value in fields.items())
+        self._lines.append(f"{stamp - self._start:10.6f} {LEVEL_NAMES[level]:<7} {category:<8} {text}{extra}\n")
+        if len(self._lines) >= self._capacity:
+            self.flush()
+
+    def flush(self) -> None:
+        if not self._lines:
+            return
+        self._stream.write("".join(self._lines))
+        self._lines.clear()
+        self._stream.flush()
+
+
+class Tracer:
+
+    def __init__(self, sink: Optional[BufferedSink] = None) -> None:
+        self._thresholds: dict[str, int] = {}
+        self._default = OFF
+        self.sink = sink if sink is not None else BufferedSink()
+
+    def configure(self, spec: str) -> None:
+        """Applies a 'category=level,...' spec, '*' sets the level of every other category."""
+        for part in filter(None, (p.strip() for p in spec.split(","))):
+            category, _, level = part.partition("=")
+            level = level or "debug"
+            if level not in LEVELS:
+                raise ValueError(f"Unknown trace level {level!r}")
+            if category == "*":
+                self._default = LEVELS[level]
+            else:
+                self._thresholds[category] = LEVELS[level]
+
+    def enable(self, category: str, level: int = DEBUG) -> None:
+        self._thresholds[category] = level
+
+    def disable(self, category: str) -> None:
+        self._thresholds[category] = OFF
+
+    def enabled(self, category: str, level: int = DEBUG) -> bool:
+        return level >= self._thresholds.get(category, self._default)
+
+    def debug(self, category: str, message: str, *args, **fields) -> None:
+        if DEBUG >= self._thresholds.get(category, self._default):
+            self.sink.write((time.perf_counter(), DEBUG, category, message, args, fields))
+
+    def info(self, category: str, message: str, *args, **fields) -> None:
+        if INFO >= self._thresholds.get(category, self._default):
+            self.sink.write((time.perf_counter(), INFO, category, message, args, fields))
+
+    def warning(self, category: str, message: str, *args, **fields) -> None:
+        if WARNING >= self._thresholds.get(category, self._default):
+            self.sink.write((time.perf_counter(), WARNING, category, message, args, fields))
+
+    def error(self, category: str, message: str, *args, **fields) -> None:
+        if ERROR >= self._thresholds.get(category, self._default):
+            self.sink.write((time.perf_counter(), ERROR, category, message, args, fields))
+
+    def flush(self) -> None:
+        self.sink.flush()
+
+
+def _from_environment() -> Tracer:
+    path = os.environ.get("BACKGAMMON_TRACE_FILE")
+    sink = BufferedSink(open(path, "a")) if path else BufferedSink()
+    configured = Tracer(sink)
+    configured.configure(os.environ.get("BACKGAMMON_TRACE", ""))
+    return configured
+
+
+# the process wide tracer every module logs through
+tracer = _from_environment()
+atexit.register(tracer.flush)
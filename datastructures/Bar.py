@@ -2,24 +2,34 @@ from datastructures.Stone import Stone
 from datastructures.interfaces import StoneContainer
 
 class Bar(StoneContainer):
-    def __init__(self):
-        self._bars = {"white": [], "black": []}
+    # view over the two bar slots of the board array
+
+    UID_BASE = {"white": 26 * 16, "black": 27 * 16}
+
+    def __init__(self, board):
+        self._board = board
 
     def must_reenter(self, color) -> bool:
         """Checkes if the bar of passed color has any stones in it"""
-        return len(self._bars[color]) > 0
+        return self._board.bar_count(color) > 0
 
     def add_stone(self, stone: Stone) -> None:
-        self._bars[stone.get_color].append(stone)
+        color = stone.get_color
+        self._board.add_checker(self._board.BAR_SLOT[color], color)
 
     def remove_stone(self, stone: Stone):
-        self._bars[stone.get_color].remove(stone)
+        color = stone.get_color
+        self._board.remove_checker(self._board.BAR_SLOT[color], color)
+
+    def count(self, color: str) -> int:
+        return self._board.bar_count(color)
 
-    def get_stones(self, color: str) -> Stone:
-        return self._bars[color]
+    def get_stones(self, color: str) -> list[Stone]:
+        base = self.UID_BASE[color]
+        return [Stone(base + i, color) for i in range(1, self.count(color) + 1)]
 
-    def get_bar(self, color: str):
-        self._bars[color]
+    def get_bar(self, color: str) -> list[Stone]:
+        return self.get_stones(color)
 
     def __repr__(self):
-        return f"White: {self._bars['white']}, black: {self._bars['black']}"
+        return f"White: {self.count('white')}, black: {self.count('black')}"
@@ -1,51 +1,92 @@
-from itertools import count
+from array import array
 from datastructures.Stack import Stack
-from datastructures.Stone import Stone
 from datastructures.Bar import Bar
 from datastructures.Home import Home
+from datastructures.Zobrist import Zobrist
+from datastructures.PositionId import PositionId
 
-from typing import Iterator, Union
+from typing import Optional, Union
 
 
 class Board:
     # facade that carries all the predefined datastructers
     # orchastrates the behavior between stones, pieces, bar
 
-    STACK_NUM = 24
-
-    def __init__(self):
-        self._stacks = []
-        self._bar = Bar()
-        self._stone_location: dict[Stone, Union[Stack, Bar, Home]] = {}
-        # add home for both parties
-        # self._home = Home()
+    # the whole position lives in one small fixed array of slots:
+    #   slot 0        -> stones white has borne off (white home)
+    #   slots 1..24   -> signed count per point, white > 0, black < 0
+    #   slot 25       -> stones black has borne off (black home)
+    #   slots 26, 27  -> white bar, black bar
+    # checkers of one color are interchangeable, so Stone objects are only
+    # built by the Stack/Bar views when the Renderer asks for them
 
-        self._home_white = Stack(25)
-        self._home_black = Stack(0)
-        self._home = {"white": self._home_white, "black": self._home_black}
+    STACK_NUM = 24
 
-        self._init_structures()
+    WHITE_HOME = 0
+    BLACK_HOME = 25
+    WHITE_BAR = 26
+    BLACK_BAR = 27
+    SLOT_NUM = 28
+
+    HOME_SLOT = {"white": WHITE_HOME, "black": BLACK_HOME}
+    BAR_SLOT = {"white": WHITE_BAR, "black": BLACK_BAR}
+    SIGN = {"white": 1, "black": -1}
+
+    # per slot: pips a stone of that color still has to travel, and whether it is outside home
+    PIP_VALUE = {
+        "white": [0] + list(range(1, 25)) + [0, 25, 0],
+        "black": [0] + list(range(24, 0, -1)) + [0, 0, 25],
+    }
+    OUTSIDE_HOME = {
+        "white": [0] * 7 + [1] * 18 + [0, 1, 0],
+        "black": [0] + [1] * 18 + [0] * 7 + [0, 1],
+    }
+
+    # the same tables and the bars indexed by sign, 1 for white and -1 (the last entry) for
+    # black, so make_move/unmake_move can look them up straight from a slot value
+    PIP_BY_SIGN = (None, PIP_VALUE["white"], PIP_VALUE["black"])
+    OUTSIDE_BY_SIGN = (None, OUTSIDE_HOME["white"], OUTSIDE_HOME["black"])
+    BAR_BY_SIGN = (None, WHITE_BAR, BLACK_BAR)
 
-    # probably will need to create an abstract factory if the rules and board is going to be custom, now is not required
-    def _init_structures(self):
+    def __init__(self):
+        self._points = array("b", bytes(self.SLOT_NUM))
 
-        # since the bar implementaion requires stack 0 and 25 might change that in the future
-        self._stacks = [Stack(i) for i in range (1, 25)]
-        self._stacks.append(self._home_white)
-        self._stacks.append(self._home_black)
+        # views are built lazily, copies made for simulation never need them
+        self._stacks: Optional[list[Stack]] = None
+        self._bar: Optional[Bar] = None
+        self._home_view: Optional[Home] = None
 
         self._place_stones()
+        self._recount()
+
+    def _recount(self) -> None:
+        """Rebuilds the running aggregates from the array after it was written directly."""
+        points = self._points
+
+        # Zobrist hash of the checkers, kept up to date by add_checker/remove_checker
+        self._hash = Zobrist.hash_points(points)
+
+        # pips left and stones outside the home board (bar included) per side, indexed by sign
+        self._pips = [0, 0, 0]
+        self._outside = [0, 0, 0]
+        for slot in range(self.SLOT_NUM):
+            color = self.slot_color(slot)
+            if color is None:
+                continue
+            count = abs(points[slot])
+            sign = self.SIGN[color]
+            self._pips[sign] += count * self.PIP_VALUE[color][slot]
+            self._outside[sign] += count * self.OUTSIDE_HOME[color][slot]
 
     def _place_stones(self):
-        uid_generator = count(start=1)
 
         bearing_off_layout = [
-            # Black's home (points 1-3)
+            # White's home (points 1-6)
             (1, 5, "white"),
-            (2, 5, "white"), 
+            (2, 5, "white"),
             (4, 5, "white"),
-            
-            # White's home (points 13-15)
+
+            # Black's home (points 19-24)
             (21, 5, "black"),
             (23, 5, "black"),
             (24, 5, "black")
@@ -57,114 +98,284 @@ class Board:
             (19, 5, "black"), (24, 2, "white")
         ]
 
-        # bar_stone_example = Stone(31, "white")
-        # self.get_bar.add_stone(bar_stone_example)
-        # self._stone_location[bar_stone_example] = self._bar
-
-
-        # bar_stone_example2 = Stone(32, "white")
-        # self.get_bar.add_stone(bar_stone_example2)
-        # self._stone_location[bar_stone_example2] = self._bar
-
-        # bar_stone_example_black = Stone(33, "black")
-        # self.get_bar.add_stone(bar_stone_example_black)
-        # self._stone_location[bar_stone_example_black] = self._bar
+        for index, number_of_pieces, color in initial_layout:
+            self._points[index] = self.SIGN[color] * number_of_pieces
+
+    def set_counts(self, points) -> None:
+        """Replaces the position in place with a board array in the get_counts layout."""
+        if len(points) != self.SLOT_NUM:
+            raise ValueError(f"Expected {self.SLOT_NUM} slots, got {len(points)}")
+        self._points[:] = array("b", points)
+        self._recount()
+
+    @classmethod
+    def from_counts(cls, points) -> "Board":
+        """Builds a board straight from a board array, without placing the opening layout first."""
+        if len(points) != cls.SLOT_NUM:
+            raise ValueError(f"Expected {cls.SLOT_NUM} slots, got {len(points)}")
+        board = cls.__new__(cls)
+        board._points = array("b", points)
+        board._stacks = None
+        board._bar = None
+        board._home_view = None
+        board._recount()
+        return board
+
+    @classmethod
+    def from_position_id(cls, position_id: str) -> tuple["Board", str]:
+        """Board and side to move of a PositionId text ID."""
+        points, player = PositionId.decode(position_id)
+        return cls.from_counts(points), player
+
+    def position_id(self, player: str) -> str:
+        """Short text ID of the position with player to move, see PositionId."""
+        return PositionId.encode(self._points, player)
+
+    def copy(self) -> "Board":
+        """Returns an independent board with the same position, without re-placing stones."""
+        board = Board.__new__(Board)
+        board._points = array("b", self._points)
+        board._hash = self._hash
+        board._pips = self._pips[:]
+        board._outside = self._outside[:]
+        board._stacks = None
+        board._bar = None
+        board._home_view = None
+        return board
+
+    def _resolve_slot(self, location: Union[int, Bar, Home, Stack], color: str) -> int:
+        if isinstance(location, int):
+            if not (0 <= location <= 25):
+                raise ValueError("Target stack number must be between 0 and 25")
+            return location
+        if isinstance(location, Bar):
+            return self.BAR_SLOT[color]
+        if isinstance(location, Home):
+            return self.HOME_SLOT[color]
+        if isinstance(location, Stack):
+            return location.index
+        raise TypeError(f"Invalid target type: {type(location)}")
+
+    def move_stone(self, color: str, origin: Union[int, Bar], target: Union[int, Bar, Home]) -> None:
+        """Moves one stone of color from origin to target (stack index, Bar or Home)."""
+        source = self._resolve_slot(origin, color)
+        destination = self._resolve_slot(target, color)
+
+        if source in (self.WHITE_HOME, self.BLACK_HOME):
+            raise TypeError("Cannot move a stone from home")
 
+        self.remove_checker(source, color)
+        self.add_checker(destination, color)
+
+    def add_checker(self, slot: int, color: str) -> None:
+        points = self._points
+        old = points[slot]
+        sign = self.SIGN[color]
+        if 1 <= slot <= 24:
+            if old * sign < 0:
+                raise ValueError(f"Stack {slot} is held by the other color")
+            points[slot] = old + sign
+        else:
+            points[slot] = old + 1
+        self._hash = Zobrist.update(self._hash, slot, old, points[slot])
+        self._pips[sign] += self.PIP_VALUE[color][slot]
+        self._outside[sign] += self.OUTSIDE_HOME[color][slot]
+
+    def remove_checker(self, slot: int, color: str) -> None:
+        points = self._points
+        old = points[slot]
+        sign = self.SIGN[color]
+        if 1 <= slot <= 24:
+            if old * sign <= 0:
+                raise ValueError(f"No {color} stone on stack {slot}")
+            points[slot] = old - sign
+        else:
+            if old <= 0:
+                raise ValueError(f"No {color} stone in slot {slot}")
+            points[slot] = old - 1
+        self._hash = Zobrist.update(self._hash, slot, old, points[slot])
+        self._pips[sign] -= self.PIP_VALUE[color][slot]
+        self._outside[sign] -= self.OUTSIDE_HOME[color][slot]
+
+    # Make / unmake
+    # undo and redo of MoveCommand: the array, the hash and the pip and outside counts are
+    # updated inline from flat tables indexed by slot and sign, without the checks of
+    # remove_checker/add_checker and without going through color names. Move generation
+    # and the searches stay on raw arrays, a 28-slot list slice is cheaper than a
+    # make/unmake pair (see Board.make_unmake and Board.copy in benchmarks.engineBench)
+    def make_move(self, from_slot: int, to_slot: int) -> tuple[int, int, bool]:
+        """
+        Moves the stone on from_slot to to_slot (board array slots, bar and homes included),
+        hitting a lone opposing stone there. No rule checks, the move has to be known legal.
+        Returns the (from_slot, to_slot, hit) delta that unmake_move takes back.
+        """
+        points = self._points
+        keys = Zobrist.FLAT_KEYS
+        width = Zobrist.WIDTH
+        offset = Zobrist.OFFSET
+
+        old = points[from_slot]
+        if old == 0 or from_slot == 0 or from_slot == 25:
+            raise ValueError(f"No stone to move on slot {from_slot}")
+        if from_slot <= 24:
+            sign = 1 if old > 0 else -1
+            new = old - sign
+        else:
+            sign = 1 if from_slot == 26 else -1
+            new = old - 1
+        points[from_slot] = new
+        key = from_slot * width + offset
+        h = self._hash ^ keys[key + old] ^ keys[key + new]
+
+        old = points[to_slot]
+        hit = False
+        if 1 <= to_slot <= 24:
+            if old == -sign:
+                # the lone opposing stone goes to its bar
+                hit = True
+                new = sign
+                bar = self.BAR_BY_SIGN[-sign]
+                count = points[bar]
+                points[bar] = count + 1
+                key = bar * width + offset
+                h ^= keys[key + count] ^ keys[key + count + 1]
+                self._pips[-sign] += self.PIP_BY_SIGN[-sign][bar] - self.PIP_BY_SIGN[-sign][to_slot]
+                self._outside[-sign] += self.OUTSIDE_BY_SIGN[-sign][bar] - self.OUTSIDE_BY_SIGN[-sign][to_slot]
+            else:
+                new = old + sign
+        else:
+            new = old + 1
+        points[to_slot] = new
+        key = to_slot * width + offset
+        self._hash = h ^ keys[key + old] ^ keys[key + new]
+
+        pips = self.PIP_BY_SIGN[sign]
+        outside = self.OUTSIDE_BY_SIGN[sign]
+        self._pips[sign] += pips[to_slot] - pips[from_slot]
+        self._outside[sign] += outside[to_slot] - outside[from_slot]
+        return from_slot, to_slot, hit
+
+    def unmake_move(self, delta: tuple[int, int, bool]) -> None:
+        """Takes back the make_move that returned delta, moves made after it have to be taken back first."""
+        from_slot, to_slot, hit = delta
+        points = self._points
+        keys = Zobrist.FLAT_KEYS
+        width = Zobrist.WIDTH
+        offset = Zobrist.OFFSET
+
+        # after the move to_slot holds the mover's stone, the homes have a fixed color
+        old = points[to_slot]
+        if 1 <= to_slot <= 24:
+            sign = 1 if old > 0 else -1
+            new = -sign if hit else old - sign
+        else:
+            sign = 1 if to_slot == 0 else -1
+            new = old - 1
+        points[to_slot] = new
+        key = to_slot * width + offset
+        h = self._hash ^ keys[key + old] ^ keys[key + new]
+
+        if hit:
+            # the hit stone, already put back on to_slot above, leaves its bar
+            bar = self.BAR_BY_SIGN[-sign]
+            count = points[bar]
+            points[bar] = count - 1
+            key = bar * width + offset
+            h ^= keys[key + count] ^ keys[key + count - 1]
+            self._pips[-sign] += self.PIP_BY_SIGN[-sign][to_slot] - self.PIP_BY_SIGN[-sign][bar]
+            self._outside[-sign] += self.OUTSIDE_BY_SIGN[-sign][to_slot] - self.OUTSIDE_BY_SIGN[-sign][bar]
+
+        old = points[from_slot]
+        new = old + sign if from_slot <= 24 else old + 1
+        points[from_slot] = new
+        key = from_slot * width + offset
+        self._hash = h ^ keys[key + old] ^ keys[key + new]
+
+        pips = self.PIP_BY_SIGN[sign]
+        outside = self.OUTSIDE_BY_SIGN[sign]
+        self._pips[sign] += pips[from_slot] - pips[to_slot]
+        self._outside[sign] += outside[from_slot] - outside[to_slot]
 
-        # bar_stone_example2_black = Stone(34, "black")
-        # self.get_bar.add_stone(bar_stone_example2_black)
-        # self._stone_location[bar_stone_example2_black] = self._bar
+    # GETTERS
+    def count(self, index: int) -> int:
+        """Number of stones on a stack (0 and 25 are the homes)."""
+        return abs(self._points[index])
+
+    def slot_color(self, slot: int) -> Optional[str]:
+        value = self._points[slot]
+        if value == 0:
+            return None
+        if slot == self.WHITE_HOME or slot == self.WHITE_BAR:
+            return "white"
+        if slot == self.BLACK_HOME or slot == self.BLACK_BAR:
+            return "black"
+        return "white" if value > 0 else "black"
 
-        
+    def get_stack(self, index: int) -> Stack:
+        if not (0 <= index <= 25):
+            raise ValueError(f"Stack index {index} out of range")
+        if index == 0:
+            return self.get_home["white"]
+        if index == 25:
+            return self.get_home["black"]
+        return self.get_stacks[index - 1]
 
-        for index, number_of_pieces, color in initial_layout:
-            stack = self._stacks[index - 1] # stack itself stores the 0-index values
+    def get_stack_color(self, index: int) -> Optional[str]:
+        return self.slot_color(index)
 
-            for _ in range(number_of_pieces):
-                stone = Stone(next(uid_generator), color)
-                self._stone_location[stone] = stack
-                stack.add_stone(stone)
+    def position_hash(self, player: str) -> int:
+        """64-bit Zobrist key of the position with player to move."""
+        return Zobrist.with_side(self._hash, player)
 
-    
-    # probably needs to update imput stone to stone_uid
-    def move_stone(self, stone: Stone, target: Union[int, Bar, Home]) -> None:
-        origin = self._stone_location[stone]
+    def pip_count(self, color: str) -> int:
+        return self._pips[self.SIGN[color]]
 
-        if isinstance(origin, Home):
-            raise TypeError("Cannot move a stone from home")
+    def outside_count(self, color: str) -> int:
+        """Stones of color not yet in their home board, stones on the bar included."""
+        return self._outside[self.SIGN[color]]
 
-        # remove stone from its origin (shared interface)
-        origin.remove_stone(stone)
+    def can_bear_off(self, color: str) -> bool:
+        return self._outside[self.SIGN[color]] == 0
 
-        # moving to another Stack
-        if isinstance(target, int):
-            if not (0 <= target <= 25):
-                raise ValueError("Target stack number must be between 0 and 25")
-            target_stack = self._stacks[target - 1]
-            target_stack.add_stone(stone)
-            self._stone_location[stone] = target_stack
+    def bar_count(self, color: str) -> int:
+        return self._points[self.BAR_SLOT[color]]
 
-        # moving to Bar (usually on hit)
-        elif isinstance(target, Bar):
-            target.add_stone(stone)
-            self._stone_location[stone] = target
+    def home_count(self, color: str) -> int:
+        return self._points[self.HOME_SLOT[color]]
 
-        # bearing off to Home
-        elif isinstance(target, Home):
-            target.add_stone(stone)
-            self._stone_location[stone] = target
+    def get_bar_stones(self, color: str) -> list:
+        return self.get_bar.get_stones(color)
 
-        else:
-            raise TypeError(f"Invalid target type: {type(target)}")
-        
-        
-    def update_stone_location(self, stone: Stone, location: Union[Stack, Bar, Home]) -> None:
-        self._stone_location[stone] = location
+    @property
+    def get_hash(self) -> int:
+        return self._hash
 
+    @property
+    def get_counts(self) -> array:
+        return self._points
 
-    # GETTERS
-    def get_stone_location(self, stone: Stone) -> Union[Stack, Bar, Home]:
-        return self._stone_location.get(stone)
-    
-    def get_stack(self, index: int) -> Stack:
-        if index == 0:
-            return self._home["black"]   # black home
-        if index == 25:
-            return self._home["white"]
-        
-        if not (1 <= index <= 24):
-            raise ValueError(f"Stack index {index} out of range")
-        return self._stacks[index - 1]
-    
-    def get_stack_color(self, index: int) -> str:
-        stack = self.get_stack(index)
-        if stack.is_empty():
-            return
-        return stack.peek_stone().get_color
-
-    def get_bar_stones(self, color: str) -> list[Stone]:
-        return self._bar.get_stones(color)
-    
     @property
     def get_stacks(self) -> list[Stack]:
+        # 24 points followed by the white and black home, as before
+        if self._stacks is None:
+            self._stacks = [Stack(i, self) for i in range(1, 25)]
+            self._stacks.append(Stack(self.WHITE_HOME, self))
+            self._stacks.append(Stack(self.BLACK_HOME, self))
         return self._stacks
-    
+
     @property
     def get_bar(self) -> Bar:
+        if self._bar is None:
+            self._bar = Bar(self)
         return self._bar
-    
+
+    @property
+    def get_home(self) -> dict[str, Stack]:
+        stacks = self.get_stacks
+        return {"white": stacks[24], "black": stacks[25]}
+
     @property
-    def get_home(self) -> Home:
-        return self._home
-    
-
-# def test():
-#     board = Board()
-#     # print(board._stone_location)
-#     # for stack in board.get_stacks:
-#     print(board._stone_location)
-#     some_stone = board._stacks[0].peek_piece()
-#     board.move_stone(some_stone, 3)
-#     print(board._stone_location)
-
-# test()
\ No newline at end of file
+    def get_home_view(self) -> Home:
+        if self._home_view is None:
+            self._home_view = Home(self)
+        return self._home_view
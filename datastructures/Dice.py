@@ -1,8 +1,102 @@
-from random import randint
+from abc import ABC, abstractmethod
+from random import Random
+from typing import Iterable, Union
 
-class Dice:
-    def __init__(self):
-        self._results = 0
+import numpy as np
 
-    def roll_dice(self):
-        self._result = randint(1, 6)
+# the 36 ordered rolls, roll code c is ROLLS[c] = (c // 6 + 1, c % 6 + 1)
+ROLLS = tuple((a, b) for a in range(1, 7) for b in range(1, 7))
+
+
+class DiceSource(ABC):
+    # where GameState gets its rolls from; every source is deterministic for a given
+    # seed, so the same seed gives the same game in any process
+
+    @abstractmethod
+    def roll(self) -> tuple[int, int]:
+        pass
+
+
+class RandomDice(DiceSource):
+    """Per-game random.Random generator, one randrange(36) per roll."""
+
+    def __init__(self, seed: Union[int, str, Random, None] = None) -> None:
+        rng = seed if isinstance(seed, Random) else Random(seed)
+        self._randrange = rng.randrange
+
+    def roll(self) -> tuple[int, int]:
+        return ROLLS[self._randrange(36)]
+
+
+class _BlockSource(DiceSource):
+    # hands out roll codes from a block filled by NumPy and refills it when it runs out
+
+    def __init__(self, seed: Union[int, np.random.SeedSequence, None] = None, block_size: int = 1024) -> None:
+        self._generator = np.random.Generator(np.random.PCG64(seed))
+        self._block_size = block_size
+        self._codes: list[int] = []
+        self._next = 0
+
+    @classmethod
+    def streams(cls, seed: int, count: int, block_size: int = 1024) -> list["_BlockSource"]:
+        """count statistically independent sources derived from one seed, e.g. one per worker or game."""
+        return [cls(child, block_size) for child in np.random.SeedSequence(seed).spawn(count)]
+
+    def roll(self) -> tuple[int, int]:
+        if self._next == len(self._codes):
+            self._codes = self._fill().tolist()
+            self._next = 0
+        code = self._codes[self._next]
+        self._next += 1
+        return ROLLS[code]
+
+    @abstractmethod
+    def _fill(self) -> np.ndarray:
+        pass
+
+
+class BlockDice(_BlockSource):
+    """Independent uniform rolls generated block_size at a time."""
+
+    def _fill(self) -> np.ndarray:
+        return self._generator.integers(0, 36, self._block_size, dtype=np.uint8)
+
+
+class QuasiRandomDice(_BlockSource):
+    """
+    Stratified rolls for variance reduction: every run of 36 rolls (counted from the
+    start) holds each ordered roll exactly once, in random order. Long run averages
+    converge faster than with independent rolls; single rolls are still uniform.
+    """
+
+    def __init__(self, seed: Union[int, np.random.SeedSequence, None] = None, block_size: int = 1008) -> None:
+        if block_size % 36:
+            raise ValueError("block_size must be a multiple of 36")
+        super().__init__(seed, block_size)
+
+    def _fill(self) -> np.ndarray:
+        strata = np.tile(np.arange(36, dtype=np.uint8), (self._block_size // 36, 1))
+        return self._generator.permuted(strata, axis=1).ravel()
+
+
+class ReplayDice(DiceSource):
+    """Plays back given rolls, e.g. [turn.dice for turn in record.turns] of a GameRecord."""
+
+    def __init__(self, rolls: Iterable[tuple[int, int]]) -> None:
+        self._rolls = [tuple(roll) for roll in rolls]
+        self._next = 0
+
+    def roll(self) -> tuple[int, int]:
+        if self._next == len(self._rolls):
+            raise IndexError(f"All {len(self._rolls)} recorded rolls have been used")
+        roll = self._rolls[self._next]
+        self._next += 1
+        return roll
+
+    @property
+    def get_remaining(self) -> int:
+        return len(self._rolls) - self._next
+
+
+# sources that only need a seed, by the name the command line tools use
+DICE_SOURCES = {"random": RandomDice, "block": BlockDice, "quasi": QuasiRandomDice}
@@ -0,0 +1,55 @@
+from typing import Optional
+
+
+class DoublingCube:
+    # value the game is played for, who may turn the cube next (None while it is in
+    # the middle, then either side may) and the double waiting for an answer, if any
+
+    MAX_VALUE = 64
+
+    def __init__(self) -> None:
+        self._value = 1
+        self._owner: Optional[str] = None
+        self._offered_by: Optional[str] = None
+
+    def can_double(self, player: str, crawford: bool = False) -> bool:
+        """Whether player may double now, never in the Crawford game of a match."""
+        return (not crawford and self._offered_by is None and self._value < self.MAX_VALUE
+                and self._owner in (None, player))
+
+    def offer(self, player: str, crawford: bool = False) -> None:
+        if not self.can_double(player, crawford):
+            raise ValueError(f"{player} cannot double now")
+        self._offered_by = player
+
+    def take(self) -> None:
+        """The opponent accepts: the value doubles and the cube changes hands."""
+        if self._offered_by is None:
+            raise ValueError("No double to take")
+        self._value *= 2
+        self._owner = "black" if self._offered_by == "white" else "white"
+        self._offered_by = None
+
+    def drop(self) -> tuple[str, int]:
+        """The opponent passes: returns the winner and the points, the value before the double."""
+        if self._offered_by is None:
+            raise ValueError("No double to drop")
+        winner, self._offered_by = self._offered_by, None
+        return winner, self._value
+
+    def reset(self) -> None:
+        self._value = 1
+        self._owner = None
+        self._offered_by = None
+
+    @property
+    def get_value(self) -> int:
+        return self._value
+
+    @property
+    def get_owner(self) -> Optional[str]:
+        return self._owner
+
+    @property
+    def get_offered_by(self) -> Optional[str]:
+        return self._offered_by
@@ -2,21 +2,24 @@ from datastructures.Stone import Stone
 from datastructures.interfaces import StoneContainer
 
 class Home(StoneContainer):
-    def __init__(self):
-        self._pieces: dict[str, list[Stone]] = {"white": [], "black": []}  # Clean and explicit
+    # view over the two borne-off slots of the board array
+
+    def __init__(self, board):
+        self._board = board
 
     def add_stone(self, stone: Stone) -> None:
         """Adds a stone to the correct player's home."""
-        self._pieces[stone.color].append(stone)
+        color = stone.get_color
+        self._board.add_checker(self._board.HOME_SLOT[color], color)
 
-    def remove_stone(self) -> None:
+    def remove_stone(self, stone: Stone) -> None:
         # not implemented, for the sake of shared interface
         return
 
     def get_pieces(self, color: str) -> list[Stone]:
         """Returns all stones borne off by a player."""
-        return self._pieces[color]
+        return self._board.get_home[color].get_stones
 
     def has_all_pieces(self, color: str, total_pieces: int = 15) -> bool:
         """Checks if a player has borne off all their pieces."""
-        return len(self._pieces[color]) >= total_pieces
\ No newline at end of file
+        return self._board.home_count(color) >= total_pieces
@@ -0,0 +1,141 @@
+import base64
+from typing import Sequence
+
+import numpy as np
+
+
+def _side_slots() -> dict[str, list[int]]:
+    # board array slots of one side in that side's own point order: its point 1 (next to
+    # bearing off) up to its point 24, then its bar; white moves 24 -> 1, black 1 -> 24
+    return {"white": list(range(1, 25)) + [26], "black": list(range(24, 0, -1)) + [27]}
+
+
+class PositionId:
+    # compact reversible key for a board array plus the side to move, in the style of
+    # GNU Backgammon position IDs: for the side to move and then the opponent, every one
+    # of its 25 slots (points 1..24 from its own side, then the bar) is written as one bit
+    # per checker followed by a 0, least significant bit first. 15 checkers and 25
+    # separators per side fit in 80 bits; borne off checkers are the ones not written.
+    # bit 80 holds the side to move, the text form is the 80-bit key in base64 (14
+    # characters, the GNU Backgammon shape) followed by ":w" or ":b"
+
+    CHECKERS = 15
+    SLOT_NUM = 28
+    WHITE_HOME = 0
+    BLACK_HOME = 25
+
+    KEY_BITS = 80
+    KEY_BYTES = 10
+    SIDE_BIT = 1 << KEY_BITS
+
+    SIDE_SLOTS = _side_slots()
+    SIDE_CODE = {"white": "w", "black": "b"}
+    SIDE_NAME = {"w": "white", "b": "black"}
+
+    @classmethod
+    def key(cls, points: Sequence[int], player: str) -> int:
+        """81-bit integer key of a board array (Board.get_counts layout) with player to move."""
+        runs = []
+        for side, sign in cls._order(player):
+            for slot in cls.SIDE_SLOTS[side]:
+                count = points[slot] if slot > 25 else max(points[slot] * sign, 0)
+                runs.append("1" * count)
+        # runs are written least significant bit first, int() reads the most significant first
+        key = int("0".join(runs)[::-1], 2)
+        return key | cls.SIDE_BIT if player == "black" else key
+
+    @classmethod
+    def from_key(cls, key: int) -> tuple[list[int], str]:
+        """Board array and side to move of a key."""
+        player = "black" if key & cls.SIDE_BIT else "white"
+        points = [0] * cls.SLOT_NUM
+
+        # least significant bit first, the runs of ones between the separators are the slot counts
+        runs = format(key & (cls.SIDE_BIT - 1), f"0{cls.KEY_BITS}b")[::-1].split("0")
+        counts = [len(run) for run in runs[:50]]
+
+        for (side, sign), side_counts in zip(cls._order(player), (counts[:25], counts[25:])):
+            on_board = sum(side_counts)
+            if on_board > cls.CHECKERS:
+                raise ValueError(f"Position key has {on_board} {side} checkers")
+            for slot, count in zip(cls.SIDE_SLOTS[side], side_counts):
+                if count:
+                    points[slot] = count if slot > 25 else count * sign
+            points[cls.WHITE_HOME if side == "white" else cls.BLACK_HOME] = cls.CHECKERS - on_board
+        return points, player
+
+    @classmethod
+    def encode(cls, points: Sequence[int], player: str) -> str:
+        """Short text form, e.g. '4HPwATDgc/ABMA:w' for the opening position."""
+        key = cls.key(points, player) & (cls.SIDE_BIT - 1)
+        text = base64.b64encode(key.to_bytes(cls.KEY_BYTES, "little")).decode("ascii").rstrip("=")
+        return f"{text}:{cls.SIDE_CODE[player]}"
+
+    @classmethod
+    def decode(cls, position_id: str) -> tuple[list[int], str]:
+        text, _, side = position_id.partition(":")
+        if side not in cls.SIDE_NAME or len(text) != 14:
+            raise ValueError(f"Invalid position ID {position_id!r}")
+        key = int.from_bytes(base64.b64decode(text + "=="), "little")
+        return cls.from_key(key | cls.SIDE_BIT if side == "b" else key)
+
+    @staticmethod
+    def _order(player: str) -> tuple[tuple[str, int], tuple[str, int]]:
+        white, black = ("white", 1), ("black", -1)
+        return (white, black) if player == "white" else (black, white)
+
+    # Bulk
+    @classmethod
+    def encode_many(cls, positions: np.ndarray, black_to_move: np.ndarray) -> np.ndarray:
+        """
+        Keys of an (N, 28) array of board arrays as an (N, 11) uint8 array:
+        the 80-bit key little endian in bytes 0..9, the side to move (1 = black) in byte 10.
+        """
+        positions = np.asarray(positions, dtype=np.int8).reshape(-1, cls.SLOT_NUM)
+        black_to_move = np.asarray(black_to_move, dtype=bool).reshape(-1)
+        n = len(positions)
+
+        white = positions[:, cls.SIDE_SLOTS["white"]].astype(np.int32)
+        black = positions[:, cls.SIDE_SLOTS["black"]].astype(np.int32)
+        white[:, :24] = np.maximum(white[:, :24], 0)
+        black[:, :24] = np.maximum(-black[:, :24], 0)
+
+        # (N, 50) slot counts in key order: side to move first
+        counts = np.where(black_to_move[:, None], np.hstack([black, white]), np.hstack([white, black]))
+
+        # the separator after slot i sits at (checkers up to and including i) + i,
+        # every bit before the last separator that is not a separator is a checker
+        separators = np.cumsum(counts, axis=1) + np.arange(50)
+        bits = (np.arange(cls.KEY_BITS) < separators[:, -1:]).astype(np.uint8)
+        bits[np.repeat(np.arange(n), 50), separators.ravel()] = 0
+
+        keys = np.zeros((n, cls.KEY_BYTES + 1), dtype=np.uint8)
+        keys[:, :cls.KEY_BYTES] = np.packbits(bits, axis=1, bitorder="little")
+        keys[:, cls.KEY_BYTES] = black_to_move
+        return keys
+
+    @classmethod
+    def decode_many(cls, keys: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+        """Inverse of encode_many: (N, 28) int8 board arrays and the (N,) black to move flags."""
+        keys = np.asarray(keys, dtype=np.uint8).reshape(-1, cls.KEY_BYTES + 1)
+        n = len(keys)
+        black_to_move = keys[:, cls.KEY_BYTES].astype(bool)
+
+        bits = np.unpackbits(keys[:, :cls.KEY_BYTES], axis=1, bitorder="little")
+        # the first 50 zero bits of a row are its separators (a stable sort puts them first),
+        # the checkers of slot i are the ones between separators i - 1 and i
+        separators = np.argsort(bits, axis=1, kind="stable")[:, :50]
+        ones_before = np.take_along_axis(np.cumsum(bits, axis=1, dtype=np.int32), separators, axis=1)
+        counts = np.diff(ones_before, axis=1, prepend=0)
+
+        first, second = counts[:, :25], counts[:, 25:50]
+        white = np.where(black_to_move[:, None], second, first)
+        black = np.where(black_to_move[:, None], first, second)
+
+        positions = np.zeros((n, cls.SLOT_NUM), dtype=np.int8)
+        positions[:, cls.SIDE_SLOTS["white"]] = white
+        positions[:, cls.SIDE_SLOTS["black"][:24]] -= black[:, :24].astype(np.int8)
+        positions[:, cls.SIDE_SLOTS["black"][24]] = black[:, 24]
+        positions[:, cls.WHITE_HOME] = cls.CHECKERS - white.sum(axis=1)
+        positions[:, cls.BLACK_HOME] = cls.CHECKERS - black.sum(axis=1)
+        return positions, black_to_move
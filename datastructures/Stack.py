@@ -1,44 +1,55 @@
 from datastructures.Stone import Stone
 from datastructures.interfaces import StoneContainer
 
-from collections import deque
 
 class Stack(StoneContainer):
-    # stack is purely the datastructure that knows no gamelogic
+    # stack is purely a view over one slot of the board array that knows no gamelogic
+    # the Stone objects are built on demand, the board only stores counts
 
-    def __init__(self, index, *stones: Stone):
-        self.index = index
-        self._elements = deque(maxlen = 5)
+    UID_STRIDE = 16
 
-        for stone in stones:
-            self.add_stone(stone)
+    def __init__(self, index, board):
+        self.index = index
+        self._board = board
 
-    def add_stone(self, stone: Stone) -> bool:
+    def add_stone(self, stone: Stone) -> None:
         if not isinstance(stone, Stone):
             raise TypeError(f"Expected Stone, got {type(stone).__name__}")
-        
-        self._elements.append(stone)
 
+        self._board.add_checker(self.index, stone.get_color)
 
     def remove_last_stone(self) -> Stone:
-        return self._elements.pop()
-          
-    def remove_stone(self, stone: Stone) -> Stone:
-        return self._elements.remove(stone)
-      
+        stone = self.peek_stone()
+        self._board.remove_checker(self.index, stone.get_color)
+        return stone
+
+    def remove_stone(self, stone: Stone) -> None:
+        self._board.remove_checker(self.index, stone.get_color)
+
     def peek_stone(self) -> Stone:
-        return self._elements[-1]
-    
+        count = len(self)
+        if count == 0:
+            raise IndexError(f"Stack {self.index} is empty")
+        return Stone(self.index * self.UID_STRIDE + count, self.color)
+
     def is_empty(self) -> bool:
-        return len(self._elements) == 0
-    
+        return self._board.get_counts[self.index] == 0
+
+    @property
+    def color(self):
+        return self._board.slot_color(self.index)
+
     @property
-    def get_stones(self):
-        return self._elements
+    def get_stones(self) -> list[Stone]:
+        color = self.color
+        base = self.index * self.UID_STRIDE
+        return [Stone(base + i, color) for i in range(1, len(self) + 1)]
+
+    def __len__(self):
+        return self._board.count(self.index)
 
     def __repr__(self):
-        stones_list = [repr(stone) for stone in self._elements]
         return f"Stack {self.index}"
-    
+
     def __iter__(self):
-        return iter(self._elements)
\ No newline at end of file
+        return iter(self.get_stones)
@@ -0,0 +1,72 @@
+from typing import Any, Optional
+
+
+class TranspositionTable:
+    # bounded hash table keyed by 64-bit Zobrist keys
+    # one entry per bucket; a colliding store replaces the old entry when it is
+    # from an older search generation or the new entry was searched at least as deep
+
+    def __init__(self, size_bits: int = 16):
+        self._size = 1 << size_bits
+        self._mask = self._size - 1
+
+        self._keys: list[Optional[int]] = [None] * self._size
+        self._values: list[Any] = [None] * self._size
+        self._depths: list[int] = [0] * self._size
+        self._generations: list[int] = [0] * self._size
+
+        self._generation = 0
+        self._count = 0
+
+        self.hits = 0
+        self.misses = 0
+
+    def probe(self, key: int, min_depth: int = 0) -> Optional[Any]:
+        """Returns the stored value for key if it was searched at least min_depth deep."""
+        index = key & self._mask
+        if self._keys[index] == key and self._depths[index] >= min_depth:
+            self.hits += 1
+            return self._values[index]
+        self.misses += 1
+        return None
+
+    def store(self, key: int, value: Any, depth: int = 0) -> bool:
+        """Stores value under key, returns False when the replacement policy keeps the old entry."""
+        index = key & self._mask
+        stored = self._keys[index]
+
+        if stored is not None and stored != key:
+            if self._generations[index] == self._generation and self._depths[index] > depth:
+                return False
+        if stored is None:
+            self._count += 1
+
+        self._keys[index] = key
+        self._values[index] = value
+        self._depths[index] = depth
+        self._generations[index] = self._generation
+        return True
+
+    def new_search(self) -> None:
+        """Ages all entries so the next search may overwrite them freely."""
+        self._generation += 1
+
+    def clear(self) -> None:
+        self._keys = [None] * self._size
+        self._values = [None] * self._size
+        self._depths = [0] * self._size
+        self._generations = [0] * self._size
+        self._generation = 0
+        self._count = 0
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def capacity(self) -> int:
+        return self._size
+
+    def __len__(self):
+        return self._count
+
+    def __contains__(self, key: int) -> bool:
+        return self._keys[key & self._mask] == key
@@ -0,0 +1,49 @@
+from random import Random
+from typing import Iterable
+
+
+def _make_keys(seed: int, slot_num: int, max_stones: int) -> tuple[list[list[int]], int]:
+    rng = Random(seed)
+    keys = [
+        [0 if value == 0 else rng.getrandbits(64) for value in range(-max_stones, max_stones + 1)]
+        for _ in range(slot_num)
+    ]
+    return keys, rng.getrandbits(64)
+
+
+class Zobrist:
+    # 64-bit Zobrist keys for the board array
+    # every slot of the array gets one key per value it can hold (-15..15),
+    # the key for an empty slot is 0 so an empty board hashes to 0
+
+    SEED = 0x5EED_BAC6
+    MAX_STONES = 15
+    SLOT_NUM = 28
+
+    KEYS, BLACK_TO_MOVE = _make_keys(SEED, SLOT_NUM, MAX_STONES)
+
+    # the same keys in one flat list, slot * WIDTH + OFFSET + value, for Board.make_move
+    WIDTH = 2 * MAX_STONES + 1
+    OFFSET = MAX_STONES
+    FLAT_KEYS = [key for row in KEYS for key in row]
+
+    @classmethod
+    def hash_points(cls, points: Iterable[int]) -> int:
+        """Full hash of a board array, used once on creation and for positions outside a Board."""
+        h = 0
+        keys = cls.KEYS
+        offset = cls.MAX_STONES
+        for slot, value in enumerate(points):
+            h ^= keys[slot][value + offset]
+        return h
+
+    @classmethod
+    def update(cls, h: int, slot: int, old: int, new: int) -> int:
+        """Incremental update when one slot changes from old to new."""
+        keys = cls.KEYS[slot]
+        return h ^ keys[old + cls.MAX_STONES] ^ keys[new + cls.MAX_STONES]
+
+    @classmethod
+    def with_side(cls, h: int, player: str) -> int:
+        """Folds the side to move into a checker hash."""
+        return h ^ cls.BLACK_TO_MOVE if player == "black" else h
@@ -0,0 +1,167 @@
+"""
+Packed image atlas and pre-rendered board background.
+
+    python -m presentation.AssetAtlas            # writes assets/build/atlas.bmp, board.bmp, atlas.json
+
+The build packs every PNG in assets/images into one atlas, rows of frames sorted by
+height, and records each frame's rectangle in the manifest. The dice faces are
+512 px sources, they are scaled to DICE_FACE_SIZE on the way in. It also draws the
+board background with Renderer.draw_board_background and saves it with the layout it
+was drawn for. Both are written as uncompressed BMP: larger on disk, but loading one
+is a copy where a PNG of the same size takes longer to inflate than the board takes
+to draw.
+
+At runtime Assets hands out surfaces by name: the atlas is loaded and converted once,
+on the first lookup, and every frame is a subsurface of it made when first asked
+for. Without a build, or for a file the manifest does not list, the image file is
+loaded on its own as before. The background is only used while the Renderer layout
+matches the one it was drawn for.
+"""
+
+import argparse
+import json
+import os
+import time
+from typing import Optional
+
+import pygame as pg
+
+from core.trace import tracer
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+IMAGES_DIR = os.path.join(PROJECT_ROOT, "assets", "images")
+BUILD_DIR = os.path.join(PROJECT_ROOT, "assets", "build")
+
+MANIFEST = "atlas.json"
+ATLAS_IMAGE = "atlas.bmp"
+BACKGROUND_IMAGE = "board.bmp"
+
+ATLAS_WIDTH = 1024
+PADDING = 1
+DICE_FACE_SIZE = 64
+
+
+def _source_images(images_dir: str) -> dict[str, pg.Surface]:
+    images = {}
+    for filename in sorted(os.listdir(images_dir)):
+        if not filename.endswith(".png"):
+            continue
+        image = pg.image.load(os.path.join(images_dir, filename))
+        if filename.startswith("dice-"):
+            image = pg.transform.smoothscale(image, (DICE_FACE_SIZE, DICE_FACE_SIZE))
+        images[filename] = image
+    return images
+
+
+def pack(sizes: dict[str, tuple[int, int]], width: int = ATLAS_WIDTH) -> tuple[dict[str, tuple[int, int, int, int]], int]:
+    """Shelf packing: frames by decreasing height, left to right in rows; returns the rectangles and the height."""
+    frames = {}
+    x = y = row_height = 0
+    for name in sorted(sizes, key=lambda name: (-sizes[name][1], name)):
+        w, h = sizes[name]
+        if w > width:
+            raise ValueError(f"{name} is wider than the {width} px atlas")
+        if x + w > width:
+            x, y, row_height = 0, y + row_height + PADDING, 0
+        frames[name] = (x, y, w, h)
+        x += w + PADDING
+        row_height = max(row_height, h)
+    return frames, y + row_height
+
+
+def build(images_dir: str = IMAGES_DIR, build_dir: str = BUILD_DIR, width: int = ATLAS_WIDTH) -> dict:
+    """Writes the atlas, the background and the manifest to build_dir; returns the manifest."""
+    from presentation.Renderer import Renderer
+
+    images = _source_images(images_dir)
+    frames, height = pack({name: image.get_size() for name, image in images.items()}, width)
+    atlas = pg.Surface((width, height), pg.SRCALPHA)
+    for name, (x, y, _, _) in frames.items():
+        atlas.blit(images[name], (x, y))
+
+    background = pg.Surface((Renderer.WIDTH, Renderer.HEIGHT))
+    Renderer.draw_board_background(background)
+
+    os.makedirs(build_dir, exist_ok=True)
+    pg.image.save(atlas, os.path.join(build_dir, ATLAS_IMAGE))
+    pg.image.save(background, os.path.join(build_dir, BACKGROUND_IMAGE))
+    manifest = {
+        "atlas": ATLAS_IMAGE,
+        "size": [width, height],
+        "frames": {name: list(rect) for name, rect in frames.items()},
+        "background": BACKGROUND_IMAGE,
+        "layout": Renderer.layout_key(),
+    }
+    with open(os.path.join(build_dir, MANIFEST), "w") as stream:
+        json.dump(manifest, stream, indent=1)
+    return manifest
+
+
+def read_manifest(build_dir: str = BUILD_DIR) -> Optional[dict]:
+    try:
+        with open(os.path.join(build_dir, MANIFEST)) as stream:
+            return json.load(stream)
+    except (OSError, ValueError):
+        return None
+
+
+class Assets:
+    """
+    Surfaces by asset name, see Renderer.ASSET_FILES for the names and their files.
+    Nothing is loaded until a surface is first asked for.
+    """
+
+    def __init__(self, files: dict[str, str], build_dir: str = BUILD_DIR, images_dir: str = IMAGES_DIR) -> None:
+        self._files = files
+        self._build_dir = build_dir
+        self._images_dir = images_dir
+        self._manifest = read_manifest(build_dir)
+        self._atlas: Optional[pg.Surface] = None
+        self._surfaces: dict[str, Optional[pg.Surface]] = {}
+        if self._manifest is None:
+            tracer.info("render", "no asset atlas in %s, loading the image files", build_dir)
+
+    def __getitem__(self, name: str) -> Optional[pg.Surface]:
+        if name not in self._surfaces:
+            self._surfaces[name] = self._load(self._files[name])
+        return self._surfaces[name]
+
+    def _load(self, filename: str) -> Optional[pg.Surface]:
+        frame = self._manifest["frames"].get(filename) if self._manifest is not None else None
+        if frame is not None:
+            if self._atlas is None:
+                self._atlas = pg.image.load(os.path.join(self._build_dir, self._manifest["atlas"])).convert_alpha()
+            return self._atlas.subsurface(frame)
+        try:
+            return pg.image.load(os.path.join(self._images_dir, filename)).convert_alpha()
+        except pg.error as e:
+            tracer.error("render", "could not load %s: %s", filename, e)
+            return None
+
+    def background(self, layout: str) -> Optional[pg.Surface]:
+        """The pre-rendered board for layout, None without a build or when it was drawn for another layout."""
+        if self._manifest is None or self._manifest.get("layout") != layout:
+            return None
+        try:
+            return pg.image.load(os.path.join(self._build_dir, self._manifest["background"])).convert()
+        except pg.error as e:
+            tracer.error("render", "could not load the board background: %s", e)
+            return None
+
+
+def main(argv: Optional[list[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Pack the images into an atlas and pre-render the board.")
+    parser.add_argument("--images", default=IMAGES_DIR)
+    parser.add_argument("--out", default=BUILD_DIR)
+    parser.add_argument("--width", type=int, default=ATLAS_WIDTH)
+    args = parser.parse_args(argv)
+
+    start = time.perf_counter()
+    manifest = build(args.images, args.out, args.width)
+    width, height = manifest["size"]
+    print(f"{len(manifest['frames'])} images in a {width}x{height} atlas, "
+          f"written to {args.out} in {time.perf_counter() - start:.2f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,11 +1,12 @@
-import os
 from datastructures.Board import Board
 from datastructures.Stone import Stone
 
 
 from presentation.StoneAnimation import StoneAnimation
+from presentation.AssetAtlas import Assets
+from core.trace import tracer
 import pygame as pg
-from typing import List, Dict, Union
+from typing import List, Dict, Optional, Union
 from dataclasses import dataclass
 
 class Renderer:
@@ -15,8 +16,6 @@ class Renderer:
     WIDTH_BOARD = 15
     WIDTH = 1500
     HEIGHT = 800
-    screen = pg.display.set_mode((WIDTH, HEIGHT))
-    pg.display.set_caption("Backgammon")
     FPS = 30
     SQ_SIZE = HEIGHT // HEIGHT_BOARD
     # BACKGROUNG = pg.image.load(os.path.join('images', 'plocha.jpg'))
@@ -31,16 +30,33 @@ class Renderer:
     RED = (250, 0, 0)
     BLACK = (0, 0, 0)
 
+    # asset name -> image file, looked up in the atlas first (see presentation.AssetAtlas)
+    ASSET_FILES = {
+        "white_stone": "white_got.png",
+        "black_stone": "black_got.png",
+        "white_highlight": "white_highlight.png",
+        "black_highlight": "black_highlight.png",
+        "highlight_stack_buttom": "destination_light_bottom.png",
+        "highlight_stack_top": "destination_light.png",
+        "bearing_off_highlight": "bearing_off_light.png",
+    }
+
+    FONT_NAME = 'Comic Sans MS'
+    OVERLAY_FONT_SIZE = 16
+    TEXT_CACHE_LIMIT = 256
+
     def __init__(self, board: Board, screen_width: int =WIDTH, screen_height: int = HEIGHT):
         
         self.board = board
         
         self.screen = pg.display.set_mode((screen_width, screen_height))
-        self.assets = self._load_assets()
+        pg.display.set_caption("Backgammon")
+        self.assets = Assets(self.ASSET_FILES)
         self.animations: List[StoneAnimation] = []
         self.static_surface = pg.Surface((self.WIDTH, self.HEIGHT), pg.SRCALPHA)
         self.dynamic_surface = pg.Surface((self.WIDTH, self.HEIGHT), pg.SRCALPHA)
         self.dirty = True
+        self._drawn_key: Optional[tuple] = None    # what the last draw_frame put on screen
 
         self.text_color = (0, 0, 0)
         self.highlighted_stacks = []
@@ -54,49 +70,45 @@ class Renderer:
         self.description_rect = pg.Rect(self.SQ_SIZE * 16, self.SQ_SIZE, self.SQ_SIZE*8, self.SQ_SIZE * 11)  
 
 
-        # might not be the place to be
-        pg.font.init()
-        self.my_font = pg.font.SysFont('Comic Sans MS', 30)
-
-    def _load_assets(self) -> Dict[str, pg.Surface]:
-        return {
-            "white_stone": self._load_image("white_got.png"),
-            "black_stone": self._load_image("black_got.png"),
-            "white_highligh": self._load_image("white_highlight.png"),
-            "white_highligh": self._load_image("black_highlight.png"),
-            "board": pg.Surface((800, 600)),
-            "highlight_stack_buttom": self._load_image("destination_light_bottom.png"),
-            "highlight_stack_top": self._load_image("destination_light.png"),
-            "bearing_off_highlight": self._load_image("bearing_off_light.png")
-
-        }
-    
+        # surface caches, everything here is drawn once and only blitted afterwards
+        self._fonts: Dict[int, pg.font.Font] = {}
+        self._text_cache: Dict[tuple, pg.Surface] = {}
+        self._highlight_cache: Dict[tuple, pg.Surface] = {}
+        self.cache_hits = 0             # read by the engine's frame stats
 
-    def _load_image(self, filename: str):
-        """Loads the filenamblack_highlighte image from the assets folder"""
+        # frame stats overlay, rendered by set_overlay and blitted on top of every frame
+        self._overlay: Optional[pg.Surface] = None
+        self._overlay_font: Optional[pg.font.Font] = None
 
-        current_dir = os.path.dirname(__file__)
-        project_root = os.path.dirname(current_dir)
-
-        try:
-            image = pg.image.load(os.path.join(project_root, "assets", "images", filename)).convert_alpha()
-            return image
+        # might not be the place to be
+        pg.font.init()
+        self.my_font = self._font(30)
 
-        except pg.error as e:
-            print("Error occured", e)
-            
     def init(self):
-        
-
-        # redraw static background and stones
-        self._draw_board(self.static_surface)
+        # pre-rendered background from the asset build, drawn here without one
+        background = self.assets.background(self.layout_key())
+        if background is not None:
+            self.static_surface = background
+        else:
+            self.draw_board_background(self.static_surface)
         
         # Blit to screen
         self.screen.blit(self.static_surface, (0, 0))
         pg.display.flip()
 
-    def draw_frame(self, current_player, current_dice):
-        
+    def draw_frame(self, current_player, current_dice) -> bool:
+        """
+        Draws and flips the frame if anything on it changed since the last one: the
+        stones, the highlights, the player and dice, the overlay, a running animation or
+        a request_redraw. Returns whether it drew, an unchanged frame costs one compare.
+        """
+        key = (bytes(self.board.get_counts), tuple(self.highlighted_stacks), current_player,
+               tuple(current_dice), self._overlay)
+        if key == self._drawn_key and not self.dirty and not self.animations:
+            return False
+        self._drawn_key = key
+        self.dirty = False
+
         self.dynamic_surface.fill((0, 0, 0, 0))
         # Draw dynamic elements
         self._draw_stones(self.dynamic_surface)
@@ -113,9 +125,19 @@ class Renderer:
         # Combine layers
         self.screen.blit(self.static_surface, (0, 0))
         self.screen.blit(self.dynamic_surface, (0, 0))
+        if self._overlay is not None:
+            self.screen.blit(self._overlay, (8, 8))
 
         # Update display
         pg.display.flip() 
+        return True
+
+    def request_redraw(self) -> None:
+        """Makes the next draw_frame draw, e.g. after the window was uncovered."""
+        self.dirty = True
+
+    def animating(self) -> bool:
+        return bool(self.animations)
 
     # setter for hilighted stack
         
@@ -126,32 +148,83 @@ class Renderer:
                 # Determine which highlight image to use
                 if stack_id == 0:
                     # White home
-                    scaled_highlight = pg.transform.scale(
-                        self.assets["bearing_off_highlight"], self.white_home_rect.size
-                    )
                     rect = self.white_home_rect
+                    scaled_highlight = self._scaled_highlight("bearing_off_highlight", rect.size, smooth=False)
                 elif stack_id == 25:
                     # Black home (assuming 25 is the black home stack)
-                    scaled_highlight = pg.transform.scale(
-                        self.assets["bearing_off_highlight"], self.black_home_rect.size
-                    )
                     rect = self.black_home_rect
+                    scaled_highlight = self._scaled_highlight("bearing_off_highlight", rect.size, smooth=False)
                 elif 1 <= stack_id <= 13:
                     rect = self._stack_rect(stack_id)
-                    scaled_highlight = pg.transform.smoothscale(
-                        self.assets["highlight_stack_buttom"], rect.size
-                    )
+                    scaled_highlight = self._scaled_highlight("highlight_stack_buttom", rect.size)
                 elif 14 <= stack_id <= 24:
                     rect = self._stack_rect(stack_id)
-                    scaled_highlight = pg.transform.smoothscale(
-                        self.assets["highlight_stack_top"], rect.size
-                    )
+                    scaled_highlight = self._scaled_highlight("highlight_stack_top", rect.size)
                 else:
                     continue  # skip invalid stack_ids
 
                 # Draw the highlight
                 self.dynamic_surface.blit(scaled_highlight, rect.topleft)
-                self.dynamic_surface.blit(scaled_highlight, rect.topleft)
+
+    def _scaled_highlight(self, asset: str, size: tuple[int, int], smooth: bool = True) -> pg.Surface:
+        """
+        Highlight image scaled to size, built once per (image, size).
+        The overlay used to be blitted twice per frame, the cached surface has both passes baked in.
+        """
+        key = (asset, size, smooth)
+        surface = self._highlight_cache.get(key)
+        if surface is None:
+            scale = pg.transform.smoothscale if smooth else pg.transform.scale
+            scaled = scale(self.assets[asset], size)
+            surface = pg.Surface(size, pg.SRCALPHA)
+            surface.blit(scaled, (0, 0))
+            surface.blit(scaled, (0, 0))
+            self._highlight_cache[key] = surface
+        else:
+            self.cache_hits += 1
+        return surface
+
+    def _font(self, size: int) -> pg.font.Font:
+        font = self._fonts.get(size)
+        if font is None:
+            font = self._fonts[size] = pg.font.SysFont(self.FONT_NAME, size)
+        return font
+
+    def _render_text(self, text: str, size: int, color: tuple) -> pg.Surface:
+        """Rendered text surface, cached by (string, size, color)."""
+        key = (text, size, tuple(color))
+        surface = self._text_cache.get(key)
+        if surface is None:
+            if len(self._text_cache) >= self.TEXT_CACHE_LIMIT:
+                self._text_cache.clear()
+            surface = self._text_cache[key] = self._font(size).render(text, True, color)
+        else:
+            self.cache_hits += 1
+        return surface
+
+    def invalidate_caches(self) -> None:
+        """Drops every cached surface, call after the layout, resolution or assets change."""
+        self._text_cache.clear()
+        self._highlight_cache.clear()
+
+    def set_overlay(self, lines: Optional[list[str]]) -> None:
+        """
+        Renders lines into the overlay panel in the top left corner, None removes it.
+        Bypasses the text cache: the numbers change on every refresh.
+        """
+        if lines is None:
+            self._overlay = None
+            return
+        if self._overlay_font is None:
+            self._overlay_font = pg.font.SysFont("monospace", self.OVERLAY_FONT_SIZE)
+        font = self._overlay_font
+        rows = [font.render(line, True, self.WHITE) for line in lines]
+        height = font.get_linesize()
+        panel = pg.Surface((max(row.get_width() for row in rows) + 12, height * len(rows) + 12), pg.SRCALPHA)
+        panel.fill((0, 0, 0, 170))
+        for number, row in enumerate(rows):
+            panel.blit(row, (6, 6 + number * height))
+        self._overlay = panel
 
     def highlight_stacks(self, stack_ids: list[int]):
         self.highlighted_stacks = stack_ids
@@ -161,14 +234,13 @@ class Renderer:
 
     def draw_word_in_rect(self, word: str, numbers: tuple, color=(0, 0, 0)):
         font_size = 30
-        font = pg.font.SysFont('Comic Sans MS', font_size)
-        text_surf = font.render(word, True, color)
+        text_surf = self._render_text(word, font_size, color)
 
         text_rect = text_surf.get_rect(center=self.description_rect.center)
         self.dynamic_surface.blit(text_surf, text_rect)
 
         numbers_str = f"{numbers}"
-        numbers_surf = font.render(numbers_str, True, color)
+        numbers_surf = self._render_text(numbers_str, font_size, color)
 
         # Position numbers centered horizontally, slightly below the word
         numbers_rect = numbers_surf.get_rect(
@@ -225,8 +297,7 @@ class Renderer:
             text_rect = text_surface.get_rect(center=rect.center)
             self.screen.blit(text_surface, text_rect)
 
-            # for debugging console
-            print(f"Stack {stack_id}: {rect}")
+            tracer.debug("render", "stack %s: %s", stack_id, rect)
         
     def _stack_to_pixels(self, stack_id: int) -> tuple[int, int]:
         """
@@ -256,33 +327,41 @@ class Renderer:
         return int(x), int(y)
 
         
-    def _draw_board(self, surface):
-        color = self.WHITE_COLUMN
-        surface.fill(self.LITE_BROWN)
-        for c in range(self.WIDTH_BOARD):
-            for r in range(self.HEIGHT_BOARD):
+    @classmethod
+    def layout_key(cls) -> str:
+        """Everything draw_board_background depends on, a pre-rendered background is only used for the same key."""
+        return repr((cls.WIDTH, cls.HEIGHT, cls.WIDTH_BOARD, cls.HEIGHT_BOARD, cls.SQ_SIZE,
+                     cls.LITE_BROWN, cls.COLOR1, cls.WHITE_COLUMN, cls.BLACK_COLUMN, cls.RED, cls.BLACK))
+
+    @classmethod
+    def draw_board_background(cls, surface: pg.Surface) -> None:
+        """Draws the board from the layout constants alone, so the asset build can pre-render it."""
+        color = cls.WHITE_COLUMN
+        surface.fill(cls.LITE_BROWN)
+        for c in range(cls.WIDTH_BOARD):
+            for r in range(cls.HEIGHT_BOARD):
                 #outline
-                if r == 0 or c == 0 or c == self.WIDTH_BOARD-1 or r == self.HEIGHT_BOARD-1 or c == 7:
-                    pg.draw.rect(surface, self.COLOR1, pg.Rect(c*self.SQ_SIZE, r*self.SQ_SIZE, self.SQ_SIZE, self.SQ_SIZE))
+                if r == 0 or c == 0 or c == cls.WIDTH_BOARD-1 or r == cls.HEIGHT_BOARD-1 or c == 7:
+                    pg.draw.rect(surface, cls.COLOR1, pg.Rect(c*cls.SQ_SIZE, r*cls.SQ_SIZE, cls.SQ_SIZE, cls.SQ_SIZE))
                 #triangles
                 elif r == 1:
                     pg.draw.polygon(surface, color,
-                                [(c * self.SQ_SIZE, r * self.SQ_SIZE), ((c + 1) * self.SQ_SIZE, r * self.SQ_SIZE),
-                                    (c * self.SQ_SIZE + 0.5 * self.SQ_SIZE, 6 * self.SQ_SIZE)])
-                    if color == self.WHITE_COLUMN:
-                        color = self.BLACK_COLUMN
+                                [(c * cls.SQ_SIZE, r * cls.SQ_SIZE), ((c + 1) * cls.SQ_SIZE, r * cls.SQ_SIZE),
+                                    (c * cls.SQ_SIZE + 0.5 * cls.SQ_SIZE, 6 * cls.SQ_SIZE)])
+                    if color == cls.WHITE_COLUMN:
+                        color = cls.BLACK_COLUMN
                     else:
-                        color = self.WHITE_COLUMN
+                        color = cls.WHITE_COLUMN
                 elif r == 11:
                     pg.draw.polygon(surface, color,
-                                [(c * self.SQ_SIZE, (r+1) * self.SQ_SIZE), ((c + 1) * self.SQ_SIZE, (r+1) * self.SQ_SIZE),
-                                    (c * self.SQ_SIZE + 0.5 * self.SQ_SIZE, 7 * self.SQ_SIZE)])
+                                [(c * cls.SQ_SIZE, (r+1) * cls.SQ_SIZE), ((c + 1) * cls.SQ_SIZE, (r+1) * cls.SQ_SIZE),
+                                    (c * cls.SQ_SIZE + 0.5 * cls.SQ_SIZE, 7 * cls.SQ_SIZE)])
                 #to test a grid
-                # pg.draw.rect(screen, self.RED, pg.Rect(c * self.SQ_SIZE, r * self.SQ_SIZE, self.SQ_SIZE, self.SQ_SIZE), 2)
+                # pg.draw.rect(screen, cls.RED, pg.Rect(c * cls.SQ_SIZE, r * cls.SQ_SIZE, cls.SQ_SIZE, cls.SQ_SIZE), 2)
 
 
-        pg.draw.line(surface, self.BLACK, (7.5*self.SQ_SIZE, 0), (7.5*self.SQ_SIZE, self.HEIGHT_BOARD*self.SQ_SIZE), 10)
-        pg.draw.rect(surface, self.RED, pg.Rect(c * self.SQ_SIZE, r * self.SQ_SIZE, self.SQ_SIZE, self.SQ_SIZE), 2)
+        pg.draw.line(surface, cls.BLACK, (7.5*cls.SQ_SIZE, 0), (7.5*cls.SQ_SIZE, cls.HEIGHT_BOARD*cls.SQ_SIZE), 10)
+        pg.draw.rect(surface, cls.RED, pg.Rect(c * cls.SQ_SIZE, r * cls.SQ_SIZE, cls.SQ_SIZE, cls.SQ_SIZE), 2)
 
     def _draw_stones(self, surface: pg.Surface) -> None:
         for stack_id in range(1, 25):
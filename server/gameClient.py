@@ -0,0 +1,251 @@
+"""
+Client library for server.gameServer, the stand-in for real front ends in tests and
+load runs.
+
+    python -m server.gameClient --serve --tables 300                  # in-process server
+    python -m server.gameClient --unix /tmp/backgammon.sock --tables 300 --games 5
+
+The load run plays random games on many tables at once, one connection per table
+sitting both seats, and reports the move throughput and the request latencies.
+"""
+
+import argparse
+import asyncio
+import itertools
+import time
+from random import Random
+from typing import Optional
+
+from core.players import Play
+from server import protocol
+
+
+class GameServerError(Exception):
+    """The server answered a request with an error."""
+
+
+class TableView:
+    """Client side copy of a table, kept up to date from the table's events."""
+
+    def __init__(self, state: dict) -> None:
+        self.id = state["table"]
+        self.counts: list[int] = state["counts"]
+        self.player: str = state["player"]
+        self.dice: Optional[list[int]] = state["dice"]
+        self.seats: dict[str, bool] = state["seats"]
+        self.winner: Optional[str] = state["winner"]
+        self.points = 0
+
+    def apply(self, event: dict) -> None:
+        kind = event["type"]
+        if kind == "moved":
+            for slot, count in event["changes"]:
+                self.counts[slot] = count
+        elif kind == "rolled":
+            self.dice = event["dice"]
+        elif kind == "over":
+            self.winner = event["winner"]
+            self.points = event["points"]
+        elif kind in ("joined", "left"):
+            self.seats[event["color"]] = kind == "joined"
+
+        if event.get("next"):
+            self.player = event["next"]
+            self.dice = None
+
+
+class GameClient:
+    """
+    One connection to the server. Requests are awaited until their reply arrives; table
+    events update the TableView of every joined table and, with keep_events, are queued
+    for next_event().
+    """
+
+    def __init__(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter,
+                 keep_events: bool = True) -> None:
+        self._reader = reader
+        self._writer = writer
+        self._ids = itertools.count(1)
+        self._pending: dict[int, asyncio.Future] = {}
+        self._events: Optional[asyncio.Queue] = asyncio.Queue() if keep_events else None
+        self.tables: dict[int, TableView] = {}
+        self._read_task = asyncio.create_task(self._read())
+
+    @classmethod
+    async def connect(cls, host: str = protocol.DEFAULT_HOST, port: int = protocol.DEFAULT_PORT,
+                      keep_events: bool = True) -> "GameClient":
+        reader, writer = await asyncio.open_connection(host, port, limit=protocol.LINE_LIMIT)
+        return cls(reader, writer, keep_events)
+
+    @classmethod
+    async def connect_unix(cls, path: str, keep_events: bool = True) -> "GameClient":
+        reader, writer = await asyncio.open_unix_connection(path, limit=protocol.LINE_LIMIT)
+        return cls(reader, writer, keep_events)
+
+    async def close(self) -> None:
+        self._writer.close()
+        await self._read_task
+
+    async def __aenter__(self) -> "GameClient":
+        return self
+
+    async def __aexit__(self, *exc) -> None:
+        await self.close()
+
+    # Requests
+    async def request(self, op: str, **fields) -> dict:
+        request_id = next(self._ids)
+        reply = asyncio.get_running_loop().create_future()
+        self._pending[request_id] = reply
+        self._writer.write(protocol.encode({"op": op, "id": request_id, **fields}))
+        await self._writer.drain()
+        return await reply
+
+    async def create_table(self, seed: Optional[int] = None) -> int:
+        return (await self.request("create", seed=seed))["table"]
+
+    async def join(self, table: int, color: Optional[str] = None) -> TableView:
+        """Takes the color seat (watches only when color is None), returns the table's view."""
+        state = (await self.request("join", table=table, color=color))["state"]
+        view = self.tables.get(table)
+        if view is None:
+            view = self.tables[table] = TableView(state)
+        return view
+
+    async def roll(self, table: int) -> tuple[tuple[int, int], list[Play]]:
+        """The dice and the legal plays, an empty list when the turn passed."""
+        reply = await self.request("roll", table=table)
+        plays = [tuple(tuple(step) for step in steps) for steps in reply["plays"]]
+        return tuple(reply["dice"]), plays
+
+    async def move(self, table: int, from_stack: int, to_stack: int) -> None:
+        await self.request("move", table=table, **{"from": from_stack, "to": to_stack})
+
+    async def play(self, table: int, play: Play) -> None:
+        for from_stack, to_stack in play:
+            await self.move(table, from_stack, to_stack)
+
+    async def leave(self, table: int) -> None:
+        await self.request("leave", table=table)
+        self.tables.pop(table, None)
+
+    async def next_event(self) -> dict:
+        if self._events is None:
+            raise RuntimeError("Client was created with keep_events=False")
+        return await self._events.get()
+
+    # Reader task
+    async def _read(self) -> None:
+        try:
+            while True:
+                line = await self._reader.readline()
+                if not line:
+                    break
+                message = protocol.decode(line)
+                request_id = message.get("id")
+                if request_id is not None:
+                    reply = self._pending.pop(request_id)
+                    if message["type"] == "error":
+                        reply.set_exception(GameServerError(message["message"]))
+                    else:
+                        reply.set_result(message)
+                    continue
+
+                view = self.tables.get(message.get("table"))
+                if view is not None:
+                    view.apply(message)
+                if self._events is not None:
+                    self._events.put_nowait(message)
+        except ConnectionError:
+            pass
+        finally:
+            for reply in self._pending.values():
+                if not reply.done():
+                    reply.set_exception(ConnectionError("Connection to the game server closed"))
+            self._pending.clear()
+
+
+# Load run
+async def play_random_game(client: GameClient, seed: int, latencies: list[float]) -> tuple[str, int]:
+    """Creates a table, plays both sides with random plays, returns (winner, moves)."""
+    rng = Random(seed)
+    table = await client.create_table(seed)
+    await client.join(table, "white")
+    view = await client.join(table, "black")
+
+    moves = 0
+    while view.winner is None:
+        start = time.perf_counter()
+        _, plays = await client.roll(table)
+        latencies.append(time.perf_counter() - start)
+        if not plays:
+            continue
+        for from_stack, to_stack in rng.choice(plays):
+            start = time.perf_counter()
+            await client.move(table, from_stack, to_stack)
+            latencies.append(time.perf_counter() - start)
+            moves += 1
+
+    await client.leave(table)
+    return view.winner, moves
+
+
+async def load_run(args: argparse.Namespace) -> dict:
+    server = None
+    if args.serve:
+        from server.gameServer import GameServer
+        server = await GameServer().start(args.host, args.port, args.unix)
+
+    async def table_worker(worker: int, latencies: list[float]) -> int:
+        if args.unix:
+            client = await GameClient.connect_unix(args.unix, keep_events=False)
+        else:
+            client = await GameClient.connect(args.host, args.port, keep_events=False)
+        async with client:
+            moves = 0
+            for game in range(args.games):
+                moves += (await play_random_game(client, args.seed + worker * args.games + game, latencies))[1]
+            return moves
+
+    latencies: list[float] = []
+    start = time.perf_counter()
+    moves = sum(await asyncio.gather(*(table_worker(worker, latencies) for worker in range(args.tables))))
+    seconds = time.perf_counter() - start
+
+    if server is not None:
+        server.close()
+        await server.wait_closed()
+
+    latencies.sort()
+    return {
+        "tables": args.tables,
+        "games": args.tables * args.games,
+        "moves": moves,
+        "seconds": seconds,
+        "moves_per_second": moves / seconds,
+        "requests": len(latencies),
+        "latency_p50_ms": latencies[len(latencies) // 2] * 1000,
+        "latency_p99_ms": latencies[int(len(latencies) * 0.99)] * 1000,
+    }
+
+
+def main(argv: Optional[list[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Play random games on many server tables at once.")
+    parser.add_argument("--host", default=protocol.DEFAULT_HOST)
+    parser.add_argument("--port", type=int, default=protocol.DEFAULT_PORT)
+    parser.add_argument("--unix", metavar="PATH", help="connect to a Unix socket instead of TCP")
+    parser.add_argument("--serve", action="store_true", help="start a server in this process first")
+    parser.add_argument("--tables", type=int, default=100)
+    parser.add_argument("--games", type=int, default=1, help="games played on each table")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    result = asyncio.run(load_run(args))
+    print(f"{result['games']} games on {result['tables']} tables, {result['moves']} moves "
+          f"in {result['seconds']:.2f}s ({result['moves_per_second']:.0f} moves/s)")
+    print(f"  {result['requests']} requests, latency p50 {result['latency_p50_ms']:.2f} ms, "
+          f"p99 {result['latency_p99_ms']:.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,325 @@
+"""
+Asyncio game server: many concurrent tables in one process, clients on a local TCP or
+Unix socket speaking the line protocol in server.protocol.
+
+    python -m server.gameServer                          # TCP on 127.0.0.1:8765
+    python -m server.gameServer --unix /tmp/backgammon.sock
+
+Every table owns its own Board, GameState and MoveMediator (through a HeadlessEngine).
+Requests are handled synchronously between two reads: a roll is one move generation and
+a move one look-ahead per playable step, about a millisecond, so no request
+holds the event loop long enough to need a thread. A client that stops reading is
+dropped once MAX_BUFFERED bytes are waiting for it instead of slowing down its table.
+"""
+
+import argparse
+import asyncio
+import itertools
+from typing import Callable, Optional
+
+from datastructures.Dice import RandomDice
+from core.gameState import GameState
+from core.headlessEngine import HeadlessEngine
+from core.moveMediator import MoveMediator
+from core.players import first_play
+from core.trace import tracer
+from server import protocol
+
+MAX_BUFFERED = 1 << 20
+# room for hundreds of clients connecting at once
+BACKLOG = 1024
+
+
+class Table:
+    """One game: the engine, the seats and everyone who receives the table's events."""
+
+    def __init__(self, table_id: int, seed: Optional[int] = None) -> None:
+        self.id = table_id
+        self.seed = seed
+        # the plays come from the clients, the engine's players are never asked
+        self._engine = HeadlessEngine(first_play, first_play, game_state=GameState(RandomDice(seed)))
+        self._board = self._engine.get_board
+        self._game_state = self._engine.get_game_state
+
+        self.seats: dict[str, Optional["Connection"]] = {"white": None, "black": None}
+        self.watchers: set["Connection"] = set()
+        self.winner: Optional[str] = None
+
+        # state of the turn in progress
+        self._dice: Optional[tuple[int, int]] = None
+        self._remaining: list[int] = []
+        self._finals: set[tuple[int, ...]] = set()
+        self._steps_left = 0
+
+    @property
+    def get_current_player(self) -> str:
+        return self._game_state.get_current_player
+
+    def snapshot(self) -> dict:
+        return {
+            "table": self.id,
+            "counts": list(self._board.get_counts),
+            "player": self.get_current_player,
+            "dice": list(self._dice) if self._remaining else None,
+            "remaining": list(self._remaining),
+            "seats": {color: conn is not None for color, conn in self.seats.items()},
+            "winner": self.winner,
+        }
+
+    def roll(self) -> tuple[dict, list]:
+        """Rolls for the side to move, returns the rolled event and the legal plays."""
+        if self.winner:
+            raise ValueError("The game is over")
+        player = self.get_current_player
+        dice = self._game_state.roll_dice()
+        moves = GameState.explode_dice(dice)
+        plays = MoveMediator.generate_moves(self._board, player, moves)
+
+        event = {"type": "rolled", "table": self.id, "player": player, "dice": list(dice), "next": None}
+        if plays:
+            self._dice = dice
+            self._remaining = moves
+            self._finals = {position for _, position in plays}
+            self._steps_left = len(plays[0][0])
+        else:
+            self._game_state.next_turn()
+            event["next"] = self.get_current_player
+        return event, plays
+
+    def move(self, from_stack: int, to_stack: int) -> list[dict]:
+        """Plays one step of the current turn, returns the moved event and the over event if any."""
+        if not self._remaining:
+            raise ValueError("Roll the dice first")
+        player = self.get_current_player
+        die, finals = self._step_die(player, from_stack, to_stack)
+
+        before = list(self._board.get_counts)
+        (step,) = self._engine.apply_play(((from_stack, to_stack),), [die])
+        after = self._board.get_counts
+        changes = [[slot, after[slot]] for slot in range(len(before)) if before[slot] != after[slot]]
+
+        self._remaining.remove(die)
+        self._finals = finals
+        self._steps_left -= 1
+
+        event = {"type": "moved", "table": self.id, "player": player, "from": from_stack, "to": to_stack,
+                 "hit": step[2], "changes": changes, "next": None}
+        if self._steps_left:
+            return [event]
+
+        self._remaining = []
+        self.winner = self._game_state.check_winner(self._board)
+        if self.winner:
+            points = GameState.game_value(after, self.winner)
+            return [event, {"type": "over", "table": self.id, "winner": self.winner, "points": points}]
+        self._game_state.next_turn()
+        event["next"] = self.get_current_player
+        return [event]
+
+    def _step_die(self, player: str, from_stack: int, to_stack: int) -> tuple[int, set]:
+        """
+        Die for a step and the final positions still reachable after it. The step is legal
+        when the rest of the dice can still finish one of the legal plays of the roll.
+        """
+        steps = MoveMediator.playable_steps(self._board.get_counts, player, self._remaining, self._finals)
+        if (from_stack, to_stack) not in steps:
+            raise ValueError(f"Illegal move from {from_stack} to {to_stack} for {player}")
+        return steps[(from_stack, to_stack)]
+
+
+class Connection:
+    """Write side of one client, the tables it sits at or watches."""
+
+    _ids = itertools.count(1)
+
+    def __init__(self, writer: asyncio.StreamWriter) -> None:
+        self.id = next(self._ids)
+        self.tables: set[int] = set()
+        self._writer = writer
+
+    @property
+    def closed(self) -> bool:
+        return self._writer.is_closing()
+
+    def send(self, message: dict) -> None:
+        if self._writer.is_closing():
+            return
+        self._writer.write(protocol.encode(message))
+        if self._writer.transport.get_write_buffer_size() > MAX_BUFFERED:
+            tracer.warning("server", "dropping connection %s, it stopped reading", self.id)
+            self._writer.close()
+
+    async def drain(self) -> None:
+        if not self._writer.is_closing():
+            await self._writer.drain()
+
+
+class GameServer:
+    """Hosts up to max_tables tables and routes the clients' requests to them."""
+
+    def __init__(self, max_tables: int = 10000) -> None:
+        self.max_tables = max_tables
+        self.tables: dict[int, Table] = {}
+        self._table_ids = itertools.count(1)
+
+        self._ops: dict[str, Callable[[Connection, dict], dict]] = {
+            "create": self._create,
+            "join": self._join,
+            "roll": self._roll,
+            "move": self._move,
+            "leave": self._leave,
+        }
+
+    async def start(self, host: str = protocol.DEFAULT_HOST, port: int = protocol.DEFAULT_PORT,
+                    path: Optional[str] = None) -> asyncio.AbstractServer:
+        """Listens on the Unix socket path when given, otherwise on host:port."""
+        if path is not None:
+            return await asyncio.start_unix_server(self._serve, path, limit=protocol.LINE_LIMIT, backlog=BACKLOG)
+        return await asyncio.start_server(self._serve, host, port, limit=protocol.LINE_LIMIT, backlog=BACKLOG)
+
+    async def _serve(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        conn = Connection(writer)
+        tracer.info("server", "connection %s opened", conn.id)
+        try:
+            while not conn.closed:
+                line = await reader.readline()
+                if not line:
+                    break
+                try:
+                    message = protocol.decode(line)
+                except ValueError as exc:
+                    conn.send(protocol.error(None, f"Malformed message: {exc}"))
+                    continue
+                conn.send(self.handle(conn, message))
+                await conn.drain()
+        except (ConnectionError, ValueError) as exc:
+            # ValueError: a line longer than LINE_LIMIT
+            tracer.warning("server", "connection %s failed: %s", conn.id, exc)
+        finally:
+            self.disconnect(conn)
+            writer.close()
+            tracer.info("server", "connection %s closed", conn.id)
+
+    def handle(self, conn: Connection, message: dict) -> dict:
+        """Runs one request and returns its reply, the table events go out on the way."""
+        request_id = message.get("id")
+        handler = self._ops.get(message.get("op"))
+        if handler is None:
+            return protocol.error(request_id, f"Unknown op {message.get('op')!r}")
+
+        tracer.debug("server", "connection %s: %s", conn.id, message)
+        try:
+            reply = handler(conn, message)
+        except KeyError as exc:
+            return protocol.error(request_id, f"Missing field {exc}")
+        except (TypeError, ValueError) as exc:
+            return protocol.error(request_id, str(exc))
+        reply["type"] = "ok"
+        reply["id"] = request_id
+        return reply
+
+    def disconnect(self, conn: Connection) -> None:
+        for table_id in list(conn.tables):
+            self._leave_table(conn, self.tables[table_id])
+
+    # Table events
+    @staticmethod
+    def broadcast(table: Table, event: dict) -> None:
+        for conn in table.watchers:
+            conn.send(event)
+
+    def _table(self, message: dict) -> Table:
+        table = self.tables.get(message["table"])
+        if table is None:
+            raise ValueError(f"No table {message['table']}")
+        return table
+
+    def _seated_player(self, conn: Connection, table: Table) -> str:
+        player = table.get_current_player
+        if table.seats[player] is not conn:
+            raise ValueError(f"Not your turn, {player} is to move")
+        return player
+
+    def _leave_table(self, conn: Connection, table: Table) -> None:
+        for color, seated in table.seats.items():
+            if seated is conn:
+                table.seats[color] = None
+                self.broadcast(table, {"type": "left", "table": table.id, "color": color})
+        table.watchers.discard(conn)
+        conn.tables.discard(table.id)
+        if not table.watchers:
+            del self.tables[table.id]
+
+    # Ops
+    def _create(self, conn: Connection, message: dict) -> dict:
+        if len(self.tables) >= self.max_tables:
+            raise ValueError("The server is full")
+        table = Table(next(self._table_ids), message.get("seed"))
+        self.tables[table.id] = table
+        # the creator watches the table, so it lives until the creator leaves
+        table.watchers.add(conn)
+        conn.tables.add(table.id)
+        return {"table": table.id}
+
+    def _join(self, conn: Connection, message: dict) -> dict:
+        table = self._table(message)
+        color = message.get("color")
+        if color is not None:
+            if color not in table.seats:
+                raise ValueError(f"Unknown color {color!r}")
+            if table.seats[color] not in (None, conn):
+                raise ValueError(f"The {color} seat is taken")
+            table.seats[color] = conn
+        table.watchers.add(conn)
+        conn.tables.add(table.id)
+        if color is not None:
+            self.broadcast(table, {"type": "joined", "table": table.id, "color": color})
+        return {"state": table.snapshot()}
+
+    def _roll(self, conn: Connection, message: dict) -> dict:
+        table = self._table(message)
+        self._seated_player(conn, table)
+        event, plays = table.roll()
+        self.broadcast(table, event)
+        return {"dice": event["dice"], "plays": [[list(step) for step in steps] for steps, _ in plays]}
+
+    def _move(self, conn: Connection, message: dict) -> dict:
+        table = self._table(message)
+        self._seated_player(conn, table)
+        for event in table.move(int(message["from"]), int(message["to"])):
+            self.broadcast(table, event)
+        return {}
+
+    def _leave(self, conn: Connection, message: dict) -> dict:
+        table = self._table(message)
+        if conn not in table.watchers:
+            raise ValueError(f"Not at table {table.id}")
+        self._leave_table(conn, table)
+        return {}
+
+
+async def serve(host: str, port: int, path: Optional[str], max_tables: int) -> None:
+    server = await GameServer(max_tables).start(host, port, path)
+    tracer.info("server", "listening on %s", path or f"{host}:{port}")
+    async with server:
+        await server.serve_forever()
+
+
+def main(argv: Optional[list[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Host many backgammon tables for socket clients.")
+    parser.add_argument("--host", default=protocol.DEFAULT_HOST)
+    parser.add_argument("--port", type=int, default=protocol.DEFAULT_PORT)
+    parser.add_argument("--unix", metavar="PATH", help="listen on a Unix socket instead of TCP")
+    parser.add_argument("--max-tables", type=int, default=10000)
+    parser.add_argument("--trace", default="server=info", help="trace spec, see core.trace")
+    args = parser.parse_args(argv)
+
+    tracer.configure(args.trace)
+    try:
+        asyncio.run(serve(args.host, args.port, args.unix, args.max_tables))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
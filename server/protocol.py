@@ -0,0 +1,49 @@
+"""
+Wire format of the game server: one JSON object per line in both directions.
+
+Requests carry an "op" and an "id" the reply repeats:
+    {"op": "create", "id": 1, "seed": 7}                 -> {"type": "ok", "id": 1, "table": 3}
+    {"op": "join", "id": 2, "table": 3, "color": "white"} -> {"type": "ok", "id": 2, "state": {...}}
+    {"op": "roll", "id": 3, "table": 3}                  -> {"type": "ok", "id": 3, "dice": [5, 2], "plays": [...]}
+    {"op": "move", "id": 4, "table": 3, "from": 13, "to": 8}
+    {"op": "leave", "id": 5, "table": 3}
+Failed requests get {"type": "error", "id": ..., "message": "..."}.
+
+Everyone at a table (both seats and the watchers) receives its events, without an id:
+    {"type": "joined", "table": 3, "color": "black"}
+    {"type": "rolled", "table": 3, "player": "white", "dice": [5, 2], "next": null}
+    {"type": "moved", "table": 3, "player": "white", "from": 13, "to": 8, "hit": false,
+     "changes": [[8, 3], [13, 4]], "next": null}
+    {"type": "over", "table": 3, "winner": "white", "points": 1}
+    {"type": "left", "table": 3, "color": "black"}
+
+"changes" is the state delta: the [slot, count] pairs of the board array
+(Board.get_counts layout) the move changed. "next" is the side to move once the turn
+is over, null while the current turn goes on.
+"""
+
+import json
+from typing import Optional
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8765
+
+# longest accepted line, a roll reply with every legal play is well below this
+LINE_LIMIT = 1 << 20
+
+_encoder = json.JSONEncoder(separators=(",", ":"))
+
+
+def encode(message: dict) -> bytes:
+    return (_encoder.encode(message) + "\n").encode()
+
+
+def decode(line: bytes) -> dict:
+    message = json.loads(line)
+    if not isinstance(message, dict):
+        raise ValueError("Messages have to be JSON objects")
+    return message
+
+
+def error(request_id: Optional[int], message: str) -> dict:
+    return {"type": "error", "id": request_id, "message": message}
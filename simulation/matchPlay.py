@@ -0,0 +1,110 @@
+"""
+Match play between two agents with MET-based cube decisions.
+
+    python -m simulation.matchPlay --length 7 --matches 100 --white heuristic --black greedy
+    python -m simulation.matchPlay --length 5 --cube neural      # cube from the TD network outputs
+
+Every game is a HeadlessEngine game with both sides holding a MatchEquityCube; the
+MatchState carries the score and the Crawford state from game to game. A game still going
+after MAX_TURNS turns abandons its match, which is reported apart from the finished ones.
+"""
+
+import argparse
+import time
+from random import Random
+from typing import Optional
+
+from datastructures.Dice import RandomDice
+from core.gameState import GameState
+from core.headlessEngine import HeadlessEngine
+from core.matchState import MatchState
+from ai.agents import AGENTS
+from ai.evaluator import BearoffEvaluator, HeuristicEvaluator
+from ai.matchEquity import MatchEquityCube, evaluator_outputs, network_outputs
+from ai.neuralNet import NeuralNet
+from simulation.selfPlay import MAX_TURNS
+
+
+def cube_player(kind: str) -> Optional[MatchEquityCube]:
+    """heuristic: outputs derived from the heuristic equity, neural: the TD network, none: no cube."""
+    if kind == "none":
+        return None
+    if kind == "neural":
+        # asked for by name, so a missing network is an error rather than the heuristic
+        return MatchEquityCube(network_outputs(NeuralNet.load()))
+    return MatchEquityCube(evaluator_outputs(BearoffEvaluator(HeuristicEvaluator())))
+
+
+def play_match(white: str, black: str, length: int, cube: Optional[MatchEquityCube], seed: int,
+               max_turns: Optional[int] = MAX_TURNS) -> dict:
+    """
+    Plays one match, the side that opens each game alternates. The winner is None when a
+    game was given up after max_turns turns, the score is where the match stopped.
+    """
+    rng = Random(seed)
+    players = {"white": AGENTS[white](rng.getrandbits(32)), "black": AGENTS[black](rng.getrandbits(32))}
+    match = MatchState(length)
+    cube_players = {"white": cube, "black": cube} if cube is not None else None
+
+    games = doubles = drops = 0
+    while match.get_winner is None:
+        game_state = GameState(RandomDice(rng.getrandbits(64)))
+        if games % 2:
+            game_state.set_current_player("black")
+        engine = HeadlessEngine(players["white"], players["black"], game_state=game_state,
+                                cube_players=cube_players, match=match, max_turns=max_turns)
+        winner = engine.run()
+        if winner is None:
+            break
+        points = game_state.game_points(engine.get_board)
+
+        cube_value = game_state.get_doubling_cube.get_value
+        doubles += cube_value.bit_length() - 1
+        if engine.get_board.home_count(winner) < 15:
+            # won on a passed double
+            doubles += 1
+            drops += 1
+        match.record_game(winner, points)
+        games += 1
+
+    return {"winner": match.get_winner, "score": match.get_score, "games": games,
+            "doubles": doubles, "drops": drops}
+
+
+def main(argv: Optional[list[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Play matches between two agents with the doubling cube.")
+    parser.add_argument("--length", type=int, default=7)
+    parser.add_argument("--matches", type=int, default=20)
+    parser.add_argument("--white", choices=sorted(AGENTS), default="heuristic")
+    parser.add_argument("--black", choices=sorted(AGENTS), default="heuristic")
+    parser.add_argument("--cube", choices=["heuristic", "neural", "none"], default="heuristic")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--max-turns", type=int, default=MAX_TURNS,
+                        help="give up on a game, and its match, after this many turns (0: never)")
+    args = parser.parse_args(argv)
+
+    cube = cube_player(args.cube)
+    max_turns = args.max_turns or None
+    wins = {"white": 0, "black": 0}
+    games = doubles = drops = unfinished = 0
+    start = time.perf_counter()
+    for number in range(args.matches):
+        result = play_match(args.white, args.black, args.length, cube, args.seed + number, max_turns)
+        if result["winner"] is None:
+            unfinished += 1
+        else:
+            wins[result["winner"]] += 1
+        games += result["games"]
+        doubles += result["doubles"]
+        drops += result["drops"]
+
+    elapsed = time.perf_counter() - start
+    print(f"{args.matches} matches to {args.length} in {elapsed:.1f}s, {games} games")
+    print(f"  white ({args.white}) {wins['white']}, black ({args.black}) {wins['black']}")
+    print(f"  {doubles} doubles, {drops} passed")
+    if unfinished:
+        print(f"  unfinished {unfinished} (a game given up after {max_turns} turns)")
+
+
+if __name__ == "__main__":
+    main()
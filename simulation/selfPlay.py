@@ -0,0 +1,171 @@
+"""
+Self-play simulator: plays N complete headless games between two agents in a
+multiprocessing pool and reports throughput.
+
+    python -m simulation.selfPlay --games 10000 --workers 4 --white random --black first
+    python -m simulation.selfPlay --games 2000 --scaling 1,2,4,8
+    python -m simulation.selfPlay --games 10000 --record games.bgr    # keep every game, see core.gameRecord
+    python -m simulation.selfPlay --games 10000 --dice block           # NumPy block dice, see datastructures.Dice
+
+Every game gets its own generators seeded from (seed, game index), so a game
+replays identically no matter which worker plays it or how many workers there are.
+A game still running after MAX_TURNS turns is given up and reported as unfinished,
+so two agents that never finish a game cannot hold a worker forever.
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+from multiprocessing import Pool
+from random import Random
+from typing import Iterator, Optional
+
+from datastructures.Dice import DICE_SOURCES
+from core.gameState import GameState
+from core.gameRecord import GameRecordWriter
+from core.headlessEngine import HeadlessEngine
+from ai.agents import AGENTS
+
+# turns before a game is given up, far above what finished games take
+MAX_TURNS = 1000
+
+
+def game_rng(seed: int, game: int, stream: str) -> Random:
+    """Independent, reproducible generator for one stream (dice, white, black) of one game."""
+    return Random(f"{seed}:{game}:{stream}")
+
+
+def play_game(task: tuple[int, int, str, str, Optional[int], bool, str]) -> dict:
+    """Plays one full game, runs inside the pool workers."""
+    game, seed, white, black, max_turns, record, dice = task
+
+    # the dice seed goes into the game record, DICE_SOURCES[dice](dice_seed) replays the same dice
+    dice_seed = game_rng(seed, game, "dice").getrandbits(64)
+    game_state = GameState(DICE_SOURCES[dice](dice_seed))
+    engine = HeadlessEngine(
+        AGENTS[white](game_rng(seed, game, "white").getrandbits(32)),
+        AGENTS[black](game_rng(seed, game, "black").getrandbits(32)),
+        game_state=game_state,
+        max_turns=max_turns,
+    )
+
+    start = time.perf_counter()
+    winner = engine.run()
+    result = {
+        "game": game,
+        "winner": winner,
+        "turns": engine.turns,
+        "moves": engine.moves,
+        "seconds": time.perf_counter() - start,
+    }
+    if record:
+        result["record"] = engine.record(dice_seed, white, black)
+    return result
+
+
+def simulate(games: int, workers: int, white: str = "random", black: str = "random", seed: int = 0,
+             max_turns: Optional[int] = MAX_TURNS, chunksize: int = 16, record: bool = False,
+             dice: str = "random") -> Iterator[dict]:
+    """Yields each game result as soon as its worker finishes it, with its GameRecord when record is set."""
+    tasks = ((game, seed, white, black, max_turns, record, dice) for game in range(games))
+
+    if workers <= 1:
+        for task in tasks:
+            yield play_game(task)
+        return
+
+    with Pool(workers) as pool:
+        yield from pool.imap_unordered(play_game, tasks, chunksize)
+
+
+def run_batch(games: int, workers: int, args: argparse.Namespace, output=None,
+              recorder: Optional[GameRecordWriter] = None) -> dict:
+    """Plays one batch and aggregates the streamed results into a throughput summary."""
+    wins = {"white": 0, "black": 0, None: 0}
+    moves = 0
+    turns = 0
+
+    start = time.perf_counter()
+    for done, result in enumerate(simulate(games, workers, args.white, args.black, args.seed,
+                                           args.max_turns, args.chunksize, recorder is not None,
+                                           args.dice), start=1):
+        if recorder is not None:
+            recorder.write_game(result.pop("record"))
+        wins[result["winner"]] += 1
+        moves += result["moves"]
+        turns += result["turns"]
+
+        if output is not None:
+            output.write(json.dumps(result) + "\n")
+        if args.progress and done % args.progress == 0:
+            elapsed = time.perf_counter() - start
+            print(f"  {done}/{games} games, {done / elapsed:.1f} games/s", file=sys.stderr)
+
+    elapsed = time.perf_counter() - start
+    return {
+        "workers": workers,
+        "games": games,
+        "seconds": elapsed,
+        "games_per_sec": games / elapsed,
+        "moves_per_sec": moves / elapsed,
+        "turns": turns,
+        "moves": moves,
+        "white_wins": wins["white"],
+        "black_wins": wins["black"],
+        "unfinished": wins[None],
+        "max_turns": args.max_turns,
+    }
+
+
+def _print_summary(summary: dict) -> None:
+    print(f"{summary['games']} games with {summary['workers']} worker(s) in {summary['seconds']:.2f}s")
+    print(f"  {summary['games_per_sec']:.1f} games/s, {summary['moves_per_sec']:.1f} moves/s")
+    print(f"  white {summary['white_wins']}, black {summary['black_wins']}")
+    if summary["unfinished"]:
+        print(f"  unfinished {summary['unfinished']} (given up after {summary['max_turns']} turns)")
+
+
+def main(argv: Optional[list[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Play headless self-play games in a process pool.")
+    parser.add_argument("-n", "--games", type=int, default=1000)
+    parser.add_argument("-w", "--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--white", choices=sorted(AGENTS), default="random")
+    parser.add_argument("--black", choices=sorted(AGENTS), default="random")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--dice", choices=sorted(DICE_SOURCES), default="random", help="dice source of every game")
+    parser.add_argument("--max-turns", type=int, default=MAX_TURNS,
+                        help="give up on a game after this many turns, 0 plays every game to the end")
+    parser.add_argument("--chunksize", type=int, default=16)
+    parser.add_argument("--output", help="append one JSON line per finished game to this file")
+    parser.add_argument("--record", help="append every game to this binary game record file")
+    parser.add_argument("--progress", type=int, default=0, help="print progress every N games")
+    parser.add_argument("--scaling", help="comma separated worker counts to compare, e.g. 1,2,4")
+    args = parser.parse_args(argv)
+    args.max_turns = args.max_turns or None
+
+    output = open(args.output, "a") if args.output else None
+    recorder = GameRecordWriter(args.record) if args.record else None
+    try:
+        if not args.scaling:
+            _print_summary(run_batch(args.games, args.workers, args, output, recorder))
+            return
+
+        # same games for every worker count, so the numbers are comparable
+        summaries = [run_batch(args.games, int(w), args, output, recorder) for w in args.scaling.split(",")]
+        base = summaries[0]["games_per_sec"]
+        print(f"{'workers':>8} {'games/s':>10} {'moves/s':>12} {'speedup':>8} {'efficiency':>10}")
+        for summary in summaries:
+            speedup = summary["games_per_sec"] / base
+            print(f"{summary['workers']:>8} {summary['games_per_sec']:>10.1f} {summary['moves_per_sec']:>12.1f} "
+                  f"{speedup:>8.2f} {speedup / summary['workers'] * summaries[0]['workers']:>10.2f}")
+    finally:
+        if output is not None:
+            output.close()
+        if recorder is not None:
+            recorder.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,63 @@
+"""
+Shared fixtures: positions and game records from seeded random games, the same on every run.
+"""
+
+from random import Random
+
+import pytest
+
+from core.gameState import GameState
+from core.headlessEngine import HeadlessEngine
+from core.moveMediator import MoveMediator
+from core.players import RandomPlayer
+from datastructures.Board import Board
+from datastructures.Dice import RandomDice
+
+SEED = 7
+
+
+def play_steps(board: Board, player: str, steps) -> None:
+    """Plays generate_moves steps on board through the public Board API, a hit stone goes to its bar first."""
+    opponent = "black" if player == "white" else "white"
+    for from_stack, to_stack in steps:
+        origin = board.get_bar if from_stack == Board.BAR_SLOT[player] else from_stack
+        if 1 <= to_stack <= 24 and board.get_stack_color(to_stack) == opponent:
+            board.move_stone(opponent, to_stack, board.get_bar)
+        board.move_stone(player, origin, to_stack)
+
+
+def random_positions(games: int, seed: int = SEED) -> list[tuple[Board, str, list[int]]]:
+    """
+    (board, player on roll, dice) before every turn of games random games. Doubles
+    come as four dice half of the time and as the two the engine uses otherwise.
+    """
+    rng = Random(seed)
+    positions = []
+    for _ in range(games):
+        board, player = Board(), "white"
+        while board.home_count("white") < 15 and board.home_count("black") < 15:
+            a, b = rng.randint(1, 6), rng.randint(1, 6)
+            dice = [a] * 4 if a == b and rng.random() < 0.5 else [a, b]
+            positions.append((board.copy(), player, dice))
+            plays = MoveMediator.generate_moves(board, player, dice)
+            if plays:
+                play_steps(board, player, rng.choice(plays)[0])
+            player = "black" if player == "white" else "white"
+    return positions
+
+
+@pytest.fixture(scope="session")
+def positions() -> list[tuple[Board, str, list[int]]]:
+    """Shared between tests, copy a board before changing it."""
+    return random_positions(games=10)
+
+
+@pytest.fixture(scope="session")
+def recorded_games() -> list:
+    """GameRecords of seeded HeadlessEngine games between two RandomPlayers."""
+    records = []
+    for seed in range(7):
+        engine = HeadlessEngine(RandomPlayer(seed), RandomPlayer(seed + 1000), game_state=GameState(RandomDice(seed)))
+        engine.run()
+        records.append(engine.record(seed, "random", f"random-{seed}"))
+    return records
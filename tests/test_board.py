@@ -0,0 +1,50 @@
+from datastructures.Board import Board
+from core.moveMediator import MoveMediator
+from ai.evaluator import pip_count
+
+
+def _recounted(board: Board, color: str) -> tuple:
+    """Pips, stones outside home and bear-off state counted from the array alone."""
+    points = board.get_counts
+    home = range(1, 7) if color == "white" else range(19, 25)
+    sign = Board.SIGN[color]
+    inside = sum(points[pt] * sign for pt in home if points[pt] * sign > 0)
+    outside = 15 - inside - points[Board.HOME_SLOT[color]]
+    return pip_count(points, color), outside, outside == 0
+
+
+def _aggregates(board: Board, color: str) -> tuple:
+    return board.pip_count(color), board.outside_count(color), board.can_bear_off(color)
+
+
+def test_running_counts_match_a_recount(positions):
+    # the positions are played with move_stone, hits and bear-offs included
+    assert any(board.bar_count("white") or board.bar_count("black") for board, _, _ in positions)
+    assert any(0 < board.home_count("white") < 15 for board, _, _ in positions)
+    for board, _, _ in positions:
+        for color in ("white", "black"):
+            assert _aggregates(board, color) == _recounted(board, color)
+            assert MoveMediator.points_can_bear_off(board.get_counts, color) == board.can_bear_off(color)
+
+
+def test_make_and_unmake_keep_the_counts(positions):
+    for board, player, dice in positions:
+        board = board.copy()
+        before = [_aggregates(board, color) for color in ("white", "black")]
+        for steps, _ in MoveMediator.generate_moves(board, player, dice)[:3]:
+            deltas = [board.make_move(from_slot, to_slot) for from_slot, to_slot in steps]
+            for color in ("white", "black"):
+                assert _aggregates(board, color) == _recounted(board, color)
+            for delta in reversed(deltas):
+                board.unmake_move(delta)
+            assert [_aggregates(board, color) for color in ("white", "black")] == before
+
+
+def test_set_counts_recounts():
+    points = [0] * Board.SLOT_NUM
+    points[3], points[20], points[Board.BLACK_BAR] = 2, -1, 1
+    points[Board.WHITE_HOME], points[Board.BLACK_HOME] = 13, 13
+    board = Board()
+    board.set_counts(points)
+    assert _aggregates(board, "white") == (6, 0, True)
+    assert _aggregates(board, "black") == (5 + 25, 1, False)
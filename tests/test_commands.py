@@ -0,0 +1,75 @@
+from commands.CommandManager import CommandManager
+from commands.MoveCommand import MoveCommand
+from core.gameState import GameState
+from core.moveMediator import MoveMediator
+from datastructures.Board import Board
+
+
+def _snapshot(board: Board, game_state: GameState) -> tuple:
+    return (list(board.get_counts), board.get_hash, board.pip_count("white"), board.pip_count("black"),
+            board.outside_count("white"), board.outside_count("black"), game_state.get_turn)
+
+
+def _die(player: str, from_slot: int, to_slot: int, dice: tuple[int, ...]) -> int:
+    if from_slot == Board.BAR_SLOT[player]:
+        distance = 25 - to_slot if player == "white" else to_slot
+    else:
+        distance = abs(from_slot - to_slot)
+    # bearing off with a larger die than the distance
+    return min(die for die in dice if die >= distance)
+
+
+def test_undo_and_redo_restore_board_and_turn(positions):
+    for board, player, dice in positions:
+        plays = MoveMediator.generate_moves(board, player, dice)
+        if not plays:
+            continue
+        board = board.copy()
+        game_state = GameState()
+        game_state.set_current_player(player)
+        game_state.set_dice(tuple(dice))
+        mediator = MoveMediator(board, game_state)
+        manager = CommandManager()
+
+        before = _snapshot(board, game_state)
+        for from_slot, to_slot in plays[0][0]:
+            origin = board.get_bar if from_slot == Board.BAR_SLOT[player] else from_slot
+            manager.execute(MoveCommand(mediator, origin, to_slot))
+            # the engine uses up the die after the move
+            left = list(game_state.get_current_dice)
+            left.remove(_die(player, from_slot, to_slot, tuple(left)))
+            game_state.set_dice(tuple(left))
+        game_state.next_turn()
+        after = _snapshot(board, game_state)
+        assert list(board.get_counts) == list(plays[0][1])
+
+        for _ in plays[0][0]:
+            manager.undo()
+        assert _snapshot(board, game_state) == before
+
+        for _ in plays[0][0]:
+            manager.redo()
+        assert _snapshot(board, game_state) == after
+
+
+def test_undo_takes_back_a_hit_and_the_die():
+    points = [0] * Board.SLOT_NUM
+    points[8], points[5] = 1, -1
+    points[Board.WHITE_HOME], points[Board.BLACK_HOME] = 14, 14
+    board = Board.from_counts(points)
+    game_state = GameState()
+    game_state.set_dice((3, 1))
+    manager = CommandManager()
+
+    manager.execute(MoveCommand(MoveMediator(board, game_state), 8, 5))
+    game_state.set_dice((1,))
+    assert board.bar_count("black") == 1
+
+    manager.undo()
+    assert list(board.get_counts) == points
+    assert game_state.get_current_dice == (3, 1)
+    assert manager.get_redo_stack()
+
+    manager.redo()
+    assert board.bar_count("black") == 1 and board.count(5) == 1
+    assert game_state.get_current_dice == (1,)
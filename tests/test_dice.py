@@ -0,0 +1,61 @@
+from random import Random
+
+import pytest
+
+from core.gameState import GameState
+from core.headlessEngine import HeadlessEngine
+from core.players import RandomPlayer
+from datastructures.Dice import DICE_SOURCES, ROLLS, BlockDice, QuasiRandomDice, ReplayDice
+
+
+def _rolls(source, count: int) -> list[tuple[int, int]]:
+    return [source.roll() for _ in range(count)]
+
+
+@pytest.mark.parametrize("name", sorted(DICE_SOURCES))
+def test_same_seed_same_stream(name):
+    source = DICE_SOURCES[name]
+    # past a block refill for the block sources
+    rolls = _rolls(source(11), 2500)
+    assert rolls == _rolls(source(11), 2500)
+    assert rolls != _rolls(source(12), 2500)
+    assert set(rolls) == set(ROLLS)
+
+
+def test_random_dice_follow_the_generator():
+    rng = Random(3)
+    expected = [ROLLS[rng.randrange(36)] for _ in range(50)]
+    assert _rolls(DICE_SOURCES["random"](3), 50) == expected
+    assert _rolls(DICE_SOURCES["random"](Random(3)), 50) == expected
+
+
+def test_streams_are_reproducible_and_distinct():
+    first, second = BlockDice.streams(9, 2), BlockDice.streams(9, 2)
+    assert [_rolls(source, 200) for source in first] == [_rolls(source, 200) for source in second]
+    assert _rolls(BlockDice.streams(9, 2)[0], 200) != _rolls(BlockDice.streams(9, 2)[1], 200)
+
+
+def test_quasi_random_runs_hold_every_roll_once():
+    rolls = _rolls(QuasiRandomDice(5, block_size=72), 36 * 5)
+    for run in range(5):
+        assert sorted(rolls[36 * run:36 * (run + 1)]) == sorted(ROLLS)
+    with pytest.raises(ValueError):
+        QuasiRandomDice(5, block_size=40)
+
+
+def test_replay_dice():
+    dice = ReplayDice([(3, 1), [6, 6]])
+    assert dice.get_remaining == 2
+    assert _rolls(dice, 2) == [(3, 1), (6, 6)]
+    with pytest.raises(IndexError):
+        dice.roll()
+
+
+@pytest.mark.parametrize("name", sorted(DICE_SOURCES))
+def test_seeded_games_repeat(name):
+    def game():
+        engine = HeadlessEngine(RandomPlayer(1), RandomPlayer(2), game_state=GameState(DICE_SOURCES[name](21)))
+        winner = engine.run()
+        return winner, list(engine.get_board.get_counts), engine.history
+
+    assert game() == game()
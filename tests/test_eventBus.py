@@ -0,0 +1,71 @@
+import pytest
+
+from core.eventBus import EventBus
+from core.events import ClickStack, QuitEvent, RollDiceRequest
+
+
+def test_dispatch_in_subscription_and_publish_order():
+    bus = EventBus()
+    seen = []
+    bus.subscribe(ClickStack, lambda ev: seen.append(("first", ev.stack_id)))
+    bus.subscribe(ClickStack, lambda ev: seen.append(("second", ev.stack_id)))
+    bus.subscribe(QuitEvent, lambda ev: seen.append(("quit", None)))
+
+    for event in (ClickStack(3), QuitEvent(), RollDiceRequest(), ClickStack(7)):
+        bus.publish(event)
+    assert len(bus) == 4
+
+    # events without a handler are dropped, but count as handled
+    assert bus.drain() == 4
+    assert bus.empty_events()
+    assert seen == [("first", 3), ("second", 3), ("quit", None), ("first", 7), ("second", 7)]
+
+
+def test_unsubscribe():
+    bus = EventBus()
+    seen = []
+    first, second = (lambda ev: seen.append(1)), (lambda ev: seen.append(2))
+    bus.subscribe(QuitEvent, first)
+    bus.subscribe(QuitEvent, second)
+    bus.unsubscribe(QuitEvent, first)
+    bus.dispatch(QuitEvent())
+    assert seen == [2]
+
+    bus.unsubscribe(QuitEvent, second)
+    bus.dispatch(QuitEvent())
+    assert seen == [2]
+    with pytest.raises(ValueError):
+        bus.unsubscribe(QuitEvent, second)
+
+
+def test_changes_during_a_dispatch_apply_to_the_next_event():
+    bus = EventBus()
+    seen = []
+
+    def once(ev):
+        seen.append("once")
+        bus.unsubscribe(QuitEvent, once)
+        bus.subscribe(QuitEvent, lambda ev: seen.append("late"))
+
+    bus.subscribe(QuitEvent, once)
+    bus.subscribe(QuitEvent, lambda ev: seen.append("always"))
+    bus.publish(QuitEvent())
+    bus.publish(QuitEvent())
+    bus.drain()
+    assert seen == ["once", "always", "always", "late"]
+
+
+def test_drain_only_handles_queued_events_and_stops_at_the_budget():
+    bus = EventBus()
+    seen = []
+    # a handler that publishes: the new event waits for the next drain
+    bus.subscribe(ClickStack, lambda ev: (seen.append(ev.stack_id), bus.publish(RollDiceRequest())))
+    bus.subscribe(RollDiceRequest, lambda ev: seen.append("roll"))
+    bus.publish(ClickStack(1))
+    bus.publish(ClickStack(2))
+    assert bus.drain() == 2
+    assert seen == [1, 2] and len(bus) == 2
+
+    # a spent budget still handles one event per drain
+    assert bus.drain(budget=0.0) == 1
+    assert seen == [1, 2, "roll"] and len(bus) == 1
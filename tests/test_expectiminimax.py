@@ -0,0 +1,35 @@
+from core.gameState import GameState
+from core.headlessEngine import HeadlessEngine
+from datastructures.Board import Board
+from datastructures.Dice import RandomDice
+from ai.agents import AGENTS
+from ai.evaluator import Evaluator, PipCountEvaluator
+from ai.expectiminimax import ExpectiminimaxPlayer
+
+
+class _GammonEvaluator(Evaluator):
+    # only its scale matters, the finished positions never reach evaluate
+    def evaluate(self, position, player):
+        return 0.0
+
+
+def _gammon_for_white() -> list[int]:
+    points = [0] * Board.SLOT_NUM
+    points[Board.WHITE_HOME] = 15
+    points[12] = -15
+    return points
+
+
+def test_finished_game_is_a_loss_on_the_evaluator_scale():
+    points = _gammon_for_white()
+    assert GameState.game_value(points, "white") == 2
+
+    assert ExpectiminimaxPlayer(evaluator=_GammonEvaluator())._chance(points, "black", 1, -3.0, 3.0) == -2.0
+    assert ExpectiminimaxPlayer(evaluator=PipCountEvaluator())._chance(points, "black", 1, -1.0, 1.0) == -1.0
+
+
+def test_greedy_agents_finish_their_games():
+    for seed in range(5):
+        engine = HeadlessEngine(AGENTS["greedy"](seed), AGENTS["greedy"](seed + 1000),
+                                game_state=GameState(RandomDice(seed)), max_turns=400)
+        assert engine.run() is not None
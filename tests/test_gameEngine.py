@@ -0,0 +1,55 @@
+import os
+
+import pytest
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+pytest.importorskip("pygame")
+
+from core.events import ClickStack                      # noqa: E402
+from core.gameEngine import GameEngine                  # noqa: E402
+from datastructures.Board import Board                  # noqa: E402
+from datastructures.Dice import ReplayDice              # noqa: E402
+
+
+def _click(engine: GameEngine, *stacks: int) -> None:
+    for stack in stacks:
+        engine.get_events.publish(ClickStack(stack))
+        engine.process_game_events()
+
+
+def test_smaller_die_can_be_played_first():
+    engine = GameEngine(dice=ReplayDice([(6, 5)]))
+    engine._start_turn()
+    # 13 -> 8 is the 5 of 13 -> 8 -> 2, a play generate_moves lists with the 6 first
+    assert engine._get_valid_destinations(13) == [7, 8]
+
+    _click(engine, 13, 8)
+    assert engine.get_board.count(8) == 4
+    assert engine._get_valid_destinations(8) == [2]
+    assert engine._get_valid_destinations(13) == [7]
+
+    _click(engine, 8, 2)
+    board = engine.get_board
+    assert (board.count(13), board.count(8), board.count(2)) == (4, 3, 1)
+    assert engine.get_game_state.get_current_dice == ()
+
+
+def test_only_steps_of_a_legal_play_are_offered():
+    # white's last stone on 10 with black holding 5: either die alone is playable,
+    # neither leaves room for the other, so the larger die has to be played
+    points = [0] * Board.SLOT_NUM
+    points[10], points[5] = 1, -2
+    points[Board.WHITE_HOME], points[Board.BLACK_HOME] = 14, 13
+    engine = GameEngine(dice=ReplayDice([(2, 3)]))
+    engine.get_board.set_counts(points)
+    engine._start_turn()
+    assert engine._get_valid_destinations(10) == [7]
+
+    _click(engine, 10, 8)
+    assert engine.get_board.count(10) == 1
+    _click(engine, 10, 7)
+    assert engine.get_board.count(7) == 1
+    # the 2 is left but has nowhere to go, the loop ends the turn
+    assert engine._get_valid_destinations(7) == []
@@ -0,0 +1,64 @@
+import pytest
+
+from core.gameRecord import GameRecordReader, GameRecordWriter, iter_games
+
+
+@pytest.fixture
+def record_file(tmp_path, recorded_games):
+    path = str(tmp_path / "games.bgr")
+    records = recorded_games[:5]
+    with GameRecordWriter(path) as writer:
+        for record in records:
+            writer.write_game(record)
+    return path, records
+
+
+def test_reader_follows_the_index(record_file):
+    path, records = record_file
+    reader = GameRecordReader(path)
+    try:
+        assert len(reader) == len(records)
+        for game, record in enumerate(records):
+            assert reader.game(game) == record
+            assert reader.turn_count(game) == len(record.turns)
+            for turn, expected in enumerate(record.turns):
+                assert reader.turn(game, turn) == expected
+        with pytest.raises(IndexError):
+            reader.game(len(records))
+        with pytest.raises(IndexError):
+            reader.turn(0, len(records[0].turns))
+    finally:
+        reader.close()
+
+
+@pytest.mark.parametrize("chunk_size", [1 << 20, 64, 1])
+def test_streaming_reader_matches(record_file, chunk_size):
+    path, records = record_file
+    assert list(iter_games(path, chunk_size)) == records
+
+
+def test_appending_and_unfinished_games(record_file, recorded_games):
+    path, records = record_file
+    more = recorded_games[5:]
+    with GameRecordWriter(path) as writer:
+        for record in more:
+            writer.write_game(record)
+        # a game still being played when the file is read
+        writer.start_game(99, "random", "random", more[0].start, "white")
+        writer.record_turn(more[0].turns[0].dice, more[0].turns[0].steps)
+
+    reader = GameRecordReader(path)
+    try:
+        assert len(reader) == len(records) + len(more)
+        assert [reader.game(game) for game in range(len(reader))] == records + more
+        assert reader.turn(6, 0) == more[1].turns[0]
+    finally:
+        reader.close()
+    assert list(iter_games(path, 256)) == records + more
+
+
+def test_not_a_record_file(tmp_path):
+    path = tmp_path / "other.bin"
+    path.write_bytes(b"not a game record")
+    with pytest.raises(ValueError):
+        list(iter_games(str(path)))
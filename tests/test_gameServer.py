@@ -0,0 +1,86 @@
+import asyncio
+from random import Random
+
+import pytest
+
+from server.gameClient import GameClient, GameServerError
+from server.gameServer import GameServer
+
+
+async def _with_server(tmp_path, body):
+    path = str(tmp_path / "server.sock")
+    game_server = GameServer(max_tables=2)
+    server = await game_server.start(path=path)
+    try:
+        return await body(game_server, lambda: GameClient.connect_unix(path))
+    finally:
+        server.close()
+        await server.wait_closed()
+
+
+def test_round_trip(tmp_path):
+    async def body(game_server, connect):
+        white, black, watcher = await connect(), await connect(), await connect()
+        table = await white.create_table(seed=5)
+        await white.join(table, "white")
+        black_view = await black.join(table, "black")
+        watcher_view = await watcher.join(table)
+        seats = {"white": white, "black": black}
+        rng = Random(5)
+
+        while black_view.winner is None:
+            player = black_view.player
+            _, plays = await seats[player].roll(table)
+            if plays:
+                await seats[player].play(table, rng.choice(plays))
+            if black_view.winner is None and black_view.player == player:
+                # the other side is not on roll yet
+                with pytest.raises(GameServerError, match="Not your turn"):
+                    await seats[player].roll(table)
+
+        # every event reached every view before the last reply
+        state = game_server.tables[table].snapshot()
+        for client in (white, black, watcher):
+            view = client.tables[table]
+            assert view.counts == state["counts"]
+            assert view.winner == state["winner"] == black_view.winner
+        assert watcher_view.points >= 1
+
+        # the watcher joined after both seats, its events start with the first roll
+        events = [await watcher.next_event()]
+        while events[-1]["type"] != "over":
+            events.append(await watcher.next_event())
+        assert events[0]["type"] == "rolled" and events[0]["player"] == "white"
+        assert events[-1]["winner"] == black_view.winner
+
+        for client in (white, black, watcher):
+            await client.leave(table)
+            await client.close()
+        assert table not in game_server.tables
+
+    asyncio.run(_with_server(tmp_path, body))
+
+
+def test_bad_requests(tmp_path):
+    async def body(game_server, connect):
+        async with await connect() as client:
+            with pytest.raises(GameServerError, match="No table"):
+                await client.join(99, "white")
+            table = await client.create_table(seed=1)
+            await client.join(table, "white")
+            await client.join(table, "black")
+            with pytest.raises(GameServerError, match="Roll the dice first"):
+                await client.move(table, 13, 8)
+
+            _, plays = await client.roll(table)
+            with pytest.raises(GameServerError, match="Illegal move"):
+                await client.move(table, 1, 0)
+            assert plays
+            with pytest.raises(GameServerError, match="Unknown op"):
+                await client.request("resign", table=table)
+
+            await client.create_table()
+            with pytest.raises(GameServerError, match="full"):
+                await client.create_table()
+
+    asyncio.run(_with_server(tmp_path, body))
@@ -0,0 +1,77 @@
+import numpy as np
+import pytest
+
+from core.gameState import GameState
+from core.headlessEngine import HeadlessEngine
+from core.matchState import MatchState
+from datastructures.Dice import RandomDice
+from datastructures.DoublingCube import DoublingCube
+from ai.agents import AGENTS
+from ai.matchEquity import (GAMMON_RATE, BACKGAMMON_RATE, MET, MatchEquityCube, cube_decision,
+                            money_cube_decision)
+
+
+def _outputs(win: float) -> list[float]:
+    # gammons at the table's rates, as evaluator_outputs gives them
+    lose = 1.0 - win
+    return [win, win * GAMMON_RATE, win * BACKGAMMON_RATE, lose * GAMMON_RATE, lose * BACKGAMMON_RATE]
+
+
+def test_met_is_consistent():
+    length = 11
+    met = MET.met[0, 1:length + 1, 1:length + 1]
+    assert np.allclose(met + met.T, 1.0)
+    assert MET.equity(1, 1) == MET.equity(3, 3) == 0.5
+    # the leader's chances with the live cube, 67% in the published tables
+    assert MET.equity(2, 4) == pytest.approx(0.67, abs=0.01)
+    # the Crawford game is 1-away 2-away with the cube out of play, the next one is a 2-point race
+    assert MET.equity(1, 2) == pytest.approx(1.0 - 0.5 * ((1.0 - GAMMON_RATE) * 0.5 + GAMMON_RATE))
+    assert MET.equity(1, 2, post_crawford=True) == 0.5
+
+
+def test_match_cube_decisions():
+    match = MatchState(5)
+    assert not cube_decision(_outputs(0.5), "white", DoublingCube(), match).double
+
+    decision = cube_decision(_outputs(0.7), "white", DoublingCube(), match)
+    assert decision.double and decision.take
+
+    decision = cube_decision(_outputs(0.8), "white", DoublingCube(), match)
+    assert decision.double and not decision.take
+
+    # too good: playing on for the gammon beats cashing
+    assert not cube_decision(_outputs(0.9), "white", DoublingCube(), match).double
+
+
+def test_no_double_in_the_crawford_game():
+    match = MatchState(3)
+    match.record_game("white", 2)
+    assert match.get_crawford
+    assert not cube_decision(_outputs(0.8), "black", DoublingCube(), match).double
+
+
+def test_money_cube_decisions():
+    cube = DoublingCube()
+    assert not money_cube_decision(_outputs(0.5), "white", cube).double
+
+    decision = money_cube_decision(_outputs(0.72), "white", cube)
+    assert decision.double and decision.take
+    assert decision.double_drop == 1.0
+
+    decision = money_cube_decision(_outputs(0.8), "white", cube)
+    assert decision.double and not decision.take
+    assert not money_cube_decision(_outputs(0.95), "white", cube).double
+
+    # no match means money play
+    assert cube_decision(_outputs(0.72), "white", cube, None) == money_cube_decision(_outputs(0.72), "white", cube)
+
+
+def test_money_game_with_cube_players():
+    cube = MatchEquityCube(lambda position, player: np.array(_outputs(0.8)))
+    engine = HeadlessEngine(AGENTS["greedy"](0), AGENTS["greedy"](1), game_state=GameState(RandomDice(3)),
+                            cube_players={"white": cube, "black": cube}, max_turns=400)
+    winner = engine.run()
+    # the first side on roll doubles and the other passes
+    assert winner == engine.get_game_state.get_current_player
+    assert engine.turns == 0
+    assert engine.get_game_state.get_doubling_cube.get_value == 1
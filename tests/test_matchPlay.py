@@ -0,0 +1,22 @@
+from simulation.matchPlay import cube_player, main, play_match
+
+
+def test_match_stops_at_a_game_given_up():
+    result = play_match("greedy", "greedy", 3, None, seed=1, max_turns=2)
+    assert result["winner"] is None
+    assert result["games"] == 0
+    assert result["score"] == {"white": 0, "black": 0}
+
+
+def test_greedy_match_finishes():
+    result = play_match("greedy", "greedy", 3, cube_player("heuristic"), seed=1)
+    assert result["winner"] in ("white", "black")
+    assert result["score"][result["winner"]] >= 3
+
+
+def test_unfinished_matches_are_reported(capsys):
+    main(["--length", "1", "--matches", "2", "--white", "greedy", "--black", "greedy", "--cube", "none",
+          "--max-turns", "2"])
+    out = capsys.readouterr().out
+    assert "white (greedy) 0, black (greedy) 0" in out
+    assert "unfinished 2 (a game given up after 2 turns)" in out
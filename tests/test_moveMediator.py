@@ -0,0 +1,110 @@
+import pytest
+
+from core.gameState import GameState
+from core.moveMediator import MoveMediator
+from datastructures.Board import Board
+
+
+def _mediator(board: Board, player: str, dice) -> MoveMediator:
+    game_state = GameState()
+    game_state.set_current_player(player)
+    game_state.set_dice(tuple(dice))
+    return MoveMediator(board, game_state)
+
+
+def _interactive_positions(start: Board, player: str, dice: list[int]) -> set[tuple[int, ...]]:
+    """
+    Final positions reachable one step at a time through validate_move and execute_move,
+    the way a human plays, with the same most-dice and larger-die rules applied after.
+    """
+    reached: dict[int, set[tuple[int, ...]]] = {}
+    larger_die_used = set()
+
+    def walk(board: Board, remaining: list[int], used: list[int]) -> None:
+        moved = False
+        for die in sorted(set(remaining)):
+            mediator = _mediator(board, player, (die,))
+            origins = [board.get_bar] if board.bar_count(player) else range(1, 25)
+            for origin in origins:
+                for to_stack in range(26):
+                    if not mediator.validate_move(origin, to_stack):
+                        continue
+                    moved = True
+                    after = board.copy()
+                    _mediator(after, player, (die,)).execute_move(
+                        after.get_bar if origin is board.get_bar else origin, to_stack)
+                    rest = list(remaining)
+                    rest.remove(die)
+                    walk(after, rest, used + [die])
+        if not moved and used:
+            position = tuple(board.get_counts)
+            reached.setdefault(len(used), set()).add(position)
+            if len(used) == 1 and used[0] == max(dice):
+                larger_die_used.add(position)
+
+    walk(start, list(dice), [])
+    if not reached:
+        return set()
+    most = max(reached)
+    if most == 1 and len(set(dice)) > 1 and larger_die_used:
+        return reached[most] & larger_die_used
+    return reached[most]
+
+
+def test_generate_moves_matches_validate_and_execute(positions):
+    cases = positions[::3]
+    assert len(cases) > 200
+    for board, player, dice in cases:
+        plays = MoveMediator.generate_moves(board, player, dice)
+        assert {position for _, position in plays} == _interactive_positions(board, player, dice), \
+            (list(board.get_counts), player, dice)
+
+
+def test_generate_moves_steps_replay_through_execute_move(positions):
+    for board, player, dice in positions[::2]:
+        for steps, position in MoveMediator.generate_moves(board, player, dice):
+            after = board.copy()
+            mediator = _mediator(after, player, dice)
+            for from_stack, to_stack in steps:
+                mediator.execute_move(after.get_bar if from_stack == Board.BAR_SLOT[player] else from_stack, to_stack)
+            assert tuple(after.get_counts) == position
+
+
+def _points(white: dict[int, int], black: dict[int, int]) -> list[int]:
+    points = [0] * Board.SLOT_NUM
+    for slot, count in white.items():
+        points[slot] = count
+    for slot, count in black.items():
+        points[slot] = count if slot in (Board.BLACK_HOME, Board.BLACK_BAR) else -count
+    points[Board.WHITE_HOME] = 15 - sum(white.values())
+    points[Board.BLACK_HOME] = 15 - sum(black.values())
+    return points
+
+
+def _board(white: dict[int, int], black: dict[int, int]) -> Board:
+    return Board.from_counts(_points(white, black))
+
+
+def test_larger_die_when_only_one_can_be_played():
+    # either die can be played from 10, but point 5 is blocked for the other one after it
+    board = _board({10: 1}, {5: 2})
+    assert MoveMediator.generate_moves(board, "white", [2, 3]) == \
+        [(((10, 7),), tuple(_points({7: 1}, {5: 2})))]
+
+
+def test_both_dice_have_to_be_played_when_possible():
+    # 10 -> 7 leaves no move for the 2, only 10 -> 8 -> 5 uses both dice
+    board = _board({10: 1}, {7: 2})
+    assert MoveMediator.generate_moves(board, "white", [3, 2]) == \
+        [(((10, 8), (8, 5)), tuple(_points({5: 1}, {7: 2})))]
+
+
+@pytest.mark.parametrize("dice", [[1, 2], [6, 6, 6, 6]])
+def test_no_play_against_a_closed_board(dice):
+    board = _board({Board.WHITE_BAR: 1}, {point: 2 for point in range(19, 25)})
+    assert MoveMediator.generate_moves(board, "white", dice) == []
+
+
+def test_legal_steps_hit_a_blot():
+    steps = list(MoveMediator.legal_steps(_points({13: 1}, {8: 1}), "white", 5))
+    assert steps == [(13, 8, _points({8: 1}, {Board.BLACK_BAR: 1}))]
@@ -0,0 +1,50 @@
+import numpy as np
+import pytest
+
+from datastructures.Board import Board
+from datastructures.PositionId import PositionId
+
+
+def test_opening_position_id():
+    board = Board()
+    assert board.position_id("white") == "4HPwATDgc/ABMA:w"
+    decoded, player = Board.from_position_id("4HPwATDgc/ABMA:w")
+    assert player == "white"
+    assert list(decoded.get_counts) == list(board.get_counts)
+
+
+def test_round_trip(positions):
+    cases = [(list(board.get_counts), player) for board, player, _ in positions]
+    assert any(points[Board.WHITE_BAR] or points[Board.BLACK_BAR] for points, _ in cases)
+    assert any(points[Board.WHITE_HOME] or points[Board.BLACK_HOME] for points, _ in cases)
+    for points, player in cases:
+        assert PositionId.decode(PositionId.encode(points, player)) == (points, player)
+        assert PositionId.from_key(PositionId.key(points, player)) == (points, player)
+
+
+def test_side_to_move_changes_the_id():
+    points = list(Board().get_counts)
+    assert PositionId.encode(points, "white") != PositionId.encode(points, "black")
+    assert PositionId.decode(PositionId.encode(points, "black"))[1] == "black"
+
+
+def test_bulk_matches_scalar(positions):
+    cases = [(list(board.get_counts), player) for board, player, _ in positions]
+    points = np.array([points for points, _ in cases], dtype=np.int8)
+    black_to_move = np.array([player == "black" for _, player in cases])
+
+    keys = PositionId.encode_many(points, black_to_move)
+    for row, (position, player) in zip(keys, cases):
+        key = PositionId.key(position, player)
+        assert row.tobytes() == (key & (PositionId.SIDE_BIT - 1)).to_bytes(PositionId.KEY_BYTES, "little") \
+            + bytes([player == "black"])
+
+    decoded, decoded_black = PositionId.decode_many(keys)
+    assert np.array_equal(decoded, points)
+    assert np.array_equal(decoded_black, black_to_move)
+
+
+@pytest.mark.parametrize("position_id", ["4HPwATDgc/ABMA", "4HPwATDgc/ABMA:x", "4HPwATDgc:w"])
+def test_invalid_ids(position_id):
+    with pytest.raises(ValueError):
+        PositionId.decode(position_id)
@@ -0,0 +1,56 @@
+from random import Random
+
+import pytest
+
+from datastructures.Board import Board
+from core.replay import ReplayEngine
+from tests.conftest import play_steps
+
+
+def _straight_replay(record) -> list[list[int]]:
+    """Board arrays before every turn and at the end, played from the start without checkpoints."""
+    board, player = Board.from_counts(record.start), record.first_player
+    boards = [list(board.get_counts)]
+    for turn in record.turns:
+        play_steps(board, player, [(from_stack, to_stack) for from_stack, to_stack, _ in turn.steps])
+        boards.append(list(board.get_counts))
+        player = "black" if player == "white" else "white"
+    return boards
+
+
+@pytest.mark.parametrize("checkpoint_every", [1, 4, 16])
+def test_seeks_match_a_straight_replay(recorded_games, checkpoint_every):
+    rng = Random(checkpoint_every)
+    for record in recorded_games:
+        boards = _straight_replay(record)
+        replay = ReplayEngine.from_record(record, checkpoint_every)
+        assert len(replay) == len(record.turns)
+
+        # forward and backward jumps, from checkpoints and from the current position
+        for turn in [len(boards) - 1] + [rng.randrange(len(boards)) for _ in range(30)]:
+            assert list(replay.seek(turn).get_counts) == boards[turn]
+        assert replay.seek(len(record.turns)).home_count(record.winner) == 15
+
+
+def test_seek_within_a_turn(recorded_games):
+    record = recorded_games[0]
+    replay = ReplayEngine.from_record(record, checkpoint_every=4)
+    turn = next(i for i, t in enumerate(record.turns) if len(t.steps) > 1)
+    board = Board.from_counts(_straight_replay(record)[turn])
+    from_stack, to_stack, _ = record.turns[turn].steps[0]
+    play_steps(board, replay.player_at(turn), [(from_stack, to_stack)])
+
+    assert list(replay.seek(turn, 1).get_counts) == list(board.get_counts)
+    # a seek after a partial turn starts over from a turn boundary
+    assert list(replay.seek(turn + 1).get_counts) == _straight_replay(record)[turn + 1]
+    with pytest.raises(IndexError):
+        replay.seek(turn, len(record.turns[turn].steps) + 1)
+    with pytest.raises(IndexError):
+        replay.seek(len(record.turns) + 1)
+
+
+def test_from_moves_rolls_the_recorded_dice(recorded_games):
+    for record in recorded_games:
+        plays = [[(from_stack, to_stack) for from_stack, to_stack, _ in turn.steps] for turn in record.turns]
+        replay = ReplayEngine.from_moves(record.seed, plays)
+        assert list(replay.seek(len(plays)).get_counts) == _straight_replay(record)[-1]
@@ -0,0 +1,33 @@
+import math
+
+from datastructures.Board import Board
+from ai.rollout import rollout
+
+
+def _last_stones() -> list[int]:
+    # white and black have one stone left each, on their one point
+    points = [0] * Board.SLOT_NUM
+    points[1], points[24] = 1, -1
+    points[Board.WHITE_HOME], points[Board.BLACK_HOME] = 14, 14
+    return points
+
+
+def test_sure_win():
+    (result,) = rollout(_last_stones(), "white", trials=72, policy="first")
+    assert result["equity"] == result["win_rate"] == 1.0
+    assert result["trials"] == 72 and result["unfinished"] == 0
+
+
+def test_unfinished_games_are_left_out():
+    board = Board()
+    (result,) = rollout(board, "white", trials=72, policy="greedy", max_turns=2)
+    assert result["trials"] == 0 and result["unfinished"] == 72
+    assert math.isnan(result["equity"])
+
+    (result,) = rollout(board, "white", trials=72, policy="greedy", max_turns=80)
+    assert result["unfinished"] > 0
+    # dropped pairs do not dilute the rates of the finished ones
+    assert result["trials"] + result["unfinished"] <= 72 <= result["trials"] + 2 * result["unfinished"]
+    assert result["trials"] % 2 == 0
+    assert 0.0 < result["win_rate"] < 1.0
+    assert abs(result["equity"]) <= 3.0
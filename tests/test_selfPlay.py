@@ -0,0 +1,18 @@
+from simulation.selfPlay import main, simulate
+
+
+def test_games_replay_for_any_worker_count():
+    results = sorted(simulate(4, 1, seed=3), key=lambda result: result["game"])
+    again = sorted(simulate(4, 2, seed=3), key=lambda result: result["game"])
+    assert [(r["winner"], r["turns"], r["moves"]) for r in results] == \
+        [(r["winner"], r["turns"], r["moves"]) for r in again]
+    assert all(result["winner"] is not None for result in results)
+
+
+def test_unfinished_games_are_reported_separately(capsys):
+    assert [result["winner"] for result in simulate(3, 1, max_turns=2)] == [None] * 3
+
+    main(["--games", "3", "--workers", "1", "--max-turns", "2"])
+    out = capsys.readouterr().out
+    assert "white 0, black 0" in out
+    assert "unfinished 3 (given up after 2 turns)" in out
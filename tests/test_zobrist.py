@@ -0,0 +1,54 @@
+from datastructures.Board import Board
+from datastructures.TranspositionTable import TranspositionTable
+from datastructures.Zobrist import Zobrist
+from core.moveMediator import MoveMediator
+
+
+def test_incremental_hash_matches_a_full_recompute(positions):
+    for board, player, dice in positions:
+        assert board.get_hash == Zobrist.hash_points(board.get_counts)
+        assert board.position_hash(player) == Zobrist.with_side(Zobrist.hash_points(board.get_counts), player)
+
+        board = board.copy()
+        for steps, after in MoveMediator.generate_moves(board, player, dice)[:3]:
+            deltas = [board.make_move(from_slot, to_slot) for from_slot, to_slot in steps]
+            assert board.get_hash == Zobrist.hash_points(after)
+            for delta in reversed(deltas):
+                board.unmake_move(delta)
+            assert board.get_hash == Zobrist.hash_points(board.get_counts)
+
+
+def test_hash_tells_positions_and_sides_apart(positions):
+    keys = {}
+    for board, player, _ in positions:
+        keys.setdefault(board.position_hash(player), tuple(board.get_counts))
+        assert keys[board.position_hash(player)] == tuple(board.get_counts)
+
+    board = Board()
+    assert board.position_hash("white") != board.position_hash("black")
+    assert Zobrist.hash_points([0] * Board.SLOT_NUM) == 0
+
+
+def test_transposition_table_replacement():
+    table = TranspositionTable(size_bits=4)
+    key, other = 0x1234_0005, 0x9876_0005        # same bucket
+    assert table.store(key, "deep", depth=3)
+    assert table.probe(key, 3) == "deep"
+    assert table.probe(key, 4) is None
+    assert table.probe(other) is None
+
+    # a shallower entry of the same search does not push out a deeper one
+    assert not table.store(other, "shallow", depth=1)
+    assert table.probe(key) == "deep"
+    assert table.store(other, "as deep", depth=3)
+    assert other in table and key not in table
+
+    # entries of an older search are replaced whatever their depth
+    table.new_search()
+    assert table.store(key, "new", depth=0)
+    assert table.probe(key) == "new"
+    assert len(table) == 1
+
+    assert (table.hits, table.misses) == (3, 2)
+    table.clear()
+    assert len(table) == 0 and table.probe(key) is None